@@ -0,0 +1,373 @@
+"""
+Microbenchmark and regression check for the boxscore mapper functions.
+
+Runs every mapper over the boxscores of a corpus – by default the
+committed fixture, bench/fixtures/day-2025-06-14 – and measures, per mapper,
+
+* ops/sec – games mapped per second (best of `--repeat`), and calls/sec,
+* allocations per game – bytes still held after the call (the rows) and
+  peak bytes during it, from tracemalloc,
+* a digest of every row produced, so an optimisation that changes output
+  is caught as well.
+
+Before timing anything it checks correctness: hand-written edge cases and
+schema variants of every corpus game – `pitchesThrown` vs the pre-2024
+`numberOfPitches`, a missing `battersFaced` – must map to the same rows.
+
+The results are compared with a stored baseline for the same corpus
+(`bench/baselines/mappers-<corpus>.json`, committed for the fixture).
+The exit status is 1 if a check fails, there is no baseline (unless
+`--update-baseline`), the baseline was taken on a corpus with another
+digest, output differs, ops/sec drops by more than `--tolerance` or
+allocations grow by more than `--alloc-tolerance`.
+
+    python bench/bench_mappers.py                       # check against the baseline
+    python bench/bench_mappers.py --update-baseline     # accept the current numbers
+    python bench/bench_mappers.py --check-only          # correctness only, no timing
+
+Timings are only comparable on the machine the baseline was recorded on.
+"""
+import argparse
+import copy
+import gc
+import hashlib
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from corpus import BASELINE_DIR, FIXTURE, REPO_DIR, Corpus
+
+sys.path.insert(0, str(REPO_DIR / "etl"))
+from utils.baseball_stats import (_innings_to_outs, _parse_batting_order,  # noqa: E402
+                                  boxscore_from_raw, extract_meta_data,
+                                  map_player_batting, map_player_fielding_raw,
+                                  map_player_pitching, map_team_box,
+                                  map_team_fielding_raw)
+
+SIDES = ("away", "home")
+
+TOLERANCE       = 0.10        # allowed ops/sec drop
+ALLOC_TOLERANCE = 0.05        # allowed growth of bytes per game
+MIN_TIME        = 0.2         # seconds per timing repeat
+REPEAT          = 5
+VARIANT_GAMES   = 200         # games deep-copied for the schema-variant checks
+
+Call = Tuple[Callable[..., Any], tuple]
+
+
+# ─────────────────────────────────────
+#  W O R K   P E R   G A M E
+# ─────────────────────────────────────
+def _pitching_lines(box):
+    for side in SIDES:
+        players = box[side]["players"]
+        for pid in box[side]["pitchers"]:
+            line = players[f"ID{pid}"]["stats"]["pitching"]
+            if line:
+                yield line
+
+
+# mapper → the calls `map_game_stats` makes to it for one game
+MAPPERS: Dict[str, Callable[[int, Dict[str, Any]], List[Call]]] = {
+    "map_player_batting": lambda pk, box: [
+        (map_player_batting, (pk, box[s]["team"]["id"], box[s]["players"], box[s]["batters"]))
+        for s in SIDES],
+    "map_player_pitching": lambda pk, box: [
+        (map_player_pitching, (pk, box[s]["team"]["id"], box[s]["players"], box[s]["pitchers"]))
+        for s in SIDES],
+    "map_player_fielding_raw": lambda pk, box: [
+        (map_player_fielding_raw, (pk, box["teams"][s]["team"]["id"], box["teams"][s]["players"]))
+        for s in SIDES],
+    "map_team_box": lambda pk, box: [
+        (map_team_box, (pk, s, box[s])) for s in SIDES],
+    "map_team_fielding_raw": lambda pk, box: [
+        (map_team_fielding_raw, (pk, s, box["teams"][s])) for s in SIDES],
+    "_innings_to_outs": lambda pk, box: [
+        (_innings_to_outs, (line.get("inningsPitched", "0.0"),))
+        for line in _pitching_lines(box)],
+    "_parse_batting_order": lambda pk, box: [
+        (_parse_batting_order, (box[s]["players"][f"ID{pid}"].get("battingOrder"),))
+        for s in SIDES for pid in box[s]["batters"]],
+    "extract_meta_data": lambda pk, box: [
+        (extract_meta_data, (box["gameBoxInfo"],))],
+}
+
+
+def load_boxes(corpus: Corpus, limit: Optional[int] = None) -> List[Tuple[int, Dict[str, Any]]]:
+    pks = corpus.game_pks()[:limit]
+    return [(pk, boxscore_from_raw(corpus.boxscore(pk))) for pk in pks]
+
+
+# ─────────────────────────────────────
+#  C O R R E C T N E S S
+# ─────────────────────────────────────
+EDGE_CASES: List[Tuple[Callable[..., Any], tuple, Any]] = [
+    (_innings_to_outs, ("5.2",), 17),
+    (_innings_to_outs, ("1.0",), 3),
+    (_innings_to_outs, ("0.1",), 1),
+    (_innings_to_outs, ("0.0",), 0),
+    (_innings_to_outs, ("",), 0),
+    (_parse_batting_order, ("601",), 6),
+    (_parse_batting_order, ("601.1",), 6),
+    (_parse_batting_order, ("100",), 1),
+    (_parse_batting_order, (None,), None),
+    (_parse_batting_order, ("",), None),
+    (extract_meta_data, ([],),
+     {"weather_temp_f": None, "wind_mph": None, "attendance": None, "first_pitch_str": None}),
+    (extract_meta_data, ([{"label": "Weather", "value": "59 degrees, Cloudy."},
+                          {"label": "Wind", "value": "11 mph, In From LF."},
+                          {"label": "Att", "value": "4,256."},
+                          {"label": "First pitch", "value": "1:06 PM."}],),
+     {"weather_temp_f": 59, "wind_mph": 11, "attendance": 4256, "first_pitch_str": "1:06 PM."}),
+    # empty stat lines are skipped, not written as zeros
+    (map_player_batting, (1, 147, {"ID1": {"stats": {"batting": {}},
+                                           "position": {"abbreviation": "PH"}}}, [1]), []),
+    (map_player_fielding_raw, (1, 147, {"ID1": {"person": {"id": 1}, "stats": {},
+                                                "position": {"abbreviation": "P"}}}), []),
+    (map_player_pitching, (1, 147, {}, []), []),
+]
+
+
+def _rename(line: Dict[str, Any], old: str, new: str) -> None:
+    if old in line:
+        value = line.pop(old)
+        line.setdefault(new, value)
+
+
+def _team_pitching(box):
+    return [box[s]["teamStats"]["pitching"] for s in SIDES]
+
+
+def _pitching_rows(pk, box):
+    return ([fn(*args) for fn, args in MAPPERS["map_player_pitching"](pk, box)],
+            [fn(*args) for fn, args in MAPPERS["map_team_box"](pk, box)])
+
+
+def check_edge_cases() -> List[str]:
+    failures = []
+    for fn, args, expected in EDGE_CASES:
+        try:
+            got = fn(*args)
+        except Exception as e:
+            got = e
+        if got != expected:
+            failures.append(f"{fn.__name__}{args!r:.60} → {got!r}, expected {expected!r}")
+    return failures
+
+
+def check_schema_variants(boxes) -> List[str]:
+    """The same game under old and new StatsAPI field names maps to the same rows."""
+    failures = []
+    for pk, box in boxes[:VARIANT_GAMES]:
+        expected = _pitching_rows(pk, box)
+        for name, old, new in (("pitchesThrown", "numberOfPitches", "pitchesThrown"),
+                               ("numberOfPitches", "pitchesThrown", "numberOfPitches")):
+            variant = copy.deepcopy(box)
+            for line in list(_pitching_lines(variant)) + _team_pitching(variant):
+                _rename(line, old, new)
+            if _pitching_rows(pk, variant) != expected:
+                failures.append(f"gamePk {pk}: rows change when pitch counts "
+                                f"are only under `{name}`")
+
+        # older boxscores have no battersFaced – it is summed from its parts
+        variant = copy.deepcopy(box)
+        parts = {}
+        for line in _pitching_lines(variant):
+            line.pop("battersFaced", None)
+        for side in SIDES:
+            for pid in variant[side]["pitchers"]:
+                line = variant[side]["players"][f"ID{pid}"]["stats"]["pitching"]
+                parts[pid] = sum(line.get(k, 0) for k in ("atBats", "baseOnBalls", "hitByPitch",
+                                                           "sacBunts", "sacFlies"))
+        for rows in _pitching_rows(pk, variant)[0]:
+            for row in rows:
+                if row[5] != parts[row[1]]:
+                    failures.append(f"gamePk {pk}: pitcher {row[1]} bf {row[5]} "
+                                    f"without battersFaced, expected {parts[row[1]]}")
+    return failures
+
+
+def digest(calls_per_game: List[List[Call]]) -> str:
+    h = hashlib.sha256()
+    for calls in calls_per_game:
+        for fn, args in calls:
+            h.update(repr(fn(*args)).encode())
+    return h.hexdigest()[:16]
+
+
+# ─────────────────────────────────────
+#  M E A S U R E
+# ─────────────────────────────────────
+def time_calls(calls_per_game: List[List[Call]], repeat: int = REPEAT,
+               min_time: float = MIN_TIME) -> Tuple[float, float]:
+    """(games/sec, calls/sec), best of `repeat` runs of at least `min_time` each."""
+    flat = [call for calls in calls_per_game for call in calls]
+    best = float("inf")
+    gc_was_enabled = gc.isenabled()
+    gc.disable()                                  # like timeit
+    try:
+        for fn, args in flat:                     # warm-up: caches, specialisation
+            fn(*args)
+        for _ in range(repeat):
+            loops, t0 = 0, time.perf_counter()
+            while True:
+                for fn, args in flat:
+                    fn(*args)
+                loops += 1
+                elapsed = time.perf_counter() - t0
+                if elapsed >= min_time:
+                    break
+            best = min(best, elapsed / loops)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return len(calls_per_game) / best, len(flat) / best
+
+
+def measure_allocations(calls_per_game: List[List[Call]]) -> Tuple[float, float]:
+    """(bytes retained, peak bytes) per game, averaged over the games."""
+    kept: List[Any] = []
+    retained = peak = 0
+    tracemalloc.start()
+    try:
+        for calls in calls_per_game:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            kept.append([fn(*args) for fn, args in calls])
+            current, top = tracemalloc.get_traced_memory()
+            retained += current - before
+            peak += top - before
+    finally:
+        tracemalloc.stop()
+    n = len(calls_per_game) or 1
+    return retained / n, peak / n
+
+
+def run(boxes, repeat: int, min_time: float) -> Dict[str, Dict[str, Any]]:
+    results = {}
+    for name, calls_for in MAPPERS.items():
+        calls_per_game = [calls_for(pk, box) for pk, box in boxes]
+        games_per_sec, calls_per_sec = time_calls(calls_per_game, repeat, min_time)
+        retained, peak = measure_allocations(calls_per_game)
+        results[name] = {"games_per_sec": games_per_sec,
+                         "calls_per_sec": calls_per_sec,
+                         "retained_bytes": retained,
+                         "peak_bytes": peak,
+                         "digest": digest(calls_per_game)}
+    return results
+
+
+# ─────────────────────────────────────
+#  B A S E L I N E
+# ─────────────────────────────────────
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+            tolerance: float, alloc_tolerance: float) -> List[str]:
+    regressions = []
+    for name, now in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if now["digest"] != base["digest"]:
+            regressions.append(f"{name}: output changed (digest {base['digest']} → {now['digest']})")
+        if now["games_per_sec"] < base["games_per_sec"] * (1 - tolerance):
+            regressions.append(f"{name}: {now['games_per_sec']:,.0f} games/s, baseline "
+                               f"{base['games_per_sec']:,.0f} (−{tolerance:.0%} allowed)")
+        for key in ("retained_bytes", "peak_bytes"):
+            if now[key] > base[key] * (1 + alloc_tolerance) + 64:
+                regressions.append(f"{name}: {key.split('_')[0]} {now[key]:,.0f} B/game, "
+                                   f"baseline {base[key]:,.0f} (+{alloc_tolerance:.0%} allowed)")
+    return regressions
+
+
+def print_table(results: Dict[str, Dict[str, Any]],
+                baseline: Optional[Dict[str, Dict[str, Any]]]) -> None:
+    print(f"   {'mapper':<26}{'games/s':>12}{'calls/s':>13}{'µs/game':>9}"
+          f"{'kept B':>9}{'peak B':>9}{'vs base':>9}")
+    for name, r in results.items():
+        base = (baseline or {}).get(name)
+        delta = (f"{100 * (r['games_per_sec'] / base['games_per_sec'] - 1):+8.1f}%"
+                 if base else f"{'–':>9}")
+        print(f"   {name:<26}{r['games_per_sec']:>12,.0f}{r['calls_per_sec']:>13,.0f}"
+              f"{1e6 / r['games_per_sec']:>9.1f}{r['retained_bytes']:>9,.0f}"
+              f"{r['peak_bytes']:>9,.0f}{delta}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--corpus", default=None,
+                        help=f"corpus directory (default: {FIXTURE})")
+    parser.add_argument("--games", type=int, default=None, help="use only the first N games")
+    parser.add_argument("--baseline", default=None,
+                        help=f"baseline JSON (default: {BASELINE_DIR}/mappers-<corpus>.json)")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="store the current numbers as the baseline")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="allowed ops/sec drop (default: %(default)s)")
+    parser.add_argument("--alloc-tolerance", type=float, default=ALLOC_TOLERANCE,
+                        help="allowed growth of bytes per game (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--min-time", type=float, default=MIN_TIME)
+    parser.add_argument("--check-only", action="store_true",
+                        help="run the correctness checks only")
+    args = parser.parse_args()
+
+    corpus = Corpus(args.corpus or FIXTURE)
+    corpus.verify()
+    boxes = load_boxes(corpus, args.games)
+    print(f"🧪 {len(boxes)} boxscores from {corpus.path.name}")
+
+    failures = check_edge_cases() + check_schema_variants(boxes)
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        return 1
+    print(f"✅ edge cases and schema variants OK "
+          f"({min(len(boxes), VARIANT_GAMES)} games × 3 variants)")
+    if args.check_only:
+        return 0
+
+    results = run(boxes, args.repeat, args.min_time)
+    suffix = f"-{len(boxes)}" if args.games else ""
+    path = Path(args.baseline or BASELINE_DIR / f"mappers-{corpus.path.name}{suffix}.json")
+    baseline = json.loads(path.read_text()) if path.exists() else None
+    print_table(results, baseline and baseline["mappers"])
+
+    if args.update_baseline:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({
+            "corpus": corpus.path.name, "digest": corpus.digest, "games": len(boxes),
+            "python": platform.python_version(), "machine": platform.platform(),
+            "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "mappers": results,
+        }, indent=2) + "\n")
+        print(f"💾 baseline written to {path}")
+        return 0
+    if baseline is None:
+        print(f"❌ no baseline at {path} – run with --update-baseline to store one")
+        return 1
+    if baseline.get("digest") != corpus.digest:
+        print(f"❌ baseline was taken on corpus {baseline.get('digest')}, "
+              f"this is {corpus.digest}")
+        return 1
+    if baseline["games"] != len(boxes):
+        print(f"❌ baseline was taken on {baseline['games']} games, not {len(boxes)}")
+        return 1
+    if baseline.get("python") != platform.python_version():
+        print(f"⚠️  baseline is from Python {baseline.get('python')}, "
+              f"this is {platform.python_version()}")
+
+    regressions = compare(results, baseline["mappers"], args.tolerance, args.alloc_tolerance)
+    for regression in regressions:
+        print(f"❌ {regression}")
+    if regressions:
+        return 1
+    print("✅ no regressions against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,282 @@
+"""
+Offline end-to-end benchmark of the incremental loader.
+
+Replays a recorded corpus (bench/record_corpus.py) through the local
+StatsAPI stub (bench/stub_statsapi.py) into a throwaway Postgres
+(bench/local_pg.py) and runs exactly what `etl_update` runs – the ranged
+schedule collect, the ledger check and a `GamePipeline` – on a cold
+database.  No live API, no shared database: the numbers are reproducible.
+
+Each run happens in a fresh process on a fresh database and reports
+
+* throughput (games/s),
+* per-game latency p50 / p95 – from the game's boxscore request to the
+  commit of the batch holding it, plus the fetch alone (waits for the
+  rate controller included),
+* peak RSS of the loader process.
+
+    python bench/bench_pipeline.py --size day
+    python bench/bench_pipeline.py --size month --runs 5 --save bench/results/month.json
+    python bench/bench_pipeline.py --size season --latency 150 --baseline bench/results/season.json
+
+A run is compared with `--baseline`, else with the stored
+`bench/baselines/pipeline-<corpus>.json` if there is one; a baseline
+taken on a corpus with a different digest is not compared.  On a fresh
+checkout `--size day` replays the committed fixture, whose baseline is
+checked in (the timings are those of the machine that saved it).
+
+The stub answers instantly by default, so the API pace is pinned high
+(`--rps`) and the benchmark measures our side; use `--latency` to add the
+real API's round trip back in.
+"""
+import argparse
+import datetime as dt
+import json
+import multiprocessing as mp
+import os
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing, contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from corpus import BASELINE_DIR, BENCH_DIR, REPO_DIR, SIZES, Corpus, find
+from local_pg import disposable_postgres
+
+sys.path.insert(0, str(REPO_DIR / "etl"))
+from psycopg2 import connect                                        # noqa: E402
+
+from utils.baseball_stats import (ALL_STAGES, collect_final_games,   # noqa: E402
+                                  ledger_completed, safe_boxscore_data)
+from utils.pipeline import GamePipeline                              # noqa: E402
+
+BENCH_RPS = 500               # API pace ceiling: high enough to never bind on the stub
+NOISE_PCT = 2.0               # baseline deltas smaller than this are not judged
+
+
+# ─────────────────────────────────────
+#  S T U B
+# ─────────────────────────────────────
+def _free_port() -> int:
+    with closing(socket.socket()) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextmanager
+def replay_stub(corpus: Corpus, latency_ms: float = 0.0) -> Iterator[str]:
+    """Run the stub in its own process (its CPU is not ours); yield its base URL."""
+    port = _free_port()
+    proc = subprocess.Popen([sys.executable, str(BENCH_DIR / "stub_statsapi.py"),
+                             "--corpus", str(corpus.path), "--port", str(port),
+                             "--latency", str(latency_ms)],
+                            stdout=subprocess.DEVNULL)
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                break
+            except OSError:
+                if proc.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError("StatsAPI stub did not start")
+                time.sleep(0.1)
+        yield f"http://127.0.0.1:{port}/api"
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+# ─────────────────────────────────────
+#  O N E   R U N   ( child process )
+# ─────────────────────────────────────
+def _percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile; 0.0 for no values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))]
+
+
+def _peak_rss_mib() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10   # bytes vs KiB
+
+
+def run_once(dsn: str, start: dt.date, end: dt.date,
+             max_games: Optional[int]) -> Dict[str, Any]:
+    """The body of `etl_update.main`, timed per game."""
+    started: Dict[int, float] = {}
+    fetched: Dict[int, float] = {}
+    committed: Dict[int, float] = {}
+
+    def timed_fetch(gamePk: int):
+        started[gamePk] = time.perf_counter()
+        try:
+            return safe_boxscore_data(gamePk)
+        finally:
+            fetched[gamePk] = time.perf_counter()
+
+    def stamp_commit(_n: int) -> None:
+        now = time.perf_counter()
+        for gamePk in pipe.batch.loaded:
+            committed.setdefault(gamePk, now)
+
+    t0 = time.perf_counter()
+    games = {g["game_id"]: g for g in collect_final_games(start, end)}
+    with closing(connect(dsn)) as conn, conn.cursor() as cur:
+        done = ledger_completed(cur, games)
+    game_pks = [pk for pk in games if not set(ALL_STAGES) <= done.get(pk, set())]
+
+    kwargs = {"max_games": max_games} if max_games else {}
+    pipe = GamePipeline(dsn, [games[pk] for pk in game_pks], done=done,
+                        on_failure=None, on_commit=stamp_commit,
+                        fetch=timed_fetch, **kwargs)
+    batch = pipe.run()
+    stamp_commit(0)                                  # the final commit inside run()
+    seconds = time.perf_counter() - t0
+    stats = pipe.stats()
+
+    latency = [committed[pk] - started[pk] for pk in batch.loaded if pk in started]
+    fetch = [fetched[pk] - started[pk] for pk in fetched]
+    return {
+        "games": len(batch.loaded),
+        "failed": len(batch.failed),
+        "seconds": seconds,
+        "games_per_sec": len(batch.loaded) / seconds if seconds else 0.0,
+        "latency_p50_ms": 1000 * _percentile(latency, 50),
+        "latency_p95_ms": 1000 * _percentile(latency, 95),
+        "fetch_p50_ms": 1000 * _percentile(fetch, 50),
+        "fetch_p95_ms": 1000 * _percentile(fetch, 95),
+        "peak_rss_mib": _peak_rss_mib(),
+        "rows": stats["flushes"]["rows"],
+        "flushes": stats["flushes"]["flushes"],
+        "people_lookups": stats["people_lookups"],
+        "api_requests": stats["api"]["requests"],
+        "writer_starved_s": stats["starved"]["write"],
+        "fetch_blocked_s": stats["blocked"]["fetch"],
+    }
+
+
+def _child(admin_uri: Optional[str], start: dt.date, end: dt.date,
+           max_games: Optional[int]) -> Dict[str, Any]:
+    with disposable_postgres(admin_uri) as dsn:
+        return run_once(dsn, start, end, max_games)
+
+
+# ─────────────────────────────────────
+#  R E P O R T
+# ─────────────────────────────────────
+COLUMNS = (("games_per_sec", "games/s", "{:>9.1f}"),
+           ("latency_p50_ms", "p50 ms", "{:>9.0f}"),
+           ("latency_p95_ms", "p95 ms", "{:>9.0f}"),
+           ("fetch_p50_ms", "fetch p50", "{:>10.1f}"),
+           ("fetch_p95_ms", "fetch p95", "{:>10.1f}"),
+           ("peak_rss_mib", "RSS MiB", "{:>9.0f}"))
+
+
+def summarize(runs: List[Dict[str, Any]]) -> Dict[str, float]:
+    """Median of every numeric field across runs."""
+    return {k: statistics.median(r[k] for r in runs) for k in runs[0]}
+
+
+def print_table(runs: List[Dict[str, Any]], summary: Dict[str, float]) -> None:
+    header = "".join(f"{label:>{len(fmt.format(0))}}" for _, label, fmt in COLUMNS)
+    print(f"   {'run':<8}{header}")
+    for i, run in enumerate(runs, 1):
+        print(f"   {i:<8}" + "".join(fmt.format(run[k]) for k, _, fmt in COLUMNS))
+    print(f"   {'median':<8}" + "".join(fmt.format(summary[k]) for k, _, fmt in COLUMNS))
+
+
+def print_delta(summary: Dict[str, float], baseline: Dict[str, Any],
+                corpus: Corpus) -> None:
+    digest = baseline["corpus"].get("digest")
+    if digest != corpus.digest:
+        print(f"⚠️  baseline was measured on corpus {digest}, this is "
+              f"{corpus.digest} – not compared")
+        return
+    print("📊 vs baseline (median):")
+    for key, label, _ in COLUMNS:
+        old, new = baseline["summary"].get(key), summary[key]
+        if not old:
+            continue
+        change = 100 * (new - old) / old
+        better = change > 0 if key == "games_per_sec" else change < 0
+        mark = "≈" if abs(change) < NOISE_PCT else "✅" if better else "⚠️"
+        print(f"   {label:<10} {old:10.1f} → {new:10.1f}  {change:+6.1f}% {mark}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--size", choices=SIZES, default="day",
+                        help="newest recorded corpus of this size, else the committed "
+                             "fixture (default: %(default)s)")
+    source.add_argument("--corpus", default=None, help="corpus directory")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="milliseconds the stub adds to every response")
+    parser.add_argument("--rps", type=float, default=BENCH_RPS,
+                        help="API pace (start and ceiling, req/s)")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="boxscore requests in flight (default: STATSAPI_MAX_CONCURRENCY)")
+    parser.add_argument("--max-games", type=int, default=None,
+                        help="games per commit (default: GameBatch's)")
+    parser.add_argument("--pg", default=None,
+                        help="admin URI of a server for scratch databases "
+                             "(default: $BENCH_POSTGRES_URI, else a temporary cluster)")
+    parser.add_argument("--save", default=None, help="write the results as JSON here")
+    parser.add_argument("--baseline", default=None,
+                        help="results JSON of an earlier run to compare against "
+                             f"(default: {BASELINE_DIR}/pipeline-<corpus>.json if present)")
+    args = parser.parse_args()
+
+    corpus = Corpus(args.corpus or find(args.size))
+    if args.corpus:
+        corpus.verify()
+    print(f"🏟️  corpus {corpus.path.name}: {corpus.meta['games']} games "
+          f"({corpus.start} → {corpus.end}), {args.runs} runs, "
+          f"stub latency {args.latency:.0f} ms")
+
+    runs: List[Dict[str, Any]] = []
+    with replay_stub(corpus, args.latency) as base_url:
+        # inherited by the spawned runs; read lazily by utils.http_client
+        os.environ.update(STATSAPI_BASE_URL=base_url, STATSAPI_CACHE="0",
+                          STATSAPI_RPS=str(args.rps), STATSAPI_MAX_RPS=str(args.rps))
+        if args.concurrency:
+            os.environ["STATSAPI_MAX_CONCURRENCY"] = str(args.concurrency)
+        ctx = mp.get_context("spawn")
+        for i in range(args.runs):
+            # a fresh process per run: clean RSS, rate controller and caches
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                run = pool.submit(_child, args.pg, corpus.start, corpus.end,
+                                  args.max_games).result()
+            print(f"   • run {i + 1}: {run['games']} games in {run['seconds']:.1f}s"
+                  + (f", {run['failed']} failed" if run["failed"] else ""))
+            runs.append(run)
+
+    summary = summarize(runs)
+    print_table(runs, summary)
+    baseline = Path(args.baseline or BASELINE_DIR / f"pipeline-{corpus.path.name}.json")
+    if args.baseline or baseline.exists():
+        print_delta(summary, json.loads(baseline.read_text()), corpus)
+    if args.save:
+        Path(args.save).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.save).write_text(json.dumps({
+            "corpus": {"name": corpus.path.name, "digest": corpus.digest,
+                       **{k: v for k, v in corpus.meta.items() if k != "files"}},
+            "settings": {k: v for k, v in vars(args).items()
+                         if k in ("runs", "latency", "rps", "concurrency", "max_games")},
+            "runs": runs,
+            "summary": summary,
+        }, indent=2) + "\n")
+        print(f"💾 results saved to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
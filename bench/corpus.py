@@ -0,0 +1,188 @@
+"""
+Recorded StatsAPI responses for the offline benchmarks.
+
+A corpus is one directory (by default `bench/corpus/<name>/`):
+
+    meta.json               window, game count, where / when it was recorded,
+                            and the sha256 of every file below
+    schedule.json.gz        the raw `dates` entries of /v1/schedule
+    boxscore/<pk>.json.gz   raw /v1/game/{pk}/boxscore, one file per game
+    people.json.gz          person id → raw /v1/people record
+
+Responses are stored taken apart (schedule by date, people by id) rather
+than per URL, so the stub can answer any date range or `personIds` batch
+the loaders happen to ask for – changing a chunk size must not invalidate
+the recording.  Boxscores are kept whole, one decoded response per game.
+
+The checksums pin a corpus: `verify()` (run by `find()`) refuses one whose
+files were changed, added or removed, and `digest` names its exact
+content, so benchmark results and baselines record which input they were
+measured on.  Recordings under `bench/corpus/` stay out of git; the small
+corpus in `bench/fixtures/` is committed (it is synthetic – generated
+offline, not recorded from the live API) so the checked-in baselines in
+`bench/baselines/` always have the same input.
+"""
+import calendar
+import datetime as dt
+import gzip
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+BENCH_DIR  = Path(__file__).resolve().parent
+REPO_DIR   = BENCH_DIR.parent
+CORPUS_DIR = BENCH_DIR / "corpus"
+FIXTURE_DIR = BENCH_DIR / "fixtures"
+FIXTURE    = FIXTURE_DIR / "day-2025-06-14"   # committed; the baselines' input
+BASELINE_DIR = BENCH_DIR / "baselines"
+
+SIZES = ("day", "month", "season")
+DEFAULT_DATE = dt.date(2025, 6, 14)       # a busy regular-season Saturday
+
+
+def window(size: str, anchor: dt.date = DEFAULT_DATE) -> Tuple[dt.date, dt.date]:
+    """First and last date a corpus of `size` around `anchor` covers."""
+    if size == "day":
+        return anchor, anchor
+    if size == "month":
+        last = calendar.monthrange(anchor.year, anchor.month)[1]
+        return anchor.replace(day=1), anchor.replace(day=last)
+    if size == "season":                  # same window as safe_get_schedule
+        return dt.date(anchor.year, 3, 1), dt.date(anchor.year, 11, 30)
+    raise ValueError(f"unknown corpus size {size!r} (one of {', '.join(SIZES)})")
+
+
+def default_name(size: str, anchor: dt.date = DEFAULT_DATE) -> str:
+    return {"day": f"day-{anchor}",
+            "month": f"month-{anchor:%Y-%m}",
+            "season": f"season-{anchor.year}"}[size]
+
+
+def find(size: str) -> Path:
+    """
+    The most recently recorded corpus of `size` under `CORPUS_DIR`, else
+    the committed fixture of that size; verified against its checksums.
+    """
+    found = sorted((p for p in CORPUS_DIR.glob(f"{size}-*") if (p / "meta.json").exists()),
+                   key=lambda p: (p / "meta.json").stat().st_mtime)
+    if not found:
+        found = sorted(p for p in FIXTURE_DIR.glob(f"{size}-*")
+                       if (p / "meta.json").exists())
+    if not found:
+        raise FileNotFoundError(
+            f"no {size} corpus in {CORPUS_DIR} – record one first:\n"
+            f"    python bench/record_corpus.py --size {size}")
+    Corpus(found[-1]).verify()
+    return found[-1]
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _read_gz(path: Path) -> bytes:
+    with gzip.open(path, "rb") as f:
+        return f.read()
+
+
+def _write_gz(path: Path, data: bytes) -> None:
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with gzip.open(tmp, "wb", compresslevel=6) as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class Corpus:
+    """Read / write access to one corpus directory."""
+
+    def __init__(self, path: "str | Path"):
+        self.path = Path(path)
+        self._meta: Optional[Dict[str, Any]] = None
+
+    # ─── reading ───────────────────────────────────────────────────────
+    @property
+    def meta(self) -> Dict[str, Any]:
+        if self._meta is None:
+            self._meta = json.loads((self.path / "meta.json").read_text())
+        return self._meta
+
+    @property
+    def start(self) -> dt.date:
+        return dt.date.fromisoformat(self.meta["start"])
+
+    @property
+    def end(self) -> dt.date:
+        return dt.date.fromisoformat(self.meta["end"])
+
+    def schedule_dates(self) -> List[Dict[str, Any]]:
+        return json.loads(_read_gz(self.path / "schedule.json.gz"))
+
+    def people(self) -> Dict[int, Dict[str, Any]]:
+        return {int(pid): p for pid, p in
+                json.loads(_read_gz(self.path / "people.json.gz")).items()}
+
+    def boxscore_bytes(self, gamePk: int) -> Optional[bytes]:
+        path = self.path / "boxscore" / f"{gamePk}.json.gz"
+        return _read_gz(path) if path.exists() else None
+
+    def boxscore(self, gamePk: int) -> Optional[Dict[str, Any]]:
+        data = self.boxscore_bytes(gamePk)
+        return json.loads(data) if data is not None else None
+
+    def game_pks(self) -> List[int]:
+        return sorted(int(p.name.split(".")[0])
+                      for p in (self.path / "boxscore").glob("*.json.gz"))
+
+    # ─── pinning ───────────────────────────────────────────────────────
+    def checksums(self) -> Dict[str, str]:
+        """sha256 of every data file, by path relative to the corpus."""
+        files = [self.path / "schedule.json.gz", self.path / "people.json.gz",
+                 *sorted((self.path / "boxscore").glob("*.json.gz"))]
+        return {p.relative_to(self.path).as_posix(): _sha256(p)
+                for p in files if p.exists()}
+
+    @property
+    def digest(self) -> str:
+        """Short id of the pinned content – equal digests, equal input."""
+        pins = self.meta.get("files", {})
+        blob = "".join(f"{name} {sha}\n" for name, sha in sorted(pins.items()))
+        return hashlib.sha256(blob.encode()).hexdigest()[:16]
+
+    def verify(self) -> None:
+        """Raise ValueError unless the files are exactly the pinned ones."""
+        pinned = self.meta.get("files")
+        if not pinned:
+            raise ValueError(f"{self.path} has no checksums in meta.json – "
+                             f"record it again with bench/record_corpus.py")
+        actual = self.checksums()
+        bad = sorted(name for name in set(pinned) | set(actual)
+                     if pinned.get(name) != actual.get(name))
+        if bad:
+            raise ValueError(f"{self.path} does not match its checksums: "
+                             f"{', '.join(bad[:5])}" + (" …" if len(bad) > 5 else ""))
+
+    # ─── writing ───────────────────────────────────────────────────────
+    def create(self) -> None:
+        (self.path / "boxscore").mkdir(parents=True, exist_ok=True)
+
+    def write_schedule(self, dates: List[Dict[str, Any]]) -> None:
+        _write_gz(self.path / "schedule.json.gz", json.dumps(dates).encode())
+
+    def write_boxscore(self, gamePk: int, data: bytes) -> None:
+        _write_gz(self.path / "boxscore" / f"{gamePk}.json.gz", data)
+
+    def write_people(self, people: Iterable[Dict[str, Any]]) -> None:
+        _write_gz(self.path / "people.json.gz",
+                  json.dumps({str(p["id"]): p for p in people}).encode())
+
+    def write_meta(self, **meta: Any) -> None:
+        """Write meta.json, pinning the files written so far – call it last."""
+        meta["files"] = self.checksums()
+        self._meta = meta
+        (self.path / "meta.json").write_text(json.dumps(meta, indent=2) + "\n")
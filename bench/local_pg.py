@@ -0,0 +1,121 @@
+"""
+A throwaway Postgres database with the BeatTheHouse schema, for benchmarks.
+
+Two ways to get one, tried in this order:
+
+1. `BENCH_POSTGRES_URI` (or `admin_uri`) names a server we may create
+   databases on – a scratch `bth_bench_<pid>_<n>` database is created
+   there and dropped afterwards.
+2. Otherwise a private cluster is started with `initdb` / `pg_ctl` (from
+   `PG_BIN`, `$PATH` or `pg_config --bindir`) in a temporary directory,
+   listening on a Unix socket only, and deleted afterwards.
+
+Either way `db/baseball_create.sql` is applied to an empty database, so
+every run starts cold: no players, no ledger.
+
+>>> with disposable_postgres() as dsn:
+...     run_benchmark(dsn)
+"""
+import itertools
+import os
+import shutil
+import subprocess
+import tempfile
+from contextlib import closing, contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+from psycopg2 import connect
+
+from corpus import REPO_DIR
+
+SCHEMA = REPO_DIR / "db" / "baseball_create.sql"
+
+_scratch = itertools.count(1)
+
+
+def apply_schema(dsn: str) -> None:
+    with closing(connect(dsn)) as conn, conn.cursor() as cur:
+        cur.execute(SCHEMA.read_text())
+        conn.commit()
+
+
+@contextmanager
+def disposable_postgres(admin_uri: Optional[str] = None) -> Iterator[str]:
+    """Yield the DSN of an empty database with the schema applied."""
+    admin_uri = admin_uri or os.getenv("BENCH_POSTGRES_URI")
+    factory = _scratch_database(admin_uri) if admin_uri else _temp_cluster()
+    with factory as dsn:
+        apply_schema(dsn)
+        yield dsn
+
+
+# ─────────────────────────────────────
+#  E X I S T I N G   S E R V E R
+# ─────────────────────────────────────
+def _with_database(uri: str, dbname: str) -> str:
+    parts = urlsplit(uri)
+    return urlunsplit(parts._replace(path=f"/{dbname}"))
+
+
+@contextmanager
+def _scratch_database(admin_uri: str) -> Iterator[str]:
+    name = f"bth_bench_{os.getpid()}_{next(_scratch)}"
+    admin = connect(admin_uri)
+    admin.autocommit = True
+    try:
+        with admin.cursor() as cur:
+            cur.execute(f"CREATE DATABASE {name};")
+        try:
+            yield _with_database(admin_uri, name)
+        finally:
+            with admin.cursor() as cur:
+                cur.execute(f"DROP DATABASE IF EXISTS {name} WITH (FORCE);")
+    finally:
+        admin.close()
+
+
+# ─────────────────────────────────────
+#  T E M P O R A R Y   C L U S T E R
+# ─────────────────────────────────────
+def _pg_bin(tool: str) -> str:
+    if os.getenv("PG_BIN"):
+        return str(Path(os.environ["PG_BIN"]) / tool)
+    found = shutil.which(tool)
+    if found:
+        return found
+    pg_config = shutil.which("pg_config")
+    if pg_config:
+        bindir = subprocess.run([pg_config, "--bindir"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+        if (Path(bindir) / tool).exists():
+            return str(Path(bindir) / tool)
+    raise RuntimeError(f"{tool} not found – install the Postgres server binaries, "
+                       "set PG_BIN, or point BENCH_POSTGRES_URI at a server")
+
+
+@contextmanager
+def _temp_cluster() -> Iterator[str]:
+    root = Path(tempfile.mkdtemp(prefix="bth-bench-pg-"))
+    data, log = root / "data", root / "postgres.log"
+    try:
+        try:
+            subprocess.run([_pg_bin("initdb"), "-D", str(data), "-U", "postgres",
+                            "-A", "trust", "-E", "UTF8", "--no-sync"],
+                           check=True, capture_output=True)
+            subprocess.run([_pg_bin("pg_ctl"), "-D", str(data), "-l", str(log), "-w",
+                            "-o", f"-k {root} -c listen_addresses=''", "start"],
+                           check=True, capture_output=True)
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"could not start a temporary Postgres: "
+                               f"{(e.stderr or b'').decode().strip()}") from e
+        try:
+            admin_uri = f"postgresql://postgres@/postgres?host={root}"
+            with _scratch_database(admin_uri) as dsn:
+                yield dsn
+        finally:
+            subprocess.run([_pg_bin("pg_ctl"), "-D", str(data), "-m", "fast",
+                            "-w", "stop"], capture_output=True)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
@@ -0,0 +1,116 @@
+"""
+Record a StatsAPI corpus for the offline benchmarks (see bench/corpus.py).
+
+Downloads, through the loaders' own HTTP client (retries, adaptive pacing,
+`STATSAPI_BASE_URL`), everything `etl_update` asks for in the window:
+
+* the schedule of every day,
+* the boxscore of every finished game,
+* the /people record of every player on those boxscores.
+
+    python bench/record_corpus.py --size day                 # 2025-06-14
+    python bench/record_corpus.py --size month --date 2025-06-01
+    python bench/record_corpus.py --size season --date 2025-01-01
+
+Recording is the only step that needs the network.  Each recording is a
+new snapshot of the live API, so meta.json pins the files it wrote by
+sha256 and results are only compared across one corpus digest – to
+benchmark the same input on another machine, copy the directory rather
+than recording again.  Recordings are ignored by git; the committed
+fixture in bench/fixtures/ is what the checked-in baselines measure.
+"""
+import argparse
+import datetime as dt
+import json
+import os
+import sys
+import time
+
+from corpus import (CORPUS_DIR, DEFAULT_DATE, REPO_DIR, SIZES, Corpus,
+                    default_name, window)
+
+sys.path.insert(0, str(REPO_DIR / "etl"))
+from utils.baseball_stats import (FINAL_STATUSES, SCHEDULE_CHUNK_DAYS,   # noqa: E402
+                                  boxscore_from_raw, box_player_ids)
+from utils.fetcher import iter_boxscores                                  # noqa: E402
+from utils.http_client import get_json                                    # noqa: E402
+
+PEOPLE_BATCH = 100            # ids per /people request
+
+
+def record_schedule(start: dt.date, end: dt.date):
+    dates = {}
+    chunk = dt.timedelta(days=SCHEDULE_CHUNK_DAYS)
+    lo = start
+    while lo <= end:
+        hi = min(lo + chunk - dt.timedelta(days=1), end)
+        raw = get_json("v1/schedule", {"sportId": 1, "startDate": str(lo),
+                                       "endDate": str(hi)})
+        for day in raw.get("dates", []):
+            dates[day["date"]] = day
+        lo = hi + dt.timedelta(days=1)
+    return [dates[d] for d in sorted(dates)]
+
+
+def final_game_pks(dates) -> list:
+    return sorted({g["gamePk"] for day in dates for g in day["games"]
+                   if g["status"]["detailedState"].startswith(FINAL_STATUSES)})
+
+
+def _fetch_raw(gamePk: int):
+    return get_json(f"v1/game/{gamePk}/boxscore", label=f"gamePk {gamePk}")
+
+
+def record(corpus: Corpus, start: dt.date, end: dt.date) -> None:
+    corpus.create()
+    t0 = time.perf_counter()
+
+    dates = record_schedule(start, end)
+    corpus.write_schedule(dates)
+    game_pks = final_game_pks(dates)
+    print(f"🗓️  {len(dates)} days, {len(game_pks)} finished games ({start} → {end})")
+
+    player_ids = set()
+    recorded = 0
+    for gamePk, raw in iter_boxscores(game_pks, fetch=_fetch_raw):
+        if raw is None:
+            continue                                   # already reported
+        corpus.write_boxscore(gamePk, json.dumps(raw).encode())
+        player_ids.update(box_player_ids(boxscore_from_raw(raw)))
+        recorded += 1
+        if recorded % 100 == 0:
+            print(f"   • {recorded}/{len(game_pks)} boxscores …")
+
+    people = []
+    ids = sorted(player_ids)
+    for i in range(0, len(ids), PEOPLE_BATCH):
+        batch = ",".join(map(str, ids[i:i + PEOPLE_BATCH]))
+        people.extend(get_json("v1/people", {"personIds": batch},
+                               label="[people]").get("people", []))
+    corpus.write_people(people)
+
+    corpus.write_meta(start=str(start), end=str(end), games=recorded,
+                      players=len(people),
+                      source=os.getenv("STATSAPI_BASE_URL", "https://statsapi.mlb.com/api"),
+                      recorded_at=dt.datetime.now().isoformat(timespec="seconds"))
+    print(f"✅ {recorded} boxscores and {len(people)} people recorded to "
+          f"{corpus.path} in {time.perf_counter() - t0:.0f}s (digest {corpus.digest})")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--size", choices=SIZES, default="day")
+    parser.add_argument("--date", type=dt.date.fromisoformat, default=DEFAULT_DATE,
+                        help="a date inside the window (default: %(default)s)")
+    parser.add_argument("--out", default=None,
+                        help=f"corpus directory (default: {CORPUS_DIR}/<size>-<date>)")
+    args = parser.parse_args()
+
+    os.environ.setdefault("STATSAPI_CACHE", "0")      # record what the API says now
+    start, end = window(args.size, args.date)
+    record(Corpus(args.out or CORPUS_DIR / default_name(args.size, args.date)),
+           start, end)
+
+
+if __name__ == "__main__":
+    main()
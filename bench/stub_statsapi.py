@@ -0,0 +1,129 @@
+"""
+Local StatsAPI stand-in that replays a recorded corpus (bench/corpus.py).
+
+Serves the three endpoints the loaders use, under the same paths as
+statsapi.mlb.com, so pointing `STATSAPI_BASE_URL` at it is all a loader
+needs:
+
+    /api/v1/schedule?sportId=1&startDate=…&endDate=…   any range in the corpus
+    /api/v1/schedule?sportId=1&gamePks=a,b,…            any subset of games
+    /api/v1/game/{gamePk}/boxscore                      404 if not recorded
+    /api/v1/people?personIds=a,b,…                      any subset of ids
+
+`--latency` adds a fixed delay per request to mimic the real API; by
+default the stub answers as fast as it can, so a benchmark measures our
+side of the pipeline.  HTTP/1.1 keep-alive, like the real API.
+
+    python bench/stub_statsapi.py --corpus bench/corpus/day-2025-06-14 --port 8765
+    STATSAPI_BASE_URL=http://127.0.0.1:8765/api python etl/etl_update.py
+"""
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from corpus import Corpus
+
+BOXSCORE_PATH = re.compile(r"^/api/v1/game/(\d+)/boxscore$")
+
+
+class ReplayServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], corpus: Corpus, latency: float = 0.0):
+        super().__init__(address, ReplayHandler)
+        self.corpus = corpus
+        self.latency = latency
+        self.dates = corpus.schedule_dates()
+        self.people = corpus.people()
+        self.requests: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def count(self, endpoint: str) -> None:
+        with self._lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+
+    # ─── endpoints ─────────────────────────────────────────────────────
+    def schedule(self, query: Dict[str, str]) -> Dict[str, Any]:
+        lo, hi = query.get("startDate", ""), query.get("endDate", "9999")
+        dates = [d for d in self.dates if lo <= d["date"] <= hi]
+        if "gamePks" in query:
+            pks = {int(pk) for pk in query["gamePks"].split(",") if pk}
+            dates = [dict(d, games=[g for g in d["games"] if g["gamePk"] in pks])
+                     for d in dates]
+            dates = [d for d in dates if d["games"]]
+        return {"totalGames": sum(len(d["games"]) for d in dates), "dates": dates}
+
+    def people_of(self, query: Dict[str, str]) -> Dict[str, Any]:
+        ids = [int(i) for i in query.get("personIds", "").split(",") if i]
+        return {"people": [self.people[i] for i in ids if i in self.people]}
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: ReplayServer
+
+    def log_message(self, *args) -> None:           # one line per request is noise
+        pass
+
+    def do_GET(self) -> None:
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        body: Optional[bytes] = None
+
+        match = BOXSCORE_PATH.match(url.path)
+        if match:
+            endpoint = "boxscore"
+            body = self.server.corpus.boxscore_bytes(int(match.group(1)))
+        elif url.path == "/api/v1/schedule":
+            endpoint = "schedule"
+            body = json.dumps(self.server.schedule(query)).encode()
+        elif url.path == "/api/v1/people":
+            endpoint = "people"
+            body = json.dumps(self.server.people_of(query)).encode()
+        else:
+            endpoint = "other"
+        self.server.count(endpoint)
+
+        if body is None:
+            self._send(404, json.dumps({"message": f"not in corpus: {url.path}"}).encode())
+        else:
+            self._send(200, body)
+
+    def _send(self, status: int, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json;charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--corpus", required=True, help="recorded corpus directory")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="milliseconds added to every response")
+    args = parser.parse_args()
+
+    corpus = Corpus(args.corpus)
+    server = ReplayServer((args.host, args.port), corpus, args.latency / 1000)
+    print(f"⚾ replaying {corpus.meta['games']} games ({corpus.start} → {corpus.end}) "
+          f"on http://{args.host}:{server.server_port}/api", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -258,4 +258,67 @@ CREATE TABLE IF NOT EXISTS game_odds (
     -- ------------- convenience flags -----
     created_at           TIMESTAMPTZ DEFAULT now(),
     PRIMARY KEY (gamePk, source_id)
-);
\ No newline at end of file
+);
+
+/* ─────────── DERIVED – implied / no-vig probabilities per odds row ─────────── */
+CREATE TABLE IF NOT EXISTS game_odds_derived (
+    gamePk               BIGINT,
+    source_id            SMALLINT,
+    -- ------------- money-line -------------
+    away_ml_implied      NUMERIC(6,5),
+    home_ml_implied      NUMERIC(6,5),
+    ml_overround         NUMERIC(6,5),           -- book margin
+    away_ml_fair         NUMERIC(6,5),           -- no-vig
+    home_ml_fair         NUMERIC(6,5),
+    -- ------------- run line --------------
+    away_rl_implied      NUMERIC(6,5),
+    home_rl_implied      NUMERIC(6,5),
+    rl_overround         NUMERIC(6,5),
+    away_rl_fair         NUMERIC(6,5),
+    home_rl_fair         NUMERIC(6,5),
+    -- ------------- totals -----------------
+    over_implied         NUMERIC(6,5),
+    under_implied        NUMERIC(6,5),
+    total_overround      NUMERIC(6,5),
+    over_fair            NUMERIC(6,5),
+    under_fair           NUMERIC(6,5),
+    computed_at          TIMESTAMPTZ DEFAULT now(),
+    PRIMARY KEY (gamePk, source_id),
+    FOREIGN KEY (gamePk, source_id)
+        REFERENCES game_odds (gamePk, source_id) ON DELETE CASCADE
+);
+
+-- ─────────────────────────────
+--  ETL BOOKKEEPING
+-- ─────────────────────────────
+/* one row per finished (game, load stage) → loaders skip completed work */
+CREATE TABLE IF NOT EXISTS load_ledger (
+    gamePk        BIGINT,
+    stage         TEXT,                   -- 'game', 'team_box', 'batting', …
+    completed_at  TIMESTAMPTZ DEFAULT now(),
+    PRIMARY KEY (gamePk, stage)
+);
+
+/* one row per loaded source file → refreshes skip files whose content is unchanged */
+CREATE TABLE IF NOT EXISTS savant_file_manifest (
+    table_name    TEXT,
+    file_path     TEXT,
+    content_md5   CHAR(32),
+    row_count     INTEGER,
+    loaded_at     TIMESTAMPTZ DEFAULT now(),
+    PRIMARY KEY (table_name, file_path)
+);
+
+/* dead-letter queue – games that failed to load, retried by etl_retry.py */
+CREATE TABLE IF NOT EXISTS game_retry (
+    gamePk           BIGINT PRIMARY KEY,
+    error_class      TEXT,
+    error_msg        TEXT,
+    attempts         SMALLINT DEFAULT 1,
+    first_failed_at  TIMESTAMPTZ DEFAULT now(),
+    last_failed_at   TIMESTAMPTZ DEFAULT now(),
+    next_attempt_at  TIMESTAMPTZ,
+    gave_up          BOOLEAN DEFAULT FALSE      -- attempts exhausted
+);
+CREATE INDEX IF NOT EXISTS game_retry_due_idx
+    ON game_retry (next_attempt_at) WHERE NOT gave_up;
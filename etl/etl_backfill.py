@@ -0,0 +1,263 @@
+"""
+Multi-process historical backfill of the per-game stats tables.
+
+gamePks are sharded by season and the shards are spread across a process
+pool.  Each worker runs a `GamePipeline` on its own connection, fetching
+its games with the concurrent fetcher and writing the `game` row and every stats table from
+that one fetch; the coordinator aggregates progress and failures from every
+worker.
+
+Sharding is per season on purpose: `process_player_teams` extends
+(player, season, team) stints with a read-then-write, so two workers must
+never touch the same season at the same time.  The shared `player`
+dimension is written on a second, autocommit connection per worker.
+Games the load ledger lists as complete are skipped, so a rerun after a
+crash only does the remaining work.
+
+With `--player-team rebuild` the workers skip per-game stint maintenance
+and `player_team` is rebuilt from the fact tables in one SQL pass at the
+end.
+
+Each worker paces its StatsAPI calls with the adaptive rate controller
+(utils.http_client); `--rps` / `--concurrency` only set ceilings for it.
+With `--metrics-port P` the coordinator exports Prometheus metrics on P
+and worker n on P + n (utils.metrics).  `--profile` / `--profile-sample`
+time every stage in every worker and print one combined table at the end
+(utils.profiling).
+
+    python etl_backfill.py --start-year 2013 --end-year 2025 --workers 6 --rps 30
+"""
+import argparse
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import closing
+from typing import Any, Dict, List, Optional, Set
+
+from psycopg2 import connect
+from dotenv import load_dotenv
+
+from utils.baseball_stats import *
+from utils import metrics, profiling
+from utils.http_client import rate_controller
+from utils.pipeline import GamePipeline
+
+load_dotenv()
+DSN = os.getenv("POSTGRES_URI")
+
+
+# ─────────────────────────────────────
+#  S H A R D S
+# ─────────────────────────────────────
+def season_games(year: int) -> List[Dict[str, Any]]:
+    """Final games between two known clubs (schedule dicts), by gamePk."""
+    games = {
+        g["game_id"]: g
+        for g in safe_get_schedule(year)
+        if g["status"] == "Final" and is_club_game(g)
+    }
+    return [games[pk] for pk in sorted(games)]
+
+
+# ─────────────────────────────────────
+#  W O R K E R
+# ─────────────────────────────────────
+def _init_worker(metrics_port: Optional[int], slot,
+                 profile: Dict[str, Any]) -> None:
+    """
+    Pool initializer: each worker exports its own metrics on port + n and
+    profiles like the coordinator was told to.
+    """
+    profiling.configure(**profile)
+    if metrics_port is None:
+        return
+    with slot.get_lock():
+        slot.value += 1
+        n = slot.value
+    metrics.serve(metrics_port + n)
+
+
+def load_shard(dsn: str,
+               season: int,
+               games: List[Dict[str, Any]],
+               done: Dict[int, Set[str]],
+               skip_stages: Set[str],
+               concurrency: Optional[int],
+               rps: Optional[float],
+               progress) -> Dict[str, Any]:
+    """
+    Load one season shard with a `GamePipeline`.  `done` holds the ledger
+    stages already completed for partially loaded games; `skip_stages` are
+    left to the coordinator for every game.  Returns a summary dict;
+    progress (per commit) and failures are pushed to the coordinator via
+    `progress`.  `concurrency` / `rps` cap this worker's rate controller.
+    """
+    rate_controller().configure(max_rate=rps, max_concurrency=concurrency)
+    pipe = GamePipeline(dsn, games, done=done, skip_stages=skip_stages,
+                        concurrency=concurrency,
+                        player_autocommit=True,   # shared `player` rows: short locks
+                        on_failure=lambda pk, e: progress.put(
+                            ("error", season, pk, repr(e))),
+                        on_commit=lambda n: progress.put(
+                            ("progress", season, n, len(games))))
+    batch = pipe.run()
+    stats = pipe.stats()
+    flushes = dict(stats["flushes"], people_lookups=stats["people_lookups"],
+                   api_rate=stats["api"]["rate"])
+
+    progress.put(("progress", season, len(games), len(games)))
+    return {"season": season, "loaded": len(batch.loaded),
+            "failed": sorted(batch.failed), "flushes": flushes,
+            "profile": profiling.snapshot(reset=True)}
+
+
+# ─────────────────────────────────────
+#  C O O R D I N A T O R
+# ─────────────────────────────────────
+def _report_progress(progress, shard_sizes: Dict[int, int], stop: threading.Event) -> None:
+    done = {season: 0 for season in shard_sizes}
+    total = sum(shard_sizes.values())
+    last_print = 0.0
+    while not stop.is_set() or not progress.empty():
+        try:
+            kind, season, *rest = progress.get(timeout=0.5)
+        except queue.Empty:
+            continue
+        if kind == "error":
+            gamePk, err = rest
+            print(f"💥  [{season}] gamePk {gamePk} failed – {err}")
+            continue
+        done[season] = rest[0]
+        now = time.monotonic()
+        if now - last_print > 5 or rest[0] == rest[1]:
+            last_print = now
+            print(f"🔄 {sum(done.values())}/{total} games "
+                  f"({sum(1 for s in done if done[s] == shard_sizes[s])}/"
+                  f"{len(done)} seasons done)")
+
+
+def run_backfill(dsn: str,
+                 years: List[int],
+                 workers: int,
+                 concurrency: Optional[int] = None,
+                 total_rps: Optional[float] = None,
+                 player_team_mode: str = "incremental",
+                 metrics_port: Optional[int] = None) -> Dict[str, Any]:
+    shards = {year: season_games(year) for year in years}
+
+    # ─── consult the ledger: drop finished games, remember partial ones ──
+    with closing(connect(dsn)) as conn, conn.cursor() as cur:
+        done = ledger_completed(cur, [g["game_id"] for gs in shards.values() for g in gs])
+    complete = {pk for pk, stages in done.items() if set(ALL_STAGES) <= stages}
+    shards = {year: [g for g in gs if g["game_id"] not in complete]
+              for year, gs in shards.items()}
+    shards = {year: gs for year, gs in shards.items() if gs}
+    if complete:
+        print(f"⏭️  {len(complete)} games already loaded according to the ledger")
+    if not shards:
+        print("✅ Nothing left to backfill for the requested seasons.")
+        return {"loaded": 0, "failed": []}
+
+    workers = max(1, min(workers, len(shards)))
+    # API budget is global: each worker's controller adapts below its share
+    per_worker_rps = total_rps / workers if total_rps else None
+    print(f"🚀 Backfilling {sum(map(len, shards.values()))} games in "
+          f"{len(shards)} seasons on {workers} workers "
+          + (f"(≤ {per_worker_rps:.1f} req/s each) …" if per_worker_rps
+             else "(adaptive API pacing) …"))
+
+    skip_stages = {"player_team"} if player_team_mode == "rebuild" else set()
+    loaded, failed = 0, []
+    with mp.Manager() as manager:
+        progress = manager.Queue()
+        stop = threading.Event()
+        reporter = threading.Thread(target=_report_progress,
+                                    args=(progress, {y: len(p) for y, p in shards.items()}, stop),
+                                    daemon=True)
+        reporter.start()
+
+        # spawn: workers start clean – no inherited sessions or metric values
+        ctx = mp.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                                 initializer=_init_worker,
+                                 initargs=(metrics_port, ctx.Value("i", 0),
+                                           profiling.settings())) as pool:
+            # biggest seasons first → better packing of the pool
+            futures = {
+                pool.submit(load_shard, dsn, year, gs,
+                            {g["game_id"]: done[g["game_id"]]
+                             for g in gs if g["game_id"] in done},
+                            skip_stages, concurrency, per_worker_rps,
+                            progress): year
+                for year, gs in sorted(shards.items(), key=lambda kv: -len(kv[1]))
+            }
+            for fut in as_completed(futures):
+                year = futures[fut]
+                try:
+                    summary = fut.result()
+                except Exception as e:                # worker crashed outright
+                    print(f"💥  season {year} worker died – {e!r}")
+                    failed.extend(g["game_id"] for g in shards[year])
+                    continue
+                loaded += summary["loaded"]
+                profiling.merge(summary["profile"])
+                failed.extend(summary["failed"])
+                fl = summary["flushes"]
+                print(f"✅ season {year}: {summary['loaded']} loaded, "
+                      f"{len(summary['failed'])} failed "
+                      f"({fl['rows']} rows in {fl['flushes']} flushes, "
+                      f"{fl['rows_per_sec']:.0f} rows/s, "
+                      f"API at {fl['api_rate']:.1f} req/s, "
+                      f"{fl['people_lookups']} people lookups)")
+
+        stop.set()
+        reporter.join()
+
+    if player_team_mode == "rebuild":
+        with closing(connect(dsn)) as conn, conn.cursor() as cur:
+            stints = rebuild_player_team(cur, shards.keys())
+            conn.commit()
+        print(f"🔁 player_team rebuilt for {len(shards)} seasons ({stints} stints)")
+
+    return {"loaded": loaded, "failed": sorted(failed)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--start-year", type=int, default=2013)
+    parser.add_argument("--end-year", type=int, default=2025)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes (one DB connection each)")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="ceiling for boxscore requests in flight per worker "
+                             "(default: STATSAPI_MAX_CONCURRENCY)")
+    parser.add_argument("--rps", type=float, default=None,
+                        help="ceiling for total StatsAPI requests/second across "
+                             "all workers (default: STATSAPI_MAX_RPS each)")
+    parser.add_argument("--player-team", choices=("incremental", "rebuild"),
+                        default="incremental",
+                        help="maintain player_team per batch, or rebuild it "
+                             "from the fact tables once at the end")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="serve Prometheus metrics here, workers on the "
+                             "following ports (default: $ETL_METRICS_PORT)")
+    profiling.add_arguments(parser)
+    args = parser.parse_args()
+    profiling.configure_from_args(args)
+
+    metrics_port = metrics.serve(args.metrics_port)
+    result = run_backfill(DSN, list(range(args.start_year, args.end_year + 1)),
+                          args.workers, args.concurrency, args.rps,
+                          args.player_team, metrics_port)
+    print(f"🏁 Backfill complete: {result['loaded']} games loaded, "
+          f"{len(result['failed'])} failed.")
+    if result["failed"]:
+        print("   failed gamePks:", ", ".join(map(str, result["failed"])))
+    profiling.report()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,68 +1,89 @@
-from utils.baseball_stats import * 
-import psycopg2
-from psycopg2.extras import execute_values
-from dotenv import load_dotenv
+"""
+Single-pass season loader: `game` rows and every per-game stats table.
+
+Each finished game's boxscore is downloaded once and feeds both the `game`
+row (schedule + `gameBoxInfo` weather / wind / attendance) and team_box,
+fielding, pitching, batting, player_team and player.  Rows are buffered in
+a `RowAccumulator` and committed in bounded `GameBatch`es by a
+`GamePipeline` (fetch, mapping and writes overlapped), so memory stays
+flat however long the season is.  Games the load ledger lists as complete
+are skipped, so a rerun after a crash only does the remaining work.
+
+    python etl_game.py --start-year 2024 --end-year 2025
+"""
+import argparse
 import os
-import time
-import requests
+from contextlib import closing
+from typing import Any, Dict, List
+
+from psycopg2 import connect
+from dotenv import load_dotenv
+
+from utils.baseball_stats import *
+from utils import metrics, profiling
+from utils.game_batch import GameBatch
+from utils.pipeline import GamePipeline
 
 load_dotenv()
 DSN: str = os.environ["POSTGRES_URI"]
 
 
-def insert_games(conn, games):
-    query = """
-        INSERT INTO game (
-            gamePk, season_year, game_date, venue,
-            home_team_id, away_team_id, first_pitch_ts,
-            attendance, weather_temp_f, wind_mph,
-            home_score, away_score
-        )
-        VALUES %s
-        ON CONFLICT (gamePk) DO NOTHING;
-    """
-    with conn.cursor() as cur:
-        execute_values(cur, query, games)
-    conn.commit()
+def season_finals(year: int) -> List[Dict[str, Any]]:
+    """Final games between two known clubs, one schedule dict per gamePk."""
+    finals: Dict[int, Dict[str, Any]] = {}
+    for game in safe_get_schedule(year):
+        if game['status'] != "Final":
+            continue
+        if not is_club_game(game):
+            continue
+        finals.setdefault(game['game_id'], game)
+    return [finals[pk] for pk in sorted(finals)]
+
+
+def load_season(cur, year: int) -> GameBatch:
+    games = season_finals(year)
+
+    # skip games a previous (interrupted) run already loaded
+    done = ledger_completed(cur, [g['game_id'] for g in games])
+    games = [g for g in games
+             if not set(ALL_STAGES) <= done.get(g['game_id'], set())]
+    print(f"🔄 {year}: loading {len(games)} games …")
+
+    pipe = GamePipeline(DSN, games, done=done,
+                        on_commit=lambda n: print(
+                            f"   • committed {n}/{len(games)} games …"))
+    batch = pipe.run()
+    stats = pipe.stats()
+
+    print(f"✅ {year}: {len(batch.loaded)} loaded, {len(batch.failed)} failed "
+          f"({stats['games_per_sec']:.1f} games/s, "
+          f"API at {stats['api']['rate']:.1f} req/s, "
+          f"{stats['people_lookups']} people lookups)")
+    return batch
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--start-year", type=int, default=2025)
+    parser.add_argument("--end-year", type=int, default=2025)
+    profiling.add_arguments(parser)
+    args = parser.parse_args()
+    profiling.configure_from_args(args)
+
+    failed: List[int] = []
+    with closing(connect(DSN)) as conn, conn.cursor() as cur:
+        for year in range(args.start_year, args.end_year + 1):
+            failed.extend(load_season(cur, year).failed)
+
+    print(f"🏁 Game load complete, {len(failed)} failed.")
+    if failed:
+        print("   failed gamePks:", ", ".join(map(str, sorted(failed))))
 
 
 if __name__ == "__main__":
-    all_games = []
-    conn = psycopg2.connect(DSN)
-    for year in range(2025, 2026):
-        schedule = safe_get_schedule(year)
-        for game in schedule:
-            if game['status'] != "Final":
-                continue
-            gamePk = game['game_id']
-            home_id = game['home_id']
-            away_id = game['away_id']
-            if home_id not in TEAM_INFO or away_id not in TEAM_INFO:
-                continue
-            box = safe_boxscore_data(gamePk)
-            if box is None:
-                print(f"skipping game: {gamePk}")
-                continue
-            meta = box["gameBoxInfo"]
-            meta_parsed = extract_meta_data(meta)
-            game_date = game['game_date']
-            venue = game["venue_name"]
-            
-            first_pitch_ts = game['game_datetime']
-            attendance = meta_parsed['attendance']
-            weather_temp_f = meta_parsed['weather_temp_f']
-            wind_mph = meta_parsed["wind_mph"]
-            home_score = game['home_score']
-            away_score = game['away_score']
-            insert_row = [ gamePk, year, game_date, venue, home_id, away_id, first_pitch_ts, attendance, weather_temp_f, wind_mph, home_score, away_score]
-            all_games.append(insert_row)
-
-            if len(all_games) % 200 == 0:
-                print(f'game {len(all_games)} reached') 
-            time.sleep(1)
-
-        print(f"Finished {year}, inserting {len(all_games)} games...")
-        insert_games(conn, all_games)
-        all_games = []
-        time.sleep(10)
-    conn.close()
\ No newline at end of file
+    metrics.serve()                   # only with ETL_METRICS_PORT
+    try:
+        main()
+    finally:
+        metrics.dump()                # only with ETL_METRICS_TEXTFILE
+        profiling.report()            # only with ETL_PROFILE / --profile
@@ -3,19 +3,54 @@ Load MLB historical odds CSVs sitting in odds_data/ into the DB.
 
 Assumes:
   • game table already populated (gamePk, date, home_id, away_id)
+  • team_box loaded for those games (final runs are part of the match key)
   • TEAM_INFO mapping from your utils.baseball_stats
+
+Files are parsed column-wise (team aliases, bulk numeric casts) in a
+process pool while the main process matches and COPYs the previous file.
+Every skipped row is counted under a reason:
+  unknown_team · bad_score · bad_line · duplicate · no_game · already_loaded
+
+Afterwards implied / no-vig probabilities are derived for every new
+game_odds row into game_odds_derived (see utils/odds_math.py).
 """
-import os, glob, time, csv
+import os, re, glob
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 from psycopg2 import connect
-from psycopg2.extras import execute_values
 from dotenv import load_dotenv
 from utils.baseball_stats import TEAM_INFO         # <- you already have this
+from utils.bulk_writer import BulkWriter, TableSpec
+from utils.odds_math import refresh_derived_odds
 
 load_dotenv()
 DSN = os.getenv("POSTGRES_URI")
 ODDS_DIR = "odds_data/"
 SOURCE_NAME = "scottfree"
+PARSE_WORKERS = min(4, os.cpu_count() or 1)         # CSVs parsed in parallel
+
+# csv column → game_odds column, split by target type
+INT_LINES = {
+    "away_money_line":        "away_money_line",
+    "home_money_line":        "home_money_line",
+    "away_point_spread_line": "away_spread_line",
+    "home_point_spread_line": "home_spread_line",
+    "over_line":              "over_line",
+    "under_line":             "under_line",
+}
+FLOAT_LINES = {
+    "away_point_spread": "away_spread",
+    "home_point_spread": "home_spread",
+    "over_under":        "over_under",
+}
+ODDS_SPEC = TableSpec(
+    ("gamePk", "source_id",
+     "away_money_line", "home_money_line",
+     "away_spread",     "away_spread_line",
+     "home_spread",     "home_spread_line",
+     "over_under",      "over_line", "under_line"),
+    ("gamePk", "source_id"))
 
 # ─────────── helpers ─────────────────────────────────────────
 def _get_or_create_source_id(cur, src_name:str) -> int:
@@ -26,104 +61,196 @@ def _get_or_create_source_id(cur, src_name:str) -> int:
                 (src_name,))
     return cur.fetchone()[0]
 
-def _team_name_to_id(name:str) -> int|None:
-    name = name.lower().replace(" ", "_")
+# ─────────── team aliases ────────────────────────────────────
+def _norm(name:str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+
+# two-word nicknames; every other club's nickname is its last word
+_TWO_WORD = {"Red Sox", "White Sox", "Blue Jays"}
+
+# historic names, alternate abbreviations and common short forms
+_EXTRA_ALIASES = {
+    108: ["Anaheim Angels", "Los Angeles Angels of Anaheim", "LA Angels", "ANA"],
+    109: ["Arizona", "ARI", "D-backs", "Dbacks"],
+    112: ["CHN", "Chi Cubs"],
+    114: ["Cleveland Indians", "Cleveland", "Indians"],
+    118: ["KCR", "KCA"],
+    119: ["LA Dodgers", "LAN"],
+    120: ["WSN", "WAS", "Montreal Expos", "MON"],
+    121: ["NYN", "NY Mets"],
+    133: ["OAK", "Oakland", "Oakland A's", "A's", "Athletics",
+          "Sacramento Athletics", "Las Vegas Athletics"],
+    135: ["SDP", "SDN"],
+    137: ["SFG", "SFN"],
+    138: ["SLN", "St Louis Cardinals"],
+    139: ["Tampa Bay Devil Rays", "Devil Rays", "TBR", "TBA", "Tampa Bay", "Tampa"],
+    145: ["CHW", "CHA", "Chi White Sox"],
+    146: ["Florida Marlins", "FLA", "Florida", "Miami"],
+    147: ["NYA", "NY Yankees"],
+}
+
+def _build_team_aliases() -> dict[str, int]:
+    """Normalised alias → team_id; city or nickname aliases shared by two
+    clubs (New York, Chicago, Sox …) are left out rather than guessed."""
+    candidates: dict[str, set[int]] = {}
     for tid, meta in TEAM_INFO.items():
-        if meta["abbr"].lower() in name or meta["name"].lower().replace(" ", "_") == name:
-            return tid
-    return None
+        name = meta["name"]
+        nick = next((n for n in _TWO_WORD if name.endswith(n)), name.split()[-1])
+        city = name[: -len(nick)].strip()
+        for alias in (name, meta["abbr"], nick, city, *_EXTRA_ALIASES.get(tid, ())):
+            candidates.setdefault(_norm(alias), set()).add(tid)
+    return {alias: ids.pop() for alias, ids in candidates.items()
+            if alias and len(ids) == 1}
 
-def _match_gamePk(cur, game_date, home_id, away_id,
-                  home_runs, away_runs):
+TEAM_ALIASES = _build_team_aliases()
+
+def _team_name_to_id(name:str) -> int|None:
+    return TEAM_ALIASES.get(_norm(name))
+
+def _map_teams(names:pd.Series) -> pd.Series:
+    """team_id per cell; each distinct spelling is normalised only once."""
+    lookup = {n: _team_name_to_id(n) for n in names.dropna().unique()}
+    return names.map(lookup).astype("Int64")
+
+GAME_KEY = ["game_date", "home_id", "away_id", "home_runs", "away_runs"]
+
+def _load_game_index(cur) -> pd.DataFrame:
+    """
+    Every game with a final box score, keyed the way the odds files
+    identify a game: date, both clubs and the final runs of each.
+
+    Loaded once per run; `dh_seq` numbers games sharing a key (a
+    doubleheader with identical scores) by first pitch so they can be
+    told apart.
     """
-    Return the single gamePk that matches
+    cur.execute("""
+        SELECT g.gamePk, g.game_date, th.team_id, ta.team_id,
+               th.runs, ta.runs, g.first_pitch_ts
+          FROM game       AS g
+        JOIN team_box AS th  ON th.gamePk = g.gamePk AND th.is_home
+        JOIN team_box AS ta  ON ta.gamePk = g.gamePk AND NOT ta.is_home;
+    """)
+    index = pd.DataFrame(cur.fetchall(),
+                         columns=["gamePk", *GAME_KEY, "first_pitch_ts"])
+    index = index.astype({"gamePk": "int64", "home_id": "int64", "away_id": "int64",
+                          "home_runs": "int64", "away_runs": "int64"})
+    index["game_date"] = pd.to_datetime(index["game_date"])
+    index = index.sort_values(["first_pitch_ts", "gamePk"], na_position="last")
+    index["dh_seq"] = index.groupby(GAME_KEY).cumcount()
+    return index.drop(columns="first_pitch_ts")
+
+def _match_gamePks(df:pd.DataFrame, index:pd.DataFrame) -> pd.Series:
+    """
+    gamePk for every (typed) odds row (NaN when unmatched), via one merge on
         • date
         • home / away club
         • AND the final runs for each club
+    Rows sharing a key are paired with the index's games in order.
     """
-    cur.execute("""
-        SELECT g.gamePk
-          FROM game       AS g
-        JOIN team_box AS th  ON th.gamePk = g.gamePk
-                            AND th.is_home
-                            AND th.team_id = %s
-                            AND th.runs    = %s         -- home runs
-        JOIN team_box AS ta  ON ta.gamePk = g.gamePk
-                            AND NOT ta.is_home
-                            AND ta.team_id = %s
-                            AND ta.runs    = %s         -- away runs
-         WHERE g.game_date = %s
-        LIMIT 1;
-    """, (home_id, home_runs,
-          away_id, away_runs,
-          game_date))
-    row = cur.fetchone()
-    return row[0] if row else None
+    keys = df[GAME_KEY].astype({"home_id": "int64", "away_id": "int64",
+                                "home_runs": "int64", "away_runs": "int64"})
+    keys["dh_seq"] = keys.groupby(GAME_KEY).cumcount()
+    matched = keys.reset_index().merge(index, on=[*GAME_KEY, "dh_seq"],
+                                       how="left").set_index("index")
+    return matched["gamePk"].reindex(df.index)
 
 # ─────────── main load routine ───────────────────────────────
-def load_csv(path:str, cur, source_id:int) -> tuple[int,int]:
+def parse_odds_csv(path:str) -> tuple[pd.DataFrame, Counter]:
+    """
+    Read one odds file into typed columns: team ids, game date, runs and
+    every line cast in bulk.  Returns the loadable rows plus a Counter of
+    rows dropped per reason.  Runs in a worker process.
+    """
     df = pd.read_csv(path)
-    rows, skipped = 0, 0
-    payload = []
-    for _, r in df.iterrows():
-        home_id = _team_name_to_id(r["home_team"])
-        away_id = _team_name_to_id(r["away_team"])
-        if not (home_id and away_id):
-            skipped += 1
-            continue
-        gpk = _match_gamePk(
-                cur,
-                r["date"],
-                home_id,
-                away_id,
-                int(r["home_score"]),
-                int(r["away_score"])
-        )
-        if not gpk:
-            skipped += 1
-            continue
-        payload.append((
-            gpk,
-            source_id,
-            int(r["away_money_line"]),
-            int(r["home_money_line"]),
-            float(r["away_point_spread"]),
-            int(r["away_point_spread_line"]),
-            float(r["home_point_spread"]),
-            int(r["home_point_spread_line"]),
-            float(r["over_under"]),
-            int(r["over_line"]),
-            int(r["under_line"]),
-        ))
-    if payload:
-        execute_values(cur, """
-            INSERT INTO game_odds (
-                gamePk, source_id,
-                away_money_line, home_money_line,
-                away_spread,     away_spread_line,
-                home_spread,     home_spread_line,
-                over_under,      over_line, under_line
-            ) VALUES %s
-            ON CONFLICT (gamePk, source_id) DO NOTHING;
-        """, payload)
-        rows = len(payload)
-    return rows, skipped
+    skipped: Counter = Counter()
+
+    out = pd.DataFrame({
+        "home_id":   _map_teams(df["home_team"]),
+        "away_id":   _map_teams(df["away_team"]),
+        "game_date": pd.to_datetime(df["date"], errors="coerce"),
+        "home_runs": pd.to_numeric(df["home_score"], errors="coerce"),
+        "away_runs": pd.to_numeric(df["away_score"], errors="coerce"),
+    })
+    for src, col in {**INT_LINES, **FLOAT_LINES}.items():
+        out[col] = pd.to_numeric(df[src], errors="coerce")
+
+    # each row is counted under the first check it fails
+    for reason, cols in (
+            ("unknown_team", ["home_id", "away_id"]),
+            ("bad_score",    ["game_date", "home_runs", "away_runs"]),
+            ("bad_line",     [*INT_LINES.values(), *FLOAT_LINES.values()])):
+        ok = out[cols].notna().all(axis=1)
+        skipped[reason] += int((~ok).sum())
+        out = out[ok]
+
+    # a row repeated in the file would otherwise pair with the next game
+    # of its key in `_match_gamePks` (and be counted as no_game)
+    dup = out.duplicated()
+    skipped["duplicate"] += int(dup.sum())
+    out = out[~dup]
+
+    out = out.astype({col: "int64" for col in INT_LINES.values()})
+    return out, skipped
+
+def insert_odds(df:pd.DataFrame, cur, source_id:int,
+                game_index:pd.DataFrame) -> tuple[int, Counter]:
+    """
+    Match a parsed frame to gamePks and COPY it into game_odds.  Returns
+    the rows actually inserted; rows already in game_odds are counted as
+    skipped (`already_loaded`).
+    """
+    skipped: Counter = Counter()
+    df = df.assign(gamePk=_match_gamePks(df, game_index))
+    unmatched = df["gamePk"].isna()
+    skipped["no_game"] += int(unmatched.sum())
+    df = df[~unmatched].astype({"gamePk": "int64"})
+    if df.empty:
+        return 0, skipped
+
+    df["source_id"] = source_id
+    writer = BulkWriter(cur, tables={"game_odds": ODDS_SPEC}, merged={})
+    writer.add("game_odds", df[list(ODDS_SPEC.columns)].itertuples(index=False, name=None))
+    writer.flush()                          # COPY + ON CONFLICT DO NOTHING
+    inserted = writer.inserted.get("game_odds", 0)
+    skipped["already_loaded"] += len(df) - inserted
+    return inserted, skipped
+
+def load_csv(path:str, cur, source_id:int,
+             game_index:pd.DataFrame) -> tuple[int,Counter]:
+    df, skipped = parse_odds_csv(path)
+    rows, unmatched = insert_odds(df, cur, source_id, game_index)
+    return rows, skipped + unmatched
+
+def _fmt_skips(skipped:Counter) -> str:
+    total = sum(skipped.values())
+    if not total:
+        return "0 skipped"
+    reasons = ", ".join(f"{r} {n}" for r, n in skipped.most_common() if n)
+    return f"{total} skipped ({reasons})"
 
 def main():
     csv_files = sorted(glob.glob(os.path.join(ODDS_DIR, "mlb_game_scores_*.csv")))
     if not csv_files:
         print("No CSVs found in odds_data/")
         return
-    total_ins, total_skip = 0, 0
-    with connect(DSN) as conn, conn.cursor() as cur:
+    total_ins, total_skip = 0, Counter()
+    with connect(DSN) as conn, conn.cursor() as cur, \
+            ProcessPoolExecutor(max_workers=PARSE_WORKERS) as pool:
         src_id = _get_or_create_source_id(cur, SOURCE_NAME)
-        for p in csv_files:
-            ins, skip = load_csv(p, cur, src_id)
+        game_index = _load_game_index(cur)       # one query for the whole run
+        print(f"📇 indexed {len(game_index)} games for odds matching")
+        # files parse in the pool while earlier ones are matched & inserted
+        for p, (df, skip) in zip(csv_files, pool.map(parse_odds_csv, csv_files)):
+            ins, unmatched = insert_odds(df, cur, src_id, game_index)
+            skip += unmatched
             total_ins  += ins
             total_skip += skip
             conn.commit()
-            print(f"✔ {os.path.basename(p)} → {ins} inserted, {skip} skipped")
-    print(f"\nDone. {total_ins} rows inserted, {total_skip} skipped.")
+            print(f"✔ {os.path.basename(p)} → {ins} inserted, {_fmt_skips(skip)}")
+        derived = refresh_derived_odds(cur)     # only rows not derived yet
+        conn.commit()
+        print(f"🧮 derived probabilities for {derived} new odds rows")
+    print(f"\nDone. {total_ins} rows inserted, {_fmt_skips(total_skip)}.")
 
 if __name__ == "__main__":
     main()
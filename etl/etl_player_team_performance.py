@@ -3,6 +3,9 @@ import pandas as pd
 from psycopg2 import connect
 from dotenv import load_dotenv
 from utils.baseball_stats import * 
+from utils.fetcher import iter_boxscores
+from utils.bulk_writer import RowAccumulator
+from utils.game_batch import GameBatch
 from contextlib import closing
 from datetime import date
 
@@ -14,43 +17,36 @@ if __name__ == "__main__":
     end   = date(2025, 5, 28)
 
     games = safe_get_games_in_range(start, end)         # all gamePk’s already in `game`
-    player_cache: set[int] = set()            # avoid re-hitting /people for known players
     game_pks = [game['game_id'] for game in games]
-    BATCH_SIZE  = 250                         # commit after this many games
-    SLEEP_SEC   = 0.20                        # polite pause between calls
 
     with closing(connect(DSN)) as conn, conn.cursor() as cur:
-        for idx, gamePk in enumerate(game_pks, 1):
-            try:
-                # ─── fetch wrapper & raw JSON ───────────────────────────────
-                box_score = safe_boxscore_data(gamePk)
-                raw_box   = safe_boxscore_raw(gamePk)
-                if not (box_score and raw_box):
-                    print(f"⚠️  skipped {gamePk}: could not fetch boxscore")
-                    continue
-
-                season_year = int(box_score["gameId"].split('/')[0])
-
-                # ─── load dimension & fact tables ──────────────────────────
-                process_team_fielding(raw_box,        gamePk, cur)
-                process_team_box(box_score,           gamePk, cur)
-                process_fielders(raw_box,             gamePk, cur)
-                process_pitchers(box_score,           gamePk, cur)
-                process_batters(box_score,            gamePk, cur)
-                process_player_teams(box_score, gamePk, season_year, cur)
-                process_players(box_score,      gamePk, cur, player_cache)
-
-            except Exception as e:
-                conn.rollback()                       # keep DB clean
-                print(f"💥  {gamePk} failed – rolled back. ({e})")
+        # ─── skip games the ledger already has fully loaded ──────────────
+        done = ledger_completed(cur, game_pks)
+        game_pks = [pk for pk in game_pks
+                    if not set(STATS_STAGES) <= done.get(pk, set())]
+        writer = RowAccumulator(cur)              # fact rows → COPY on thresholds
+        players = PlayerRegistry.from_db(cur)     # known players → no people calls
+        batch = GameBatch(conn, cur, writer=writer, players=players)
+
+        # ─── fetch each boxscore once, concurrently, consume in order ──────
+        fetched_games = iter_boxscores(game_pks)  # adaptive API pacing
+        for idx, (gamePk, box_score) in enumerate(fetched_games, 1):
+            if box_score is None:
+                batch.fail(gamePk, RuntimeError("could not fetch boxscore"))
                 continue
 
-            # ─── periodic commit & progress ping ───────────────────────────
-            if idx % BATCH_SIZE == 0:
-                conn.commit()
-                print(f"✅ committed {idx}/{len(game_pks)} games …")
+            # ─── load dimension & fact tables (savepoint per game) ─────────
+            with batch.game(gamePk):
+                load_game_stats(box_score, gamePk, cur, players,
+                                done=done.get(gamePk, ()), writer=writer)
 
-            time.sleep(SLEEP_SEC)                     # API-friendly pacing
+            # ─── commit whenever the accumulator wants to flush ────────────
+            if batch.maybe_commit():
+                print(f"✅ committed {idx}/{len(game_pks)} games …")
 
-        conn.commit()                                 # final commit
-        print("🏁 ETL run complete.")
+        batch.commit()                                # final commit
+        stats = writer.stats()
+        print(f"🏁 ETL run complete. {len(batch.loaded)} loaded, "
+              f"{len(batch.failed)} failed ({stats['rows']} rows in "
+              f"{stats['flushes']} flushes, {stats['seconds']:.1f}s writing, "
+              f"{players.lookups} people lookups)")
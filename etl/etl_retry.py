@@ -0,0 +1,140 @@
+"""
+Drain the `game_retry` dead-letter queue.
+
+The loaders never block on a flaky game: a failed fetch or load is queued
+in `game_retry` with its error and an exponential back-off.  This command
+retries every game whose next attempt is due through the normal
+`load_game_stats` pipeline: the `game` row (from the game's schedule
+entry, looked up by gamePk) and every stats table the load ledger does
+not list yet.  Games that load are removed from the queue; games that
+fail again are re-queued with a longer delay until RETRY_MAX_ATTEMPTS,
+after which they are parked (`gave_up`) for a human.
+
+Run it from cron after the daily update, or by hand:
+
+    python etl_retry.py                # everything due now
+    python etl_retry.py --all          # ignore next_attempt_at
+    python etl_retry.py --status       # show the queue only
+"""
+import argparse
+import os
+from contextlib import closing
+from typing import List
+
+from psycopg2 import connect
+from dotenv import load_dotenv
+
+from utils.baseball_stats import *
+from utils import metrics, profiling
+from utils.fetcher import iter_boxscores
+from utils.bulk_writer import RowAccumulator
+from utils.game_batch import GameBatch
+
+load_dotenv()
+DSN = os.getenv("POSTGRES_URI")
+
+
+def print_status(cur) -> None:
+    cur.execute("""
+        SELECT COUNT(*) FILTER (WHERE NOT gave_up AND next_attempt_at <= now()),
+               COUNT(*) FILTER (WHERE NOT gave_up AND next_attempt_at >  now()),
+               COUNT(*) FILTER (WHERE gave_up)
+          FROM game_retry;
+    """)
+    due, waiting, parked = cur.fetchone()
+    print(f"📬 game_retry: {due} due, {waiting} waiting, {parked} gave up")
+    cur.execute("""
+        SELECT error_class, COUNT(*) FROM game_retry
+         GROUP BY 1 ORDER BY 2 DESC;
+    """)
+    for error_class, n in cur.fetchall():
+        print(f"   {n:>5}  {error_class}")
+
+
+def not_drained(cur, game_pks: List[int]) -> List[int]:
+    """Retried games still missing their `game` row or left in the queue."""
+    cur.execute("""
+        SELECT pk FROM unnest(%s::bigint[]) AS pk
+         WHERE NOT EXISTS (SELECT 1 FROM game g WHERE g.gamePk = pk)
+            OR EXISTS (SELECT 1 FROM game_retry r WHERE r.gamePk = pk)
+         ORDER BY pk;
+    """, (game_pks,))
+    return [row[0] for row in cur.fetchall()]
+
+
+def drain(limit: int | None, include_future: bool) -> None:
+    with closing(connect(DSN)) as conn, conn.cursor() as cur:
+        game_pks = retry_due(cur, limit, include_future)
+        if not game_pks:
+            print("✅ Nothing due in game_retry.")
+            return
+
+        # every stage already complete (e.g. a later backfill got them) → just clear
+        done = ledger_completed(cur, game_pks)
+        complete = {pk for pk in game_pks if set(ALL_STAGES) <= done.get(pk, set())}
+        retry_clear(cur, complete)
+        conn.commit()
+        game_pks = [pk for pk in game_pks if pk not in complete]
+        print(f"🔁 Retrying {len(game_pks)} games "
+              f"({len(complete)} were already loaded) …")
+
+        # the `game` row needs the schedule entry, not just the boxscore
+        games = collect_games_by_pk(game_pks)
+
+        players = PlayerRegistry.from_db(cur)
+        batch = GameBatch(conn, cur, writer=RowAccumulator(cur), players=players)
+        for gamePk in game_pks:
+            if gamePk not in games:
+                batch.fail(gamePk, RuntimeError("no finished schedule entry"))
+        fetched_games = iter_boxscores([pk for pk in game_pks if pk in games])
+        for gamePk, box in fetched_games:         # paced by the rate controller
+            if box is None:
+                batch.fail(gamePk, RuntimeError("could not fetch boxscore"))
+                continue
+            with batch.game(gamePk):
+                load_game_stats(box, gamePk, cur, players,
+                                done=done.get(gamePk, ()), writer=batch.writer,
+                                game=games[gamePk])
+            batch.maybe_commit()
+        batch.commit()
+
+        # nothing leaves the queue half-loaded: keep (re-queue) any game
+        # that committed without its `game` row or a ledger stage
+        partial = not_drained(cur, batch.loaded)
+        for gamePk in partial:
+            retry_record(cur, gamePk, RuntimeError("incomplete after retry"))
+        conn.commit()
+
+        print(f"🏁 Retry complete: {len(batch.loaded) - len(partial)} loaded, "
+              f"{len(batch.failed) + len(partial)} re-queued.")
+        if partial:
+            print("⚠️  still incomplete after loading:", ", ".join(map(str, partial)))
+        print_status(cur)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--limit", type=int, default=None,
+                        help="retry at most this many games")
+    parser.add_argument("--all", action="store_true",
+                        help="also retry games whose back-off has not expired")
+    parser.add_argument("--status", action="store_true",
+                        help="print the queue and exit")
+    profiling.add_arguments(parser)
+    args = parser.parse_args()
+    profiling.configure_from_args(args)
+
+    if args.status:
+        with closing(connect(DSN)) as conn, conn.cursor() as cur:
+            print_status(cur)
+        return
+    drain(args.limit, args.all)
+
+
+if __name__ == "__main__":
+    metrics.serve()                   # only with ETL_METRICS_PORT
+    try:
+        main()
+    finally:
+        metrics.dump()                # only with ETL_METRICS_TEXTFILE
+        profiling.report()            # only with ETL_PROFILE / --profile
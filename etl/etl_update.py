@@ -2,20 +2,23 @@
 Incrementally load MLB games that have finished since the last date
 already stored in the `game` table.
 
-Run daily from cron / systemd-timer / GitHub Actions etc.
+Run daily from cron / systemd-timer / GitHub Actions etc.  Set
+`ETL_METRICS_TEXTFILE` to leave a Prometheus textfile behind for
+node_exporter (see utils.metrics), and `ETL_PROFILE=1` for a per-stage
+timing table at the end (see utils.profiling).
 """
-import os, time, datetime as dt
+import os, datetime as dt
 from contextlib import closing
 from psycopg2 import connect
 from dotenv import load_dotenv
-import statsapi                    # pip install MLB-StatsAPI
 
 # ────────  your own helpers  ────────
 from utils.baseball_stats import *
+from utils import metrics, profiling
+from utils.pipeline import GamePipeline
 
 load_dotenv()
 DSN = os.getenv("POSTGRES_URI")
-SLEEP_BETWEEN_GAMES = 0.20            # polite pause (seconds) to avoid hammering the API
 
 # ────────────────────────────────────────────────────────────────────────────
 def _get_latest_game_date(cur) -> dt.date | None:
@@ -24,18 +27,12 @@ def _get_latest_game_date(cur) -> dt.date | None:
     row = cur.fetchone()
     return row[0]          # either a date object or None
 
-def _collect_new_game_pks(start_date: dt.date, end_date: dt.date) -> list[int]:
-    """Call Stats API schedule and return Pks of games that have *finished*."""
-    new_game_pks: list[int] = []
-    one_day = dt.timedelta(days=1)
-    d = start_date
-    while d <= end_date:
-        for g in safe_get_games_in_range(d.isoformat(), d.isoformat()):  # wrapper helper
-            if g["status"].startswith(("Final", "Completed")):
-                new_game_pks.append(g["game_id"])
-        d += one_day
-    # de-dupe just in case (double-headers sometimes appear twice)
-    return sorted(set(new_game_pks))
+def _collect_new_games(start_date: dt.date, end_date: dt.date) -> list[dict]:
+    """
+    Schedule dicts of games between two MLB clubs that have *finished*,
+    from one ranged request.
+    """
+    return collect_final_games(start_date, end_date)
 
 # ────────────────────────────────────────────────────────────────────────────
 def main() -> None:
@@ -52,7 +49,10 @@ def main() -> None:
             print("✅ Database already up-to-date.")
             return
 
-        game_pks = _collect_new_game_pks(start_date, today)
+        games = {g["game_id"]: g for g in _collect_new_games(start_date, today)}
+        done = ledger_completed(cur, games)         # resume after a crash
+        game_pks = [pk for pk in games
+                    if not set(ALL_STAGES) <= done.get(pk, set())]
         if not game_pks:
             print("✅ No completed games to load.")
             return
@@ -60,32 +60,30 @@ def main() -> None:
         print(f"🔄 Loading {len(game_pks)} new finished games "
               f"({start_date} → {today}) …")
 
-        player_cache: set[int] = set()     # avoids repeated people look-ups
-
-        for idx, gamePk in enumerate(game_pks, 1):
-            try:
-                box      = safe_boxscore_data(gamePk)
-                raw_box  = safe_boxscore_raw(gamePk)
-                season   = int(box["gameId"].split('/')[0])
-
-                process_team_fielding(raw_box, gamePk, cur)
-                process_team_box(box, gamePk, cur)
-                process_fielders(raw_box, gamePk, cur)
-                process_pitchers(box, gamePk, cur)
-                process_batters(box, gamePk, cur)
-                process_player_teams(box, gamePk, season, cur)
-                process_players(box, gamePk, cur, player_cache)
-
-                conn.commit()
-                print(f"   • committed {idx}/{len(game_pks)}  (gamePk {gamePk})")
-                time.sleep(SLEEP_BETWEEN_GAMES)
-
-            except Exception as e:
-                conn.rollback()
-                print(f"💥  gamePk {gamePk} failed → rolled back.  {e}")
-
-        print("✅ incremental update complete.")
+    # fetch → map → write overlapped; the writer has its own connection,
+    # the API pace adapts itself (utils.http_client.RateController)
+    pipe = GamePipeline(DSN, [games[pk] for pk in game_pks], done=done,
+                        on_commit=lambda n: print(
+                            f"   • committed {n}/{len(game_pks)} games …"))
+    batch = pipe.run()
+    stats = pipe.stats()
+
+    print(f"✅ incremental update complete: {len(batch.loaded)} loaded, "
+          f"{len(batch.failed)} failed ({stats['games_per_sec']:.1f} games/s, "
+          f"writer idle {stats['starved']['write']:.0f}s, "
+          f"fetch held back {stats['blocked']['fetch']:.0f}s, "
+          f"{stats['people_lookups']} people lookups)")
+    api = stats["api"]
+    print(f"   API settled at {api['rate']:.1f} req/s, {api['concurrency']} in flight "
+          f"({api['throttled']} throttled, {api['errors']} errors, {api['cuts']} cuts)")
+    if batch.failed:
+        print("   failed gamePks:", ", ".join(map(str, sorted(batch.failed))))
 
 # ────────────────────────────────────────────────────────────────────────────
 if __name__ == "__main__":
-    main()
+    metrics.serve()                   # only with ETL_METRICS_PORT
+    try:
+        main()
+    finally:
+        metrics.dump()                # only with ETL_METRICS_TEXTFILE
+        profiling.report()            # only with ETL_PROFILE / --profile
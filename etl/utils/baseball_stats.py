@@ -1,11 +1,15 @@
-import statsapi
 import re
-import requests
+import datetime as dt
 from contextlib import closing
-from typing import Iterable, List, Optional, Tuple, TypedDict, Dict, Any
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, TypedDict
 from psycopg2 import connect
 from psycopg2.extras import execute_values
-import time
+
+from .http_cache import (cached_call, get_cache,
+                         LIVE_GAME_TTL, SCHEDULE_TTL, PEOPLE_TTL)
+from .http_client import get_json, StatsAPIError
+from .metrics import DB_FLUSH
+from .profiling import profiled, sample as sample_game
 
 #TEAM SPECIFIC DATA FROM 2013 - PRESENT 
 TEAM_INFO = {
@@ -41,30 +45,93 @@ TEAM_INFO = {
     158: {"abbr": "MIL", "name": "Milwaukee Brewers", "league": "NL", "division": "C"},
 }
 
+# ─────────────────────────────────────
+#  S C H E D U L E   (StatsAPI /schedule)
+# ─────────────────────────────────────
+def _flatten_schedule(raw: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Flatten a raw `/v1/schedule` response into the same per-game dicts
+    `statsapi.schedule()` returns (for every key the loaders read).
+    """
+    games: List[Dict[str, Any]] = []
+    for day in raw.get("dates", []):
+        for g in day.get("games", []):
+            home, away = g["teams"]["home"], g["teams"]["away"]
+            venue = g.get("venue", {})
+            games.append({
+                "game_id":       g["gamePk"],
+                "game_datetime": g.get("gameDate"),
+                "game_date":     g.get("officialDate", day.get("date")),
+                "game_type":     g.get("gameType"),
+                "status":        g["status"]["detailedState"],
+                "away_name":     away["team"].get("name"),
+                "home_name":     home["team"].get("name"),
+                "away_id":       away["team"]["id"],
+                "home_id":       home["team"]["id"],
+                "doubleheader":  g.get("doubleHeader"),
+                "game_num":      g.get("gameNumber"),
+                "away_score":    away.get("score"),
+                "home_score":    home.get("score"),
+                "venue_id":      venue.get("id"),
+                "venue_name":    venue.get("name"),
+            })
+    return games
+
+
+def _fetch_schedule(start, end, retries: int = 3, delay: float = 5) -> List[Dict[str, Any]]:
+    raw = get_json("v1/schedule",
+                   {"sportId": 1, "startDate": str(start), "endDate": str(end)},
+                   retries=retries, base_delay=delay,
+                   label=f"schedule {start} - {end}")
+    return _flatten_schedule(raw)
+
+
 # stats api function to get all games for a given year 
 def get_schedule(year: int):
-    return statsapi.schedule(start_date=f"{year}-03-01", end_date=f"{year}-11-30")
+    return _fetch_schedule(f"{year}-03-01", f"{year}-11-30")
 
 # stats api function to get data for a specific team
 def get_team(id):
-    res = statsapi.lookup_team(id)
+    res = get_json(f"v1/teams/{id}").get("teams", [])
     if len(res) == 0:
         print(id)
     return res
 
+# ─────────────────────────────────────
+#  R E S P O N S E   C A C H E   P O L I C Y
+# ─────────────────────────────────────
+FINAL_STATUSES = ("Final", "Completed")
+
+
+def _boxscore_ttl(gamePk: int):
+    """Final games never change → immutable; anything else → short TTL."""
+    cache = get_cache()
+    return None if cache is not None and cache.is_final(gamePk) else LIVE_GAME_TTL
+
+
+def _remember_final_games(schedule: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Tell the cache which games the schedule reports as finished."""
+    cache = get_cache()
+    if cache is not None and schedule:
+        cache.mark_final(g["game_id"] for g in schedule
+                         if g["status"].startswith(FINAL_STATUSES))
+    return schedule
+
+
 # stats api function to retrieve box score of a game
+@profiled
 def safe_boxscore_raw(gamePk, max_retries=5, delay=4):
-    for attempt in range(max_retries):
+    def _fetch():
         try:
-            url = f"https://statsapi.mlb.com/api/v1/game/{gamePk}/boxscore"
-            response = requests.get(url)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"Retrying gamePk {gamePk} due to error: {e}")
-            time.sleep(delay * (attempt + 1))  # exponential backoff
-    print(f"Failed to retrieve gamePk {gamePk} after {max_retries} attempts")
-    return None
+            return get_json(f"v1/game/{gamePk}/boxscore",
+                            retries=max_retries, base_delay=delay,
+                            label=f"gamePk {gamePk}")
+        except StatsAPIError as e:
+            print(f"Failed to retrieve gamePk {gamePk}: {e}")
+            return None
+
+    return cached_call("game/boxscore", {"gamePk": gamePk}, _fetch,
+                       ttl=lambda _: _boxscore_ttl(gamePk))
     
 
 #Extract miscellaneous data from box_score
@@ -95,42 +162,150 @@ def extract_meta_data(info_list):
         "first_pitch_str": first_pitch_str  # if needed for parsing manually
     }
 
+# ─────────────────────────────────────
+#  S I N G L E - F E T C H   B O X S C O R E
+# ─────────────────────────────────────
+def boxscore_from_raw(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build the `statsapi.boxscore_data` style view from one raw
+    `/game/{pk}/boxscore` response, so each game is downloaded only once.
+
+    The returned dict serves every consumer:
+
+    * ``box[side]["team" | "players" | "batters" | "pitchers" | "teamStats"]``
+      for the wrapper-based helpers (`process_batters`, `process_pitchers`,
+      `process_team_box`, `process_players`, `process_player_teams`)
+    * ``box["teams"][side]`` for the raw-JSON helpers (`process_fielders`,
+      `process_team_fielding`)
+    * ``box["gameBoxInfo"]`` for `extract_meta_data`
+    * ``box["season"]`` replacing ``int(box["gameId"].split('/')[0])``
+    """
+    teams = raw["teams"]
+    return {
+        "season":      teams["home"]["team"].get("season"),
+        "away":        teams["away"],
+        "home":        teams["home"],
+        "teams":       teams,
+        "gameBoxInfo": raw.get("info", []),
+    }
+
 #### FUNCTIONS TO ATTEMPT SAFE RETRIES ON API 
+@profiled
 def safe_boxscore_data(gamePk, max_retries=5, delay=2):
-    for attempt in range(max_retries):
-        try:
-            return statsapi.boxscore_data(gamePk)
-        except requests.exceptions.RequestException as e:
-            print(f"Retrying gamePk {gamePk} due to error: {e}")
-            time.sleep(delay * (attempt + 1))  # exponential backoff
-    print(f"Failed to retrieve gamePk {gamePk} after {max_retries} attempts")
-    return None
+    """
+    Wrapper-style boxscore built from a single raw fetch (see
+    `boxscore_from_raw`). Returns None if the game could not be retrieved.
+    """
+    with sample_game(gamePk, "fetch", memory=False):
+        raw = safe_boxscore_raw(gamePk, max_retries=max_retries, delay=delay)
+        if raw is None:
+            return None
+        return boxscore_from_raw(raw)
 
+@profiled
 def safe_get_schedule(year, retries=3, delay=5):
-    for attempt in range(retries):
+    def _fetch():
         try:
-            return statsapi.schedule(
-                start_date=f"{year}-03-01",
-                end_date=f"{year}-11-30"
-            )
-        except requests.exceptions.RequestException as e:
-            print(f"Retry {attempt+1} for year {year} due to error: {e}")
-            time.sleep(delay * (attempt + 1))  # Exponential backoff
-    print(f"Failed to retrieve schedule for {year}")
-    return []
+            return _fetch_schedule(f"{year}-03-01", f"{year}-11-30",
+                                   retries=retries, delay=delay)
+        except StatsAPIError as e:
+            print(f"Failed to retrieve schedule for {year}: {e}")
+            return None
 
+    params = {"start_date": f"{year}-03-01", "end_date": f"{year}-11-30"}
+    schedule = cached_call("schedule", params, _fetch, ttl=SCHEDULE_TTL)
+    return _remember_final_games(schedule or [])
+
+@profiled
 def safe_get_games_in_range(start, end, retries=3, delay=5):
-    for attempt in range(retries):
+    def _fetch():
+        try:
+            return _fetch_schedule(start, end, retries=retries, delay=delay)
+        except StatsAPIError as e:
+            print(f"Failed to retrieve schedule for {start} - {end}: {e}")
+            return None
+
+    params = {"start_date": str(start), "end_date": str(end)}
+    schedule = cached_call("schedule", params, _fetch, ttl=SCHEDULE_TTL)
+    return _remember_final_games(schedule or [])
+
+# ─────────────────────────────────────
+#  R A N G E   S C H E D U L E   C O L L E C T O R
+# ─────────────────────────────────────
+SCHEDULE_CHUNK_DAYS = 180     # one /schedule call covers up to this many days
+
+
+def is_club_game(game: Dict[str, Any]) -> bool:
+    """
+    Both teams are MLB clubs (TEAM_INFO) – no All-Star game, exhibitions or
+    games against non-MLB opponents.
+    """
+    return game["home_id"] in TEAM_INFO and game["away_id"] in TEAM_INFO
+
+
+def collect_final_games(start_date: dt.date,
+                        end_date: dt.date,
+                        chunk_days: int = SCHEDULE_CHUNK_DAYS) -> List[Dict[str, Any]]:
+    """
+    Every finished game between two MLB clubs (`is_club_game`) from
+    `start_date` to `end_date` (inclusive), fetched with one schedule
+    request per `chunk_days` window instead of one per day.
+
+    A game appears more than once when it was suspended and resumed on a
+    later date; we keep its latest Final/Completed entry.  Result is sorted
+    by gamePk.
+    """
+    finals: Dict[int, Dict[str, Any]] = {}
+    chunk = dt.timedelta(days=chunk_days)
+    lo = start_date
+    while lo <= end_date:
+        hi = min(lo + chunk - dt.timedelta(days=1), end_date)
+        for g in safe_get_games_in_range(lo.isoformat(), hi.isoformat()):
+            if not g["status"].startswith(FINAL_STATUSES) or not is_club_game(g):
+                continue
+            prev = finals.get(g["game_id"])
+            if prev is None or (g["game_date"] or "") >= (prev["game_date"] or ""):
+                finals[g["game_id"]] = g
+        lo = hi + dt.timedelta(days=1)
+    return [finals[pk] for pk in sorted(finals)]
+
+
+SCHEDULE_PKS_BATCH = 100      # gamePks per /schedule?gamePks= call
+
+
+def collect_games_by_pk(game_pks: Iterable[int],
+                        batch_size: int = SCHEDULE_PKS_BATCH) -> Dict[int, Dict[str, Any]]:
+    """
+    Schedule dicts of the given games, looked up by gamePk (for games
+    known only by id, e.g. from `game_retry`).  Only finished games
+    between two MLB clubs are returned – like `collect_final_games`, the
+    latest Final/Completed entry of a resumed game.  Never cached: a
+    retried game's status may have changed since it failed.
+    """
+    pks = sorted(set(game_pks))
+    finals: Dict[int, Dict[str, Any]] = {}
+    for i in range(0, len(pks), batch_size):
+        joined = ",".join(map(str, pks[i:i + batch_size]))
         try:
-            return statsapi.schedule(
-                start_date=start,
-                end_date=end
-            )
-        except requests.exceptions.RequestException as e:
-            print(f"Retry {attempt+1} for year  due to error: {e}")
-            time.sleep(delay * (attempt + 1))  # Exponential backoff
-    print(f"Failed to retrieve schedule for {start} - {end}")
-    return []
+            raw = get_json("v1/schedule", {"sportId": 1, "gamePks": joined},
+                           label=f"schedule for {len(pks[i:i + batch_size])} games")
+        except StatsAPIError as e:
+            print(f"Failed to retrieve schedule entries: {e}")
+            continue
+        for g in _remember_final_games(_flatten_schedule(raw)):
+            if not g["status"].startswith(FINAL_STATUSES) or not is_club_game(g):
+                continue
+            prev = finals.get(g["game_id"])
+            if prev is None or (g["game_date"] or "") >= (prev["game_date"] or ""):
+                finals[g["game_id"]] = g
+    return finals
+
+
+def collect_final_game_pks(start_date: dt.date,
+                           end_date: dt.date,
+                           chunk_days: int = SCHEDULE_CHUNK_DAYS) -> List[int]:
+    """gamePks of `collect_final_games`, ascending."""
+    return [g["game_id"] for g in collect_final_games(start_date, end_date, chunk_days)]
 
 def get_all_game_pks(dsn: str) -> List[int]:
     """
@@ -216,7 +391,8 @@ def map_player_batting(gamePk: int,
 
     return rows
 
-def process_batters(box, gamePk, cur):
+@profiled
+def process_batters(box, gamePk, cur, writer=None):
     for side in ("away", "home"):
         team_id     = box[side]["team"]["id"]
         players     = box[side]["players"]
@@ -225,6 +401,9 @@ def process_batters(box, gamePk, cur):
         bat_rows = map_player_batting(gamePk, team_id, players, batter_ids)
         if not bat_rows:
             continue
+        if writer is not None:           # bulk path (utils.bulk_writer)
+            writer.add("player_batting", bat_rows)
+            continue
 
         # sanity peek
         #print(bat_rows[0])
@@ -319,9 +498,12 @@ def map_player_pitching(gamePk: int,
     return rows
 
 
-def process_pitchers(box: Dict[str, Any], gamePk: int, cur) -> None:
+@profiled
+def process_pitchers(box: Dict[str, Any], gamePk: int, cur,
+                     writer=None) -> None:
     """
     Insert rows into player_pitching for both teams of the current game.
+    With a `writer` (see utils.bulk_writer) rows are buffered instead.
     """
     for side in ("away", "home"):
         team_id      = box[side]["team"]["id"]
@@ -333,6 +515,9 @@ def process_pitchers(box: Dict[str, Any], gamePk: int, cur) -> None:
 
         if not pitch_rows:
             continue
+        if writer is not None:
+            writer.add("player_pitching", pitch_rows)
+            continue
 
         # quick eyeball check
         #print("PITCH", pitch_rows[0])
@@ -399,9 +584,12 @@ def map_player_fielding_raw(gamePk: int,
     return rows
 
 
-def process_fielders(box: Dict[str, Any], gamePk: int, cur) -> None:
+@profiled
+def process_fielders(box: Dict[str, Any], gamePk: int, cur,
+                     writer=None) -> None:
     """
     Insert player_fielding rows for both clubs using the *raw* JSON.
+    With a `writer` (see utils.bulk_writer) rows are buffered instead.
     """
     for side in ("away", "home"):
         team_id = box["teams"][side]["team"]["id"]
@@ -410,6 +598,9 @@ def process_fielders(box: Dict[str, Any], gamePk: int, cur) -> None:
         fld_rows = map_player_fielding_raw(gamePk, team_id, players)
         if not fld_rows:
             continue
+        if writer is not None:
+            writer.add("player_fielding", fld_rows)
+            continue
 
         # sanity peek
         #print("FLD", fld_rows[0])
@@ -423,6 +614,62 @@ def process_fielders(box: Dict[str, Any], gamePk: int, cur) -> None:
             ON CONFLICT (gamePk, player_id) DO NOTHING;
         """, fld_rows)
 
+# ───────────────────────────────────────────
+#  G A M E   R O W   (schedule + gameBoxInfo)
+# ───────────────────────────────────────────
+GameRow = Tuple[int, int, str, str,   # gamePk, season, game_date, venue
+                int, int, str,        # home_id, away_id, first_pitch_ts
+                int, int, int,        # attendance, temp °F, wind mph
+                int, int]             # home_score, away_score
+
+
+def map_game(gamePk: int,
+             game: Dict[str, Any],
+             box: Dict[str, Any]) -> GameRow:
+    """
+    `game` is the schedule dict (`_flatten_schedule`), `box` the boxscore
+    view – weather, wind and attendance only exist in `gameBoxInfo`.
+    """
+    meta = extract_meta_data(box["gameBoxInfo"])
+    return (
+        gamePk,
+        box["season"],
+        game["game_date"],
+        game["venue_name"],
+        game["home_id"],
+        game["away_id"],
+        game["game_datetime"],
+        meta["attendance"],
+        meta["weather_temp_f"],
+        meta["wind_mph"],
+        game["home_score"],
+        game["away_score"],
+    )
+
+
+@profiled
+def process_game(game: Dict[str, Any], box: Dict[str, Any], gamePk: int, cur,
+                 writer=None) -> None:
+    """
+    Insert the `game` row.
+    With a `writer` (see utils.bulk_writer) the row is buffered instead.
+    """
+    rows: List[GameRow] = [map_game(gamePk, game, box)]
+
+    if writer is not None:
+        writer.add("game", rows)
+        return
+
+    execute_values(cur, """
+        INSERT INTO game (
+            gamePk, season_year, game_date, venue,
+            home_team_id, away_team_id, first_pitch_ts,
+            attendance, weather_temp_f, wind_mph,
+            home_score, away_score
+        ) VALUES %s
+        ON CONFLICT (gamePk) DO NOTHING;
+    """, rows)
+
 # ───────────────────────────────────────────
 #  T E A M   B O X   (wrapper JSON)
 # ───────────────────────────────────────────
@@ -492,9 +739,12 @@ def map_team_box(gamePk: int,
     )
 
 
-def process_team_box(box: Dict[str, Any], gamePk: int, cur) -> None:
+@profiled
+def process_team_box(box: Dict[str, Any], gamePk: int, cur,
+                     writer=None) -> None:
     """
     Insert one row per club into `team_box`.
+    With a `writer` (see utils.bulk_writer) rows are buffered instead.
     """
     rows: List[TeamRow] = []
 
@@ -505,7 +755,11 @@ def process_team_box(box: Dict[str, Any], gamePk: int, cur) -> None:
 
     # sanity peek
     #print("TBOX", rows)
-    
+
+    if writer is not None:
+        writer.add("team_box", rows)
+        return
+
     execute_values(cur, """
         INSERT INTO team_box (
             gamePk, team_id, is_home,
@@ -544,9 +798,12 @@ def map_team_fielding_raw(gamePk: int,
     )
 
 
-def process_team_fielding(data: Dict[str, Any], gamePk: int, cur) -> None:
+@profiled
+def process_team_fielding(data: Dict[str, Any], gamePk: int, cur,
+                          writer=None) -> None:
     """
     Insert one row per club into `team_fielding`.
+    With a `writer` (see utils.bulk_writer) rows are buffered instead.
     """
     rows: List[TeamFldRow] = [
         map_team_fielding_raw(gamePk, "away", data["teams"]["away"]),
@@ -556,6 +813,10 @@ def process_team_fielding(data: Dict[str, Any], gamePk: int, cur) -> None:
     # sanity peek
     #print("TFLD", rows)
 
+    if writer is not None:
+        writer.add("team_fielding", rows)
+        return
+
     execute_values(cur, """
         INSERT INTO team_fielding (
             gamePk, team_id, is_home,
@@ -568,27 +829,37 @@ def process_team_fielding(data: Dict[str, Any], gamePk: int, cur) -> None:
 #  P L A Y E R   &   P L A Y E R _ T E A M   L O A D E R
 # ────────────────────────────────────────────────────────────────
 from typing import Dict, Any, List, Tuple, Iterable, Set
-import statsapi, datetime
+import datetime
 from psycopg2.extras import execute_values
 
 
 # ----------  SAFER / BATCHED PEOPLE LOOKUP  ----------
+@profiled
 def _safe_people_lookup(pid_batch: List[int],
                         max_retries: int = 4,
-                        delay: int = 2) -> Dict[int, Any]:
+                        delay: int = 2,
+                        fresh: bool = False) -> Dict[int, Any]:
     """
     One StatsAPI call can take a *comma-separated* list of ids, so we amortise
-    network time and respect rate limits.
+    network time and respect rate limits.  `fresh=True` always asks the API
+    (the answer replaces the cached one) – for refreshing stale bio fields.
     """
     joined = ",".join(map(str, pid_batch))
-    for attempt in range(max_retries):
+
+    def _fetch():
         try:
-            raw = statsapi.get("people", {"personIds": joined})
-            return {p["id"]: p for p in raw["people"]}
-        except Exception as e:
-            print(f"[people] retry {attempt+1}/{max_retries} – {e}")
-            time.sleep(delay * (attempt+1))
-    return {}          # give up – caller will skip those players
+            return get_json("v1/people", {"personIds": joined},
+                            retries=max_retries, base_delay=delay,
+                            label="[people]")
+        except StatsAPIError as e:
+            print(f"[people] giving up – {e}")
+            return None
+
+    raw = cached_call("people", {"personIds": joined}, _fetch, ttl=PEOPLE_TTL,
+                      fresh=fresh)
+    if raw is None:
+        return {}      # give up – caller will skip those players
+    return {p["id"]: p for p in raw["people"]}
 
 
 # ----------  PLAYER TABLE ----------
@@ -608,22 +879,194 @@ def _player_rows_from_people(people: Dict[int, Any]) -> List[PlayerRow]:
     return rows
 
 
+# ----------  PLAYER REGISTRY ----------
+PEOPLE_BATCH = 500          # ids per /people call (well under URL limits)
+PEOPLE_ATTEMPTS = 3         # batches an unresolvable id is retried in
+BIO_FIELDS = ("full_name", "primary_pos", "bats", "throws", "birth_date")
+
+
+def box_player_ids(box: Dict[str, Any]) -> List[int]:
+    """Every player id on either roster of `box`."""
+    return [int(pid_key[2:])                                # ‘ID<id>’
+            for side in ("away", "home")
+            for pid_key in box[side]["players"]]
+
+
+class PlayerRegistry:
+    """
+    The set of players already in the `player` table, warmed once per run.
+
+    Loaders only `note()` the ids they see; unknown ones are resolved for a
+    whole batch of games with a few maximal `/people` calls in `resolve()`,
+    so a daily run makes no people calls for players it already has.
+    Ids resolved since the last `commit()` are forgotten again by
+    `rollback()`, keeping the registry in step with the transaction –
+    unless `resolve()` wrote them on an autocommit connection, where the
+    rows outlive the caller's rollback.
+
+    Ids noted for a gamePk are also tracked per game: after `resolve()`,
+    `settle()` tells which games have every player in the table (their
+    "players" ledger stage can be recorded) and which are still missing
+    some – `GameBatch` does both at commit.
+
+    >>> players = PlayerRegistry.from_db(cur)
+    >>> load_game_stats(box, gamePk, cur, players)    # notes ids only
+    >>> players.resolve(cur); conn.commit(); players.commit()
+    """
+
+    def __init__(self, known: Iterable[int] = (), stale: Iterable[int] = ()):
+        self.known: Set[int] = set(known)
+        self.stale: Set[int] = set(stale)      # rows with missing bio fields
+        self.pending: Set[int] = set()
+        self._uncommitted: Set[int] = set()
+        self._misses: Dict[int, int] = {}
+        self._games: Dict[int, Set[int]] = {}  # gamePk → unknown ids noted
+        self.lookups = 0                       # /people calls made
+
+    @classmethod
+    def from_db(cls, cur) -> "PlayerRegistry":
+        incomplete = " OR ".join(f"{f} IS NULL" for f in BIO_FIELDS)
+        cur.execute(f"SELECT player_id, ({incomplete}) FROM player;")
+        rows = cur.fetchall()
+        return cls(known=(pid for pid, _ in rows),
+                   stale=(pid for pid, missing in rows if missing))
+
+    def __contains__(self, player_id: int) -> bool:
+        return player_id in self.known
+
+    def __len__(self) -> int:
+        return len(self.known)
+
+    def note(self, box: Dict[str, Any], gamePk: Optional[int] = None) -> None:
+        """Queue every player in `box` not already known."""
+        self.note_ids(box_player_ids(box), gamePk)
+
+    def note_ids(self, player_ids: Iterable[int],
+                 gamePk: Optional[int] = None) -> None:
+        unknown = {pid for pid in player_ids if pid not in self.known}
+        self.pending.update(unknown)
+        if gamePk is not None:
+            self._games.setdefault(gamePk, set()).update(unknown)
+
+    def forget(self, gamePk: int) -> None:
+        """The game was rolled back: it no longer waits on its players."""
+        self._games.pop(gamePk, None)
+
+    def settle(self) -> Tuple[List[int], Dict[int, Set[int]]]:
+        """
+        For the games noted since the last `settle()`: those whose players
+        are all known now, and the others with the ids still unresolved.
+        """
+        complete: List[int] = []
+        missing: Dict[int, Set[int]] = {}
+        for gamePk, ids in self._games.items():
+            left = ids - self.known
+            if left:
+                missing[gamePk] = left
+            else:
+                complete.append(gamePk)
+        self._games.clear()
+        return sorted(complete), missing
+
+    def _lookup(self, ids: List[int], fresh: bool = False) -> Dict[int, Any]:
+        people: Dict[int, Any] = {}
+        for i in range(0, len(ids), PEOPLE_BATCH):
+            people.update(_safe_people_lookup(ids[i:i + PEOPLE_BATCH], fresh=fresh))
+            self.lookups += 1
+        return people
+
+    @profiled
+    def resolve(self, cur) -> int:
+        """Insert every pending player; returns rows written."""
+        ids = sorted(self.pending)
+        if not ids:
+            return 0
+        people = self._lookup(ids)
+        rows = sorted(_player_rows_from_people(people), key=lambda r: r[0])
+        if rows:
+            with DB_FLUSH.labels("player").time():
+                execute_values(cur, """
+                    INSERT INTO player (
+                        player_id, full_name, primary_pos, bats, throws, birth_date
+                    ) VALUES %s
+                    ON CONFLICT (player_id) DO NOTHING;
+                """, rows)
+        self.known.update(people)
+        if not cur.connection.autocommit:    # autocommit: already durable
+            self._uncommitted.update(people)
+        self.pending.difference_update(people)
+        missing = self.pending.intersection(ids)
+        if missing:                  # API failed or doesn't know them
+            for pid in missing:
+                self._misses[pid] = self._misses.get(pid, 0) + 1
+            dropped = {pid for pid in missing if self._misses[pid] >= PEOPLE_ATTEMPTS}
+            self.pending -= dropped
+            print(f"⚠️  no /people data for {len(missing)} players "
+                  f"({len(dropped)} given up on)")
+        return len(rows)
+
+    def refresh(self, cur, player_ids: Optional[Iterable[int]] = None) -> int:
+        """
+        Re-fetch bio fields and overwrite the stored rows – for `player_ids`,
+        or by default every row that still has a missing field.  Always asks
+        the API: a cached response is what left the fields empty.
+        """
+        ids = sorted(self.stale if player_ids is None else set(player_ids))
+        if not ids:
+            return 0
+        rows = sorted(_player_rows_from_people(self._lookup(ids, fresh=True)),
+                      key=lambda r: r[0])
+        if rows:
+            execute_values(cur, """
+                INSERT INTO player (
+                    player_id, full_name, primary_pos, bats, throws, birth_date
+                ) VALUES %s
+                ON CONFLICT (player_id) DO UPDATE SET
+                    full_name   = EXCLUDED.full_name,
+                    primary_pos = EXCLUDED.primary_pos,
+                    bats        = EXCLUDED.bats,
+                    throws      = EXCLUDED.throws,
+                    birth_date  = EXCLUDED.birth_date;
+            """, rows)
+        self.known.update(r[0] for r in rows)
+        self.stale.difference_update(
+            r[0] for r in rows if all(v is not None for v in r[1:]))
+        return len(rows)
+
+    def commit(self) -> None:
+        self._uncommitted.clear()
+
+    def rollback(self) -> None:
+        """The caller rolled back: players resolved since `commit()` are gone."""
+        self.known.difference_update(self._uncommitted)
+        self.pending.update(self._uncommitted)
+        self._uncommitted.clear()
+        self._games.clear()
+
+
 # ----------  PLAYER_TEAM TABLE ----------
 TeamRow = Tuple[int, int, int, int, int]
 #           pid, season, team_id, first_gamePk, last_gamePk
 
 
+@profiled
 def process_players(box: Dict[str, Any], gamePk: int, cur,
-                    cache: Set[int]) -> None:
+                    cache: "Set[int] | PlayerRegistry") -> None:
     """
     Ensures every player appearing in `box` is present in the `player` table.
 
     Parameters
     ----------
-    box   : wrapper JSON from statsapi.boxscore_data()
+    box   : boxscore view from safe_boxscore_data()
     cache : a Python set carried by the caller so we never re-look-up a
-            player id that has already been written this run.
+            player id that has already been written this run – or a
+            `PlayerRegistry`, which only queues unknown ids here; the
+            caller then inserts them in bulk with `cache.resolve(cur)`.
     """
+    if isinstance(cache, PlayerRegistry):
+        cache.note(box, gamePk)
+        return
+
     # 1. gather *new* ids (not yet in cache)
     new_ids: List[int] = []
     for side in ("away", "home"):
@@ -641,8 +1084,9 @@ def process_players(box: Dict[str, Any], gamePk: int, cur,
         rows_to_insert.extend(_player_rows_from_people(people_map))
         cache.update(people_map.keys())        # mark as known
 
-    # 3. upsert
+    # 3. upsert – sorted so concurrent loaders lock keys in the same order
     if rows_to_insert:
+        rows_to_insert.sort(key=lambda r: r[0])
         execute_values(cur, """
             INSERT INTO player (
                 player_id, full_name, primary_pos, bats, throws, birth_date
@@ -651,49 +1095,370 @@ def process_players(box: Dict[str, Any], gamePk: int, cur,
         """, rows_to_insert)
 
 
+Appearance = Tuple[int, int, int, int]
+#            pid, season, team_id, gamePk
+
+
+def player_team_appearances(box: Dict[str, Any],
+                            gamePk: int,
+                            season_year: int) -> List[Appearance]:
+    """Every (player, season, team, gamePk) on both rosters of `box`."""
+    rows: List[Appearance] = []
+    for side in ("away", "home"):
+        team_id = box[side]["team"]["id"]
+        for pid_key in box[side]["players"].keys():
+            rows.append((int(pid_key[2:]), season_year, team_id, gamePk))
+    return rows
+
+
+@profiled
+def upsert_player_team_stints(cur, appearances: Iterable[Appearance]) -> int:
+    """
+    Set-based version of the per-player read-then-write stint logic.
+
+    Appearances from any number of games are folded to one
+    (first, last) gamePk window per (player, season, team) and applied with
+    a single statement:
+
+      • stint exists  → extend the *earliest* stint's last_gamePk if the
+                        batch reaches further (never moves it backwards)
+      • no stint yet  → insert (min gamePk, max gamePk) of the batch
+
+    which is exactly what the old loop produced when fed the same games in
+    gamePk order.  Returns the number of stints in the batch.
+    """
+    windows: Dict[Tuple[int, int, int], List[int]] = {}
+    for pid, season, team_id, gamePk in appearances:
+        w = windows.get((pid, season, team_id))
+        if w is None:
+            windows[(pid, season, team_id)] = [gamePk, gamePk]
+        else:
+            w[0] = min(w[0], gamePk)
+            w[1] = max(w[1], gamePk)
+    if not windows:
+        return 0
+
+    rows: List[TeamRow] = sorted((k[0], k[1], k[2], w[0], w[1])
+                                 for k, w in windows.items())
+    execute_values(cur, """
+        WITH incoming (player_id, season_year, team_id,
+                       first_gamePk, last_gamePk) AS (
+            VALUES %s
+        ),
+        earliest AS (
+            SELECT DISTINCT ON (pt.player_id, pt.season_year, pt.team_id)
+                   pt.player_id, pt.season_year, pt.team_id, pt.first_gamePk
+              FROM player_team AS pt
+              JOIN incoming    AS i
+                ON i.player_id = pt.player_id
+               AND i.season_year = pt.season_year
+               AND i.team_id = pt.team_id
+             ORDER BY pt.player_id, pt.season_year, pt.team_id, pt.first_gamePk
+        ),
+        extended AS (
+            UPDATE player_team AS pt
+               SET last_gamePk = i.last_gamePk
+              FROM earliest AS e
+              JOIN incoming AS i
+                ON i.player_id = e.player_id
+               AND i.season_year = e.season_year
+               AND i.team_id = e.team_id
+             WHERE pt.player_id = e.player_id
+               AND pt.season_year = e.season_year
+               AND pt.team_id = e.team_id
+               AND pt.first_gamePk = e.first_gamePk
+               AND i.last_gamePk > pt.last_gamePk
+        )
+        INSERT INTO player_team (
+            player_id, season_year, team_id, first_gamePk, last_gamePk
+        )
+        SELECT i.player_id, i.season_year, i.team_id,
+               i.first_gamePk, i.last_gamePk
+          FROM incoming AS i
+         WHERE NOT EXISTS (
+                SELECT 1 FROM earliest AS e
+                 WHERE e.player_id = i.player_id
+                   AND e.season_year = i.season_year
+                   AND e.team_id = i.team_id);
+    """, rows, page_size=len(rows))      # one statement for the whole batch
+    return len(rows)
+
+
+@profiled
 def process_player_teams(box: Dict[str, Any],
                          gamePk: int,
                          season_year: int,
-                         cur) -> None:
+                         cur,
+                         writer=None) -> None:
     """
     Maintains first/last-appearance windows for each (player, season, team).
 
-    Uses a read-then-upsert pattern to respect the composite PK defined
-    in your schema.
+    Without a `writer` the game is applied immediately with one set-based
+    statement (`upsert_player_team_stints`).  With a `writer`
+    (utils.bulk_writer) the appearances are buffered and a whole batch of
+    games is applied in one statement at flush time.
     """
-    for side in ("away", "home"):
-        team_id = box[side]["team"]["id"]
-        for pid_key in box[side]["players"].keys():
-            pid = int(pid_key[2:])
-
-            # Does a row already exist?
-            cur.execute("""
-                SELECT first_gamePk, last_gamePk
-                FROM player_team
-                WHERE player_id = %s
-                  AND season_year = %s
-                  AND team_id = %s
-                ORDER BY first_gamePk
-                LIMIT 1;
-            """, (pid, season_year, team_id))
-            found = cur.fetchone()
-
-            if found:
-                # update only if this appearance is later
-                if gamePk > found[1]:
-                    cur.execute("""
-                        UPDATE player_team
-                           SET last_gamePk = %s
-                         WHERE player_id = %s
-                           AND season_year = %s
-                           AND team_id = %s
-                           AND first_gamePk = %s;
-                    """, (gamePk, pid, season_year, team_id, found[0]))
-            else:
-                # new stint
-                cur.execute("""
-                    INSERT INTO player_team (
-                        player_id, season_year, team_id, first_gamePk, last_gamePk
-                    )
-                    VALUES (%s, %s, %s, %s, %s);
-                """, (pid, season_year, team_id, gamePk, gamePk))
+    appearances = player_team_appearances(box, gamePk, season_year)
+    if writer is not None:
+        writer.add("player_team", appearances)
+        return
+    upsert_player_team_stints(cur, appearances)
+
+
+def rebuild_player_team(cur, seasons: Optional[Iterable[int]] = None) -> int:
+    """
+    One-shot rebuild of `player_team` from the loaded fact tables.
+
+    Stints become (MIN, MAX) gamePk per (player, season, team) over
+    `player_batting` ∪ `player_pitching` ∪ `player_fielding`, with the season
+    taken from `game`.  Unlike the per-game path, bench players who never
+    recorded a batting, pitching or fielding line are not included.
+
+    The `player_team` ledger stage is marked for every rebuilt game.
+    Limits the rebuild to `seasons` when given.  Returns rows inserted.
+    """
+    season_list = sorted(set(seasons)) if seasons is not None else None
+    season_filter = "WHERE g.season_year = ANY(%(seasons)s)" if season_list else ""
+    params = {"seasons": season_list}
+
+    cur.execute(f"""
+        DELETE FROM player_team
+        {"WHERE season_year = ANY(%(seasons)s)" if season_list else ""};
+    """, params)
+    cur.execute(f"""
+        INSERT INTO player_team (
+            player_id, season_year, team_id, first_gamePk, last_gamePk
+        )
+        SELECT a.player_id, g.season_year, a.team_id,
+               MIN(a.gamePk), MAX(a.gamePk)
+          FROM (SELECT gamePk, player_id, team_id FROM player_batting
+                UNION
+                SELECT gamePk, player_id, team_id FROM player_pitching
+                UNION
+                SELECT gamePk, player_id, team_id FROM player_fielding) AS a
+          JOIN game AS g ON g.gamePk = a.gamePk
+        {season_filter}
+         GROUP BY a.player_id, g.season_year, a.team_id;
+    """, params)
+    inserted = cur.rowcount
+    cur.execute(f"""
+        INSERT INTO load_ledger (gamePk, stage)
+        SELECT DISTINCT tb.gamePk, 'player_team'
+          FROM team_box AS tb
+          JOIN game     AS g ON g.gamePk = tb.gamePk
+        {season_filter}
+        ON CONFLICT (gamePk, stage) DO NOTHING;
+    """, params)
+    return inserted
+
+
+# ────────────────────────────────────────────────────────────────
+#  L O A D   L E D G E R   (resume support)
+# ────────────────────────────────────────────────────────────────
+GAME_STAGE   = "game"                                  # row in `game`
+STATS_STAGES = ("team_box", "fielding", "pitching",    # load_game_stats order
+                "batting", "player_team", "players")
+ALL_STAGES   = (GAME_STAGE,) + STATS_STAGES            # single-pass loader
+
+
+def ledger_completed(cur, game_pks: Iterable[int]) -> Dict[int, Set[str]]:
+    """
+    Stages already recorded for each gamePk.  Games with no ledger rows are
+    absent from the result.
+    """
+    pks = list(game_pks)
+    if not pks:
+        return {}
+    cur.execute("""
+        SELECT gamePk, stage
+          FROM load_ledger
+         WHERE gamePk = ANY(%s);
+    """, (pks,))
+    done: Dict[int, Set[str]] = {}
+    for gamePk, stage in cur.fetchall():
+        done.setdefault(gamePk, set()).add(stage)
+    return done
+
+
+def ledger_mark(cur, gamePk: int, stages: Iterable[str]) -> None:
+    """Record `stages` as complete for `gamePk` (inside the caller's txn)."""
+    rows = [(gamePk, stage) for stage in stages]
+    if rows:
+        execute_values(cur, """
+            INSERT INTO load_ledger (gamePk, stage)
+            VALUES %s
+            ON CONFLICT (gamePk, stage) DO NOTHING;
+        """, rows)
+
+
+def ledger_mark_games(cur, game_pks: Iterable[int], stage: str) -> None:
+    """Record one `stage` as complete for many games in a single statement."""
+    rows = [(pk, stage) for pk in game_pks]
+    if rows:
+        execute_values(cur, """
+            INSERT INTO load_ledger (gamePk, stage)
+            VALUES %s
+            ON CONFLICT (gamePk, stage) DO NOTHING;
+        """, rows)
+
+
+def ledger_pending(cur,
+                   game_pks: Iterable[int],
+                   stages: Iterable[str] = STATS_STAGES) -> List[int]:
+    """gamePks (input order kept) that still miss at least one of `stages`."""
+    pks = list(game_pks)
+    wanted = set(stages)
+    done = ledger_completed(cur, pks)
+    return [pk for pk in pks if not wanted <= done.get(pk, set())]
+
+
+# ────────────────────────────────────────────────────────────────
+#  D E A D - L E T T E R   Q U E U E   (game_retry)
+# ────────────────────────────────────────────────────────────────
+RETRY_BASE_DELAY = 600              # seconds before the first retry
+RETRY_MAX_DELAY  = 86_400           # back-off cap: one day
+RETRY_MAX_ATTEMPTS = 8              # then the game is parked (gave_up)
+
+
+def retry_record(cur, gamePk: int, error: BaseException) -> None:
+    """
+    Queue (or re-queue) a failed game with exponential back-off.  Runs on
+    the caller's transaction – commit it with the batch.
+    """
+    cur.execute("""
+        INSERT INTO game_retry (gamePk, error_class, error_msg, next_attempt_at)
+        VALUES (%(pk)s, %(cls)s, %(msg)s, now() + %(base)s * interval '1 second')
+        ON CONFLICT (gamePk) DO UPDATE SET
+            attempts        = game_retry.attempts + 1,
+            error_class     = EXCLUDED.error_class,
+            error_msg       = EXCLUDED.error_msg,
+            last_failed_at  = now(),
+            next_attempt_at = now() + LEAST(%(base)s * power(2, game_retry.attempts),
+                                            %(cap)s) * interval '1 second',
+            gave_up         = game_retry.attempts + 1 >= %(max)s;
+    """, {"pk": gamePk, "cls": type(error).__name__, "msg": str(error)[:1000],
+          "base": RETRY_BASE_DELAY, "cap": RETRY_MAX_DELAY,
+          "max": RETRY_MAX_ATTEMPTS})
+
+
+def retry_clear(cur, game_pks: Iterable[int],
+                stages: Iterable[str] = ALL_STAGES) -> None:
+    """
+    Games that loaded fine leave the queue – only once the ledger lists
+    every one of `stages` for them, so a partial load stays queued.
+    """
+    pks, wanted = list(game_pks), sorted(set(stages))
+    if pks:
+        cur.execute("""
+            DELETE FROM game_retry r
+             WHERE r.gamePk = ANY(%s)
+               AND (SELECT COUNT(DISTINCT l.stage) FROM load_ledger l
+                     WHERE l.gamePk = r.gamePk AND l.stage = ANY(%s)) = %s;
+        """, (pks, wanted, len(wanted)))
+
+
+def retry_due(cur, limit: Optional[int] = None,
+              include_future: bool = False) -> List[int]:
+    """Queued gamePks whose next attempt is due, oldest first."""
+    cur.execute(f"""
+        SELECT gamePk FROM game_retry
+         WHERE NOT gave_up
+           {"" if include_future else "AND next_attempt_at <= now()"}
+         ORDER BY next_attempt_at
+         LIMIT %s;
+    """, (limit,))
+    return [row[0] for row in cur.fetchall()]
+
+
+# ────────────────────────────────────────────────────────────────
+#  O N E   G A M E ,   A L L   S T A T S   T A B L E S
+# ────────────────────────────────────────────────────────────────
+@profiled
+def load_game_stats(box: Dict[str, Any],
+                    gamePk: int,
+                    cur,
+                    player_cache: "Set[int] | PlayerRegistry",
+                    player_cur=None,
+                    done: Iterable[str] = (),
+                    writer=None,
+                    game: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Run every `process_*` loader for one game, in the order the scripts
+    have always used, skipping stages the ledger already lists in `done`
+    and recording the ones that ran.  `box` is the view returned by
+    `safe_boxscore_data`.  Nothing is committed here – the caller owns the
+    transaction, so data and ledger rows land (or roll back) together.
+
+    `player_cache` is a set of known ids or a `PlayerRegistry`; with a
+    registry the caller must `resolve()` it before committing, and the
+    "players" stage is not recorded here but once the ids are resolved
+    (`PlayerRegistry.settle`, done by `GameBatch`).
+
+    `player_cur` optionally points the `player` dimension at a separate
+    (autocommit) cursor, so parallel loaders don't hold row locks on shared
+    players for a whole batch and deadlock each other.
+
+    `writer` (a `utils.bulk_writer.BulkWriter` or `RowAccumulator`) buffers
+    the fact-table rows and player_team appearances for a later COPY /
+    set-based merge; the caller must `flush()` it before committing.
+
+    `game` is the game's schedule dict; when given, the `game` row is
+    written first (stage "game") from the same boxscore, so one fetch
+    loads the game and all its stats.
+    """
+    loaders = _stage_loaders(box, gamePk, cur, player_cache, player_cur,
+                             writer, game)
+    ran = _stages_to_run(done, game)
+    with sample_game(gamePk, "load"):
+        for stage in ran:
+            loaders[stage]()
+        if isinstance(player_cache, PlayerRegistry):
+            ran = [stage for stage in ran if stage != "players"]
+        ledger_mark(cur, gamePk, ran)
+
+
+@profiled
+def map_game_stats(box: Dict[str, Any],
+                   gamePk: int,
+                   sink,
+                   done: Iterable[str] = (),
+                   game: Optional[Dict[str, Any]] = None) -> List[str]:
+    """
+    The database-free half of `load_game_stats`, for pipelined loaders:
+    every row goes to `sink.add(table, rows)` and the stages run are
+    returned.  The "players" stage is returned but not run – the writer
+    does `registry.note_ids(box_player_ids(box), gamePk)` itself, and its
+    ledger row waits for `PlayerRegistry.settle` after the commit's
+    `resolve()`.
+    """
+    loaders = _stage_loaders(box, gamePk, None, None, None, sink, game)
+    ran = _stages_to_run(done, game)
+    with sample_game(gamePk, "map"):
+        for stage in ran:
+            if stage != "players":
+                loaders[stage]()
+    return ran
+
+
+def _stages_to_run(done: Iterable[str],
+                   game: Optional[Dict[str, Any]]) -> List[str]:
+    done = set(done)
+    return [stage for stage in (ALL_STAGES if game is not None else STATS_STAGES)
+            if stage not in done]
+
+
+def _stage_loaders(box, gamePk, cur, player_cache, player_cur, writer,
+                   game) -> Dict[str, Callable[[], Any]]:
+    season_year = box["season"]
+    return {
+        GAME_STAGE:    lambda: process_game(game, box, gamePk, cur, writer),
+        "team_box":    lambda: (process_team_fielding(box, gamePk, cur, writer),
+                                process_team_box(box, gamePk, cur, writer)),
+        "fielding":    lambda: process_fielders(box, gamePk, cur, writer),
+        "pitching":    lambda: process_pitchers(box, gamePk, cur, writer),
+        "batting":     lambda: process_batters(box, gamePk, cur, writer),
+        "player_team": lambda: process_player_teams(box, gamePk, season_year,
+                                                    cur, writer),
+        "players":     lambda: process_players(box, gamePk, player_cur or cur,
+                                               player_cache),
+    }
@@ -0,0 +1,340 @@
+"""
+COPY-based bulk writer for the per-game `game` row and fact tables.
+
+`execute_values` costs one round trip and one SQL parse per table, per side,
+per game.  `BulkWriter` instead buffers the mapped rows in memory and, on
+`flush()`, streams each table's rows into a session-local staging table with
+`COPY … FROM STDIN` and merges them into the real table with a single
+`INSERT … SELECT … ON CONFLICT DO NOTHING` – the same conflict semantics as
+the row-wise inserts in `baseball_stats.py`.
+
+Tables that need more than an insert (`player_team` stints) are buffered the
+same way and handed to a set-based merge function at flush time.
+
+`RowAccumulator` keeps the buffers across many games and decides itself
+when a flush is due – after a row-count, byte-size or age threshold – so
+the loaders write a few large batches instead of one small one per game.
+
+Usage
+-----
+>>> writer = BulkWriter(cur)
+>>> load_game_stats(box, gamePk, cur, player_cache, writer=writer)
+>>> writer.flush()            # always before conn.commit()
+>>> conn.commit()
+
+>>> acc = RowAccumulator(cur, max_rows=50_000, max_bytes=8 << 20, max_age=30)
+>>> for gamePk, box in games:
+...     load_game_stats(box, gamePk, cur, player_cache, writer=acc)
+...     if acc.maybe_flush():     # only at game boundaries
+...         conn.commit()
+>>> acc.flush(); conn.commit()
+>>> acc.stats()
+"""
+import io
+import time
+from typing import (Any, Callable, Dict, Iterable, List, NamedTuple,
+                    Optional, Tuple, Union)
+
+from .baseball_stats import upsert_player_team_stints
+from .metrics import DB_FLUSH
+from .profiling import profiled, stage as profile_stage
+
+
+class TableSpec(NamedTuple):
+    columns: Tuple[str, ...]          # in the order the map_* tuples use
+    conflict: Tuple[str, ...]         # ON CONFLICT target
+
+
+# flushed in this order – `game` first, ahead of the rows that describe it
+FACT_TABLES: Dict[str, TableSpec] = {
+    "game": TableSpec(
+        ("gamePk", "season_year", "game_date", "venue",
+         "home_team_id", "away_team_id", "first_pitch_ts",
+         "attendance", "weather_temp_f", "wind_mph",
+         "home_score", "away_score"),
+        ("gamePk",)),
+    "player_batting": TableSpec(
+        ("gamePk", "player_id", "team_id", "batting_order", "position",
+         "ab", "r", "h", '"2b"', '"3b"', "hr",
+         "rbi", "bb", "so", "sb", "hbp", "lob"),
+        ("gamePk", "player_id")),
+    "player_pitching": TableSpec(
+        ("gamePk", "player_id", "team_id", "is_starting",
+         "outs_recorded", "bf", "h", "r", "er", "bb", "so",
+         "hr", "pitches", "strikes", "win_flag", "save_flag", "hold_flag"),
+        ("gamePk", "player_id")),
+    "player_fielding": TableSpec(
+        ("gamePk", "player_id", "team_id", "position",
+         "putouts", "assists", "errors", "double_plays"),
+        ("gamePk", "player_id")),
+    "team_box": TableSpec(
+        ("gamePk", "team_id", "is_home",
+         "runs", "hits", "doubles", "triples", "hr", "rbi",
+         "bb", "so", "sb", "lob",
+         "innings_pitched", "era", "pitches", "strikes"),
+        ("gamePk", "team_id")),
+    "team_fielding": TableSpec(
+        ("gamePk", "team_id", "is_home",
+         "putouts", "assists", "errors", "double_plays"),
+        ("gamePk", "team_id")),
+    "load_ledger": TableSpec(
+        ("gamePk", "stage"),
+        ("gamePk", "stage")),
+}
+
+
+# tables merged by a function instead of COPY: fn(cur, rows) -> None
+MERGED_TABLES: Dict[str, Callable[[Any, List[Tuple]], Any]] = {
+    "player_team": upsert_player_team_stints,
+}
+
+
+# ─────────────────────────────────────
+#  C O P Y   T E X T   F O R M A T
+# ─────────────────────────────────────
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t",
+                               "\n": "\\n", "\r": "\\r"})
+
+
+def _copy_value(value: Any) -> str:
+    if value is None:
+        return "\\N"
+    if value is True:
+        return "t"
+    if value is False:
+        return "f"
+    if isinstance(value, str):
+        return value.translate(_COPY_ESCAPES)
+    return str(value)
+
+
+def copy_text(rows: Iterable[Tuple]) -> str:
+    """Encode rows in PostgreSQL's COPY text format."""
+    return "".join("\t".join(map(_copy_value, row)) + "\n" for row in rows)
+
+
+# ─────────────────────────────────────
+#  W R I T E R
+# ─────────────────────────────────────
+class BulkWriter:
+    """
+    Buffers fact rows per table and writes them with COPY + merge.
+
+    Rows are encoded to COPY text as they are added, so the buffer holds
+    compact strings rather than tuples and its size is known exactly.
+    The writer never commits; call `flush()` before every `conn.commit()`
+    and `clear()` after a rollback so discarded games are not written later.
+    """
+
+    def __init__(self, cur,
+                 tables: Dict[str, TableSpec] = FACT_TABLES,
+                 merged: Dict[str, Callable] = MERGED_TABLES):
+        self.cur = cur
+        self.tables = tables
+        self.merged = merged
+        self._chunks: Dict[str, List[str]] = {}     # COPY tables: encoded text
+        self._rows: Dict[str, List[Tuple]] = {}     # merged tables: raw tuples
+        self._counts: Dict[str, int] = {}
+        self._bytes = 0
+        self.inserted: Dict[str, int] = {}          # COPY tables: rows merged in
+
+    def add(self, table: str, rows: Iterable[Tuple]) -> None:
+        if table not in self.tables and table not in self.merged:
+            raise KeyError(f"BulkWriter has no spec for table {table!r}")
+        rows = list(rows)
+        if not rows:
+            return
+        text = copy_text(rows)
+        if table in self.merged:
+            self._rows.setdefault(table, []).extend(rows)
+        else:
+            self._chunks.setdefault(table, []).append(text)
+        self._counts[table] = self._counts.get(table, 0) + len(rows)
+        self._bytes += len(text)
+
+    def add_encoded(self, table: str, text: str, n_rows: int) -> None:
+        """Add rows already in COPY text form (`copy_text`), e.g. encoded
+        on another thread.  Only for COPY tables, not merged ones."""
+        if table not in self.tables:
+            raise KeyError(f"BulkWriter has no COPY spec for table {table!r}")
+        if not n_rows:
+            return
+        self._chunks.setdefault(table, []).append(text)
+        self._counts[table] = self._counts.get(table, 0) + n_rows
+        self._bytes += len(text)
+
+    def pending_rows(self) -> int:
+        return sum(self._counts.values())
+
+    def pending_bytes(self) -> int:
+        """Size of the buffered rows in COPY text form."""
+        return self._bytes
+
+    def clear(self) -> None:
+        self._chunks.clear()
+        self._rows.clear()
+        self._counts.clear()
+        self._bytes = 0
+
+    def mark(self) -> Tuple:
+        """Snapshot of the buffer sizes, for `rollback_to()`."""
+        return ({t: len(c) for t, c in self._chunks.items()},
+                {t: len(r) for t, r in self._rows.items()},
+                dict(self._counts), self._bytes)
+
+    def rollback_to(self, mark: Tuple) -> None:
+        """Drop everything added since `mark()` (e.g. one failed game)."""
+        chunks, rows, counts, size = mark
+        for table in list(self._chunks):
+            del self._chunks[table][chunks.get(table, 0):]
+        for table in list(self._rows):
+            del self._rows[table][rows.get(table, 0):]
+        self._counts = {t: n for t, n in counts.items() if n}
+        self._bytes = size
+
+    @profiled
+    def flush(self) -> Dict[str, int]:
+        """
+        Write every buffered row; returns rows sent per table.  Rows the
+        merge actually inserted (conflicts excluded) add up in `inserted`.
+        """
+        sent = dict(self._counts)
+        for table in self.tables:                 # spec order, not add order
+            chunks = self._chunks.get(table)
+            if chunks:
+                with DB_FLUSH.labels(table).time(), profile_stage(f"flush {table}"):
+                    n = self._copy_merge(table, "".join(chunks))
+                self.inserted[table] = self.inserted.get(table, 0) + n
+        for table, rows in self._rows.items():
+            if rows:
+                with DB_FLUSH.labels(table).time(), profile_stage(f"flush {table}"):
+                    self.merged[table](self.cur, rows)
+        self.clear()
+        return sent
+
+    def _copy_merge(self, table: str, payload: str) -> int:
+        """COPY into a staging table and merge; returns rows inserted."""
+        spec = self.tables[table]
+        stage = f"_stage_{table}"
+        cols = ", ".join(spec.columns)
+        cur = self.cur
+        # temp table lives for the session; recreated if a rollback dropped it
+        cur.execute(f"""
+            CREATE TEMP TABLE IF NOT EXISTS {stage}
+                (LIKE {table} INCLUDING DEFAULTS);
+        """)
+        cur.copy_expert(f"COPY {stage} ({cols}) FROM STDIN",
+                        io.StringIO(payload))
+        cur.execute(f"""
+            INSERT INTO {table} ({cols})
+            SELECT {cols} FROM {stage}
+            ON CONFLICT ({", ".join(spec.conflict)}) DO NOTHING;
+        """)
+        inserted = cur.rowcount
+        cur.execute(f"DELETE FROM {stage};")
+        return inserted
+
+
+# ─────────────────────────────────────
+#  A C C U M U L A T O R
+# ─────────────────────────────────────
+MAX_ROWS  = 50_000            # buffered rows across all tables
+MAX_BYTES = 8 << 20           # 8 MiB of COPY text
+MAX_AGE   = 30.0              # seconds since the first unflushed row
+
+
+class RowAccumulator(BulkWriter):
+    """
+    A `BulkWriter` that buffers across games and flushes on thresholds.
+
+    `maybe_flush()` is meant to be called at game boundaries (never in the
+    middle of a game), so a flush always contains whole games; it returns
+    the per-table row counts when it flushed and None otherwise.  Any
+    threshold may be None to disable it.  Like `BulkWriter`, it never
+    commits – commit after a flush.
+    """
+
+    def __init__(self, cur,
+                 max_rows: Optional[int] = MAX_ROWS,
+                 max_bytes: Optional[int] = MAX_BYTES,
+                 max_age: Optional[float] = MAX_AGE,
+                 **kwargs):
+        super().__init__(cur, **kwargs)
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._oldest: Optional[float] = None     # monotonic time of first add
+        # flush statistics
+        self.flushes = 0
+        self.flush_seconds = 0.0
+        self.rows_flushed: Dict[str, int] = {}
+        self.bytes_flushed = 0
+        self.reasons: Dict[str, int] = {}
+
+    def add(self, table: str, rows: Iterable[Tuple]) -> None:
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+        super().add(table, rows)
+
+    def add_encoded(self, table: str, text: str, n_rows: int) -> None:
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+        super().add_encoded(table, text, n_rows)
+
+    def clear(self) -> None:
+        super().clear()
+        self._oldest = None
+
+    def rollback_to(self, mark: Tuple) -> None:
+        super().rollback_to(mark)
+        if not self._counts:
+            self._oldest = None
+
+    def age(self) -> float:
+        """Seconds since the oldest buffered row was added."""
+        return 0.0 if self._oldest is None else time.monotonic() - self._oldest
+
+    def flush_reason(self) -> Optional[str]:
+        """Which threshold is exceeded – 'rows', 'bytes', 'age' – or None."""
+        if not self._counts:
+            return None
+        if self.max_rows is not None and self.pending_rows() >= self.max_rows:
+            return "rows"
+        if self.max_bytes is not None and self._bytes >= self.max_bytes:
+            return "bytes"
+        if self.max_age is not None and self.age() >= self.max_age:
+            return "age"
+        return None
+
+    def maybe_flush(self) -> Optional[Dict[str, int]]:
+        reason = self.flush_reason()
+        return self.flush(reason) if reason else None
+
+    def flush(self, reason: str = "manual") -> Dict[str, int]:
+        if not self._counts:
+            self._oldest = None
+            return {}
+        size = self._bytes
+        t0 = time.perf_counter()
+        sent = super().flush()
+        self.flush_seconds += time.perf_counter() - t0
+        self.flushes += 1
+        self.bytes_flushed += size
+        self.reasons[reason] = self.reasons.get(reason, 0) + 1
+        for table, n in sent.items():
+            self.rows_flushed[table] = self.rows_flushed.get(table, 0) + n
+        return sent
+
+    def stats(self) -> Dict[str, Union[int, float, Dict[str, int]]]:
+        rows = sum(self.rows_flushed.values())
+        return {
+            "flushes": self.flushes,
+            "rows": rows,
+            "bytes": self.bytes_flushed,
+            "seconds": self.flush_seconds,
+            "rows_per_flush": rows / self.flushes if self.flushes else 0.0,
+            "rows_per_sec": rows / self.flush_seconds if self.flush_seconds else 0.0,
+            "by_table": dict(self.rows_flushed),
+            "reasons": dict(self.reasons),
+            "pending_rows": self.pending_rows(),
+        }
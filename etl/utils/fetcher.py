@@ -0,0 +1,119 @@
+"""
+Concurrent boxscore fetching for the loaders.
+
+The StatsAPI is latency bound, so instead of pulling one game at a time and
+sleeping in between we keep a bounded number of requests in flight.  Pacing
+is not done here: every request goes through the process-wide adaptive
+`RateController` in `utils.http_client`, which finds the fastest rate and
+concurrency the API tolerates.  `concurrency` is only the number of worker
+threads, i.e. an upper bound on what the controller may use.
+
+Retries are *not* re-implemented here: each worker simply runs the existing
+`safe_*` helper in a thread, so the retry / back-off behaviour is identical to
+the serial loaders.
+"""
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Iterable, Iterator, Optional, Tuple
+
+from .baseball_stats import safe_boxscore_data
+from .http_client import rate_controller
+from .metrics import GAMES_FETCHED
+
+
+def _default_concurrency() -> int:
+    return rate_controller().max_concurrency
+
+
+async def _fetch_one(gamePk: int,
+                     fetch: Callable[[int], Any],
+                     sem: asyncio.Semaphore) -> Any:
+    async with sem:
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(None, fetch, gamePk)
+        except Exception as e:             # same outcome as a failed safe_* call
+            print(f"Failed to retrieve gamePk {gamePk}: {e}")
+            return None
+    if result is not None:
+        GAMES_FETCHED.inc()
+    return result
+
+
+# ─────────────────────────────────────
+#  E N G I N E
+# ─────────────────────────────────────
+async def aiter_boxscores(game_pks: Iterable[int],
+                          fetch: Callable[[int], Any] = safe_boxscore_data,
+                          concurrency: Optional[int] = None) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    Yield `(gamePk, fetch(gamePk))` for every gamePk, **in input order**.
+
+    Order matters: `process_player_teams` assumes games arrive in gamePk
+    order when it extends a stint, so we never reorder results even though
+    the requests complete out of order.  At most `2 * concurrency` results
+    are buffered ahead of the consumer.
+
+    A failed fetch yields `(gamePk, None)`.
+    """
+    concurrency = concurrency or _default_concurrency()
+    sem = asyncio.Semaphore(concurrency)
+    window = 2 * concurrency
+    pending: deque = deque()
+    it = iter(game_pks)
+
+    def _schedule_next() -> bool:
+        try:
+            pk = next(it)
+        except StopIteration:
+            return False
+        task = asyncio.ensure_future(_fetch_one(pk, fetch, sem))
+        pending.append((pk, task))
+        return True
+
+    try:
+        while len(pending) < window and _schedule_next():
+            pass
+        while pending:
+            pk, task = pending.popleft()
+            result = await task
+            _schedule_next()
+            yield pk, result
+    finally:
+        for _, task in pending:
+            task.cancel()
+
+
+def iter_boxscores(game_pks: Iterable[int],
+                   fetch: Callable[[int], Any] = safe_boxscore_data,
+                   concurrency: Optional[int] = None) -> Iterator[Tuple[int, Any]]:
+    """
+    Synchronous front-end to `aiter_boxscores` for the (synchronous) loaders.
+
+    Requests keep running in the worker threads while the caller is busy
+    writing the previous game to Postgres.  `concurrency` defaults to the
+    rate controller's ceiling (`STATSAPI_MAX_CONCURRENCY`).
+
+    Example
+    -------
+    >>> for gamePk, fetched in iter_boxscores(game_pks):
+    ...     if fetched is None:
+    ...         continue
+    ...     process_team_box(fetched, gamePk, cur)
+    """
+    concurrency = concurrency or _default_concurrency()
+    loop = asyncio.new_event_loop()
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    loop.set_default_executor(executor)
+    agen = aiter_boxscores(game_pks, fetch, concurrency)
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(agen.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        loop.run_until_complete(agen.aclose())
+        executor.shutdown(wait=False, cancel_futures=True)
+        loop.close()
@@ -0,0 +1,183 @@
+"""
+Savepoint-per-game micro-batching for the stats loaders.
+
+Every game runs inside its own SAVEPOINT, so a game that raises rolls
+back only its own rows (database writes, buffered writer rows and ledger
+marks) while the other games of the batch stay in the transaction.  The
+batch commits as a whole – when the writer's flush thresholds are hit or
+after `max_games` games – so we keep the throughput of large commits.
+
+Failed gamePks are kept in `failed`, handed to `on_failure` and – unless
+`dead_letter=False` – queued in `game_retry` for etl_retry.py; games that
+commit are removed from that queue once the load ledger lists all their
+stages.  With a `PlayerRegistry`, a game's "players" stage is recorded
+only after `resolve()` has written all its players; a game left with
+players the API could not resolve commits without it and is queued too.
+
+Usage
+-----
+>>> batch = GameBatch(conn, cur, writer=RowAccumulator(cur), players=players)
+>>> for gamePk, box in fetched_games:
+...     with batch.game(gamePk):
+...         load_game_stats(box, gamePk, cur, players, writer=batch.writer)
+...     batch.maybe_commit()
+>>> batch.commit()
+"""
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .baseball_stats import ledger_mark_games, retry_clear, retry_record
+from .bulk_writer import BulkWriter, RowAccumulator
+from .metrics import DB_COMMIT, GAMES_COMMITTED, GAMES_FAILED
+from .profiling import profiled
+
+MAX_GAMES = 250               # commit at least this often (games)
+SAVEPOINT = "game_load"
+
+
+def _print_failure(gamePk: int, error: BaseException) -> None:
+    print(f"💥  gamePk {gamePk} failed – rolled back. ({error})")
+
+
+class GameBatch:
+    """
+    Groups games into one transaction with a savepoint around each game.
+
+    `writer` (optional) buffers fact rows and is flushed before every
+    commit; `players` (an optional `PlayerRegistry`) is resolved on
+    `player_cur` (default: the batch cursor) before every commit.
+    `savepoints=False` skips the per-game SAVEPOINT for callers whose games
+    only add rows to `writer` (see utils.pipeline); a failing game is then
+    undone by dropping its buffered rows alone.
+    """
+
+    def __init__(self, conn, cur,
+                 writer: Optional[BulkWriter] = None,
+                 players=None,
+                 player_cur=None,
+                 max_games: int = MAX_GAMES,
+                 on_failure: Optional[Callable[[int, BaseException], Any]] = _print_failure,
+                 dead_letter: bool = True,
+                 savepoints: bool = True):
+        self.conn = conn
+        self.cur = cur
+        self.writer = writer
+        self.players = players
+        self.player_cur = player_cur or cur
+        self.max_games = max_games
+        self.on_failure = on_failure
+        self.dead_letter = dead_letter
+        self.savepoints = savepoints           # False: games only buffer rows
+        self.pending: List[int] = []           # games since the last commit
+        self.loaded: List[int] = []            # committed games
+        self.failed: Dict[int, str] = {}       # gamePk → error
+        self._unsaved: Dict[int, BaseException] = {}   # queued, not committed
+
+    # ─── per game ──────────────────────────────────────────────────────
+    @contextmanager
+    def game(self, gamePk: int) -> Iterator[None]:
+        """
+        Run one game's loaders inside a savepoint.  An exception rolls back
+        to the savepoint, is recorded, and is not re-raised.
+        """
+        mark = self.writer.mark() if self.writer is not None else None
+        if self.savepoints:
+            self.cur.execute(f"SAVEPOINT {SAVEPOINT};")
+        try:
+            yield
+        except Exception as e:
+            if self.savepoints:
+                self.cur.execute(f"ROLLBACK TO SAVEPOINT {SAVEPOINT};")
+                self.cur.execute(f"RELEASE SAVEPOINT {SAVEPOINT};")
+            if mark is not None:
+                self.writer.rollback_to(mark)
+            if self.players is not None:
+                self.players.forget(gamePk)
+            self.fail(gamePk, e)
+        else:
+            if self.savepoints:
+                self.cur.execute(f"RELEASE SAVEPOINT {SAVEPOINT};")
+            self.pending.append(gamePk)
+
+    def fail(self, gamePk: int, error: BaseException) -> None:
+        """Record a game that could not be loaded (e.g. fetch failed)."""
+        self.failed[gamePk] = repr(error)
+        GAMES_FAILED.inc()
+        if self.dead_letter:
+            retry_record(self.cur, gamePk, error)   # committed with the batch
+            self._unsaved[gamePk] = error
+        if self.on_failure is not None:
+            self.on_failure(gamePk, error)
+
+    def _settle_players(self) -> None:
+        """
+        Record the "players" stage for games whose players are all in the
+        table now; queue the others, so etl_retry.py looks them up again.
+        """
+        complete, missing = self.players.settle()
+        ledger_mark_games(self.cur, complete, "players")
+        if not missing:
+            return
+        for gamePk, ids in sorted(missing.items()):
+            if self.dead_letter:                        # committed with the batch
+                retry_record(self.cur, gamePk,
+                             RuntimeError(f"no /people data for {len(ids)} players"))
+        print(f"⚠️  {len(missing)} games committed without their players "
+              f"stage (unresolved ids: {len(set().union(*missing.values()))})"
+              + (" – queued for etl_retry.py" if self.dead_letter else ""))
+
+    # ─── per batch ─────────────────────────────────────────────────────
+    def commit_due(self) -> Optional[str]:
+        """Why the batch should commit now ('games', 'rows', …), or None."""
+        if len(self.pending) >= self.max_games:
+            return "games"
+        if isinstance(self.writer, RowAccumulator):
+            return self.writer.flush_reason()
+        return None
+
+    def maybe_commit(self) -> List[int]:
+        reason = self.commit_due()
+        return self.commit(reason) if reason else []
+
+    @profiled
+    def commit(self, reason: str = "manual") -> List[int]:
+        """
+        Flush and commit the batch; returns the committed gamePks.  If the
+        flush or commit itself fails, the whole batch is rolled back and
+        every game in it is recorded as failed.
+        """
+        games, self.pending = self.pending, []
+        started = time.perf_counter()
+        try:
+            if self.players is not None:
+                self.players.resolve(self.player_cur)
+                self._settle_players()
+            if isinstance(self.writer, RowAccumulator):
+                self.writer.flush(reason)
+            elif self.writer is not None:
+                self.writer.flush()
+            if self.dead_letter:
+                retry_clear(self.cur, games)
+            self.conn.commit()
+        except Exception as e:
+            self.conn.rollback()
+            if self.writer is not None:
+                self.writer.clear()
+            if self.players is not None:
+                self.players.rollback()
+            # the rollback also dropped this batch's earlier dead-letter rows
+            for gamePk, error in self._unsaved.items():
+                retry_record(self.cur, gamePk, error)
+            for gamePk in games:
+                self.fail(gamePk, e)
+            self.conn.commit()                  # keep the dead-letter rows
+            self._unsaved.clear()
+            return []
+        self._unsaved.clear()
+        DB_COMMIT.observe(time.perf_counter() - started)
+        GAMES_COMMITTED.inc(len(games))
+        if self.players is not None:
+            self.players.commit()
+        self.loaded.extend(games)
+        return games
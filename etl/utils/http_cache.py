@@ -0,0 +1,261 @@
+"""
+Persistent on-disk cache for StatsAPI responses.
+
+Responses are stored gzip-compressed under `STATSAPI_CACHE_DIR`, one file per
+(endpoint, params) key, with a small SQLite index that tracks size, expiry and
+last access.  The index lets several loader processes share one cache and
+gives us LRU eviction once the cache grows past `STATSAPI_CACHE_MAX_MB`.
+
+Expiry policy (decided by the callers in `baseball_stats.py`):
+  • boxscores of games the schedule reported as Final → never expire
+  • boxscores of anything else (in progress / not yet final) → short TTL
+  • schedules → TTL, since scores and statuses change during the day
+  • people → long TTL, bio fields rarely change
+
+Set `STATSAPI_CACHE=0` to bypass the cache entirely.
+"""
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Union
+
+from .metrics import CACHE_HIT_RATIO
+
+CACHE_DIR       = ".statsapi_cache"   # override with STATSAPI_CACHE_DIR
+CACHE_MAX_MB    = 2048                # override with STATSAPI_CACHE_MAX_MB
+
+LIVE_GAME_TTL   = 5 * 60              # seconds – game not (yet) Final
+SCHEDULE_TTL    = 6 * 60 * 60         # seconds
+PEOPLE_TTL      = 7 * 24 * 60 * 60    # seconds
+
+_INDEX_SQL = """
+CREATE TABLE IF NOT EXISTS entries (
+    key          TEXT PRIMARY KEY,
+    endpoint     TEXT NOT NULL,
+    size         INTEGER NOT NULL,
+    expires_at   REAL,                 -- NULL → immutable
+    last_access  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_access);
+CREATE TABLE IF NOT EXISTS final_games (
+    gamePk       INTEGER PRIMARY KEY
+);
+"""
+
+
+class ResponseCache:
+    """
+    Compressed, size-capped, LRU-evicting response store.
+
+    Thread-safe (the concurrent fetcher calls it from worker threads) and
+    process-safe (SQLite serialises writers; blobs are written atomically).
+    """
+
+    def __init__(self, root: str = CACHE_DIR,
+                 max_bytes: int = int(CACHE_MAX_MB * 1024 * 1024)):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._total = 0                        # bytes indexed, kept by put/_drop
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        os.makedirs(root, exist_ok=True)
+
+    # ----------  plumbing  ----------
+    def _conn(self) -> sqlite3.Connection:
+        # a connection must not cross a fork → reopen in child processes
+        if self._db is None or self._pid != os.getpid():
+            db = sqlite3.connect(os.path.join(self.root, "index.sqlite3"),
+                                 timeout=30, check_same_thread=False,
+                                 isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL;")
+            db.executescript(_INDEX_SQL)
+            self._db, self._pid = db, os.getpid()
+            self._total = self._indexed_bytes(db)
+        return self._db
+
+    @staticmethod
+    def _indexed_bytes(db: sqlite3.Connection) -> int:
+        return db.execute("SELECT COALESCE(SUM(size), 0) FROM entries;").fetchone()[0]
+
+    @staticmethod
+    def make_key(endpoint: str, params: Dict[str, Any]) -> str:
+        blob = json.dumps([endpoint, params], sort_keys=True, default=str)
+        return hashlib.sha1(blob.encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.json.gz")
+
+    def _drop(self, db: sqlite3.Connection, key: str) -> None:
+        row = db.execute("SELECT size FROM entries WHERE key = ?;", (key,)).fetchone()
+        if row is not None:
+            db.execute("DELETE FROM entries WHERE key = ?;", (key,))
+            self._total -= row[0]
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    # ----------  public API  ----------
+    def get(self, endpoint: str, params: Dict[str, Any]) -> Optional[Any]:
+        key = self.make_key(endpoint, params)
+        now = time.time()
+        with self._lock:
+            db = self._conn()
+            row = db.execute("SELECT expires_at FROM entries WHERE key = ?;",
+                             (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            if row[0] is not None and row[0] < now:
+                self._drop(db, key)
+                self.misses += 1
+                return None
+            try:
+                with open(self._path(key), "rb") as fh:
+                    value = json.loads(gzip.decompress(fh.read()))
+            except (OSError, ValueError):      # blob vanished or is corrupt
+                self._drop(db, key)
+                self.misses += 1
+                return None
+            db.execute("UPDATE entries SET last_access = ? WHERE key = ?;",
+                       (now, key))
+            self.hits += 1
+            return value
+
+    def put(self, endpoint: str, params: Dict[str, Any], value: Any,
+            ttl: Optional[float] = None) -> None:
+        """Store `value`; `ttl=None` marks the entry immutable."""
+        key = self.make_key(endpoint, params)
+        data = gzip.compress(json.dumps(value).encode(), compresslevel=6)
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+
+        now = time.time()
+        with self._lock:
+            db = self._conn()
+            old = db.execute("SELECT size FROM entries WHERE key = ?;",
+                             (key,)).fetchone()
+            db.execute("""
+                INSERT INTO entries (key, endpoint, size, expires_at, last_access)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (key) DO UPDATE
+                   SET size = excluded.size,
+                       expires_at = excluded.expires_at,
+                       last_access = excluded.last_access;
+            """, (key, endpoint, len(data),
+                  None if ttl is None else now + ttl, now))
+            self._total += len(data) - (old[0] if old else 0)
+            if self._total > self.max_bytes:
+                self._evict(db)
+
+    def _evict(self, db: sqlite3.Connection) -> None:
+        """
+        Drop least recently used entries until the cache fits again.  The
+        running total only sees this process's writes, so it is re-read
+        from the index first – other loaders may have added or evicted.
+        """
+        self._total = self._indexed_bytes(db)
+        if self._total <= self.max_bytes:
+            return
+        for (key,) in db.execute(
+                "SELECT key FROM entries ORDER BY last_access;").fetchall():
+            self._drop(db, key)
+            self.evictions += 1
+            if self._total <= self.max_bytes:
+                break
+
+    def mark_final(self, game_pks: Iterable[int]) -> None:
+        """Remember games the schedule reported Final → their boxscore is immutable."""
+        with self._lock:
+            self._conn().executemany(
+                "INSERT OR IGNORE INTO final_games (gamePk) VALUES (?);",
+                [(int(pk),) for pk in game_pks])
+
+    def is_final(self, gamePk: int) -> bool:
+        with self._lock:
+            return self._conn().execute(
+                "SELECT 1 FROM final_games WHERE gamePk = ?;",
+                (int(gamePk),)).fetchone() is not None
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        with self._lock:
+            n, size = self._conn().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries;").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": n,
+            "bytes": size,
+        }
+
+
+# ─────────────────────────────────────
+#  M O D U L E   S I N G L E T O N
+# ─────────────────────────────────────
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> Optional[ResponseCache]:
+    """
+    The shared cache, or None when disabled via `STATSAPI_CACHE=0`.
+
+    The environment is read on first use (not at import) so settings loaded
+    by `load_dotenv()` in the scripts are honoured.
+    """
+    global _cache
+    if os.getenv("STATSAPI_CACHE", "1") == "0":
+        return None
+    with _cache_lock:
+        if _cache is None:
+            max_mb = float(os.getenv("STATSAPI_CACHE_MAX_MB", CACHE_MAX_MB))
+            _cache = ResponseCache(os.getenv("STATSAPI_CACHE_DIR", CACHE_DIR),
+                                   int(max_mb * 1024 * 1024))
+        return _cache
+
+
+def _hit_ratio() -> float:
+    if _cache is None:
+        return 0.0
+    lookups = _cache.hits + _cache.misses
+    return _cache.hits / lookups if lookups else 0.0
+
+
+CACHE_HIT_RATIO.set_function(_hit_ratio)
+
+
+def cached_call(endpoint: str,
+                params: Dict[str, Any],
+                fetch: Callable[[], Optional[Any]],
+                ttl: Union[None, float, Callable[[Any], Optional[float]]] = None,
+                fresh: bool = False) -> Optional[Any]:
+    """
+    Return the cached response for (endpoint, params) or call `fetch()` and
+    store its result.  `ttl` may be a number, None (immutable) or a callable
+    deciding from the fresh value.  Failed fetches (None) are never cached.
+    `fresh=True` skips the cached copy but still stores the new response.
+    """
+    cache = get_cache()
+    if cache is not None and not fresh:
+        hit = cache.get(endpoint, params)
+        if hit is not None:
+            return hit
+    value = fetch()
+    if value is not None and cache is not None:
+        cache.put(endpoint, params, value, ttl(value) if callable(ttl) else ttl)
+    return value
@@ -0,0 +1,384 @@
+"""
+Shared HTTP client for every StatsAPI call made by the loaders.
+
+One keep-alive `requests.Session` per process gives us:
+  • connection pooling – no TCP+TLS handshake per request, and a hard cap on
+    concurrent connections to the API host (`STATSAPI_POOL_SIZE`)
+  • gzip negotiation – boxscores compress roughly 10:1
+  • jittered exponential back-off – parallel jobs don't retry in lock-step
+  • server back-pressure – `Retry-After` on 429 / 503 is honoured
+  • adaptive pacing – every request goes through one `RateController`
+    (AIMD): rate and concurrency grow additively while responses are
+    healthy and are cut multiplicatively on 429, 5xx, network errors or
+    rising latency, so no loader needs hand-tuned sleeps
+
+Environment (read on first use, so `load_dotenv()` in the scripts applies):
+    STATSAPI_BASE_URL         default https://statsapi.mlb.com/api
+    STATSAPI_POOL_SIZE        keep-alive connections per host (default 16)
+    STATSAPI_TIMEOUT          read timeout in seconds (default 30)
+    STATSAPI_RPS              starting request rate (default 5)
+    STATSAPI_MAX_RPS          ceiling for the request rate (default 50)
+    STATSAPI_MAX_CONCURRENCY  ceiling for requests in flight (default 16)
+"""
+import email.utils
+import os
+import random
+import threading
+import re
+import time
+from typing import Any, Dict, Optional, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .metrics import (API_CONCURRENCY, API_LATENCY, API_RATE, API_REQUESTS,
+                      API_RETRIES)
+from .profiling import profiled
+
+BASE_URL        = "https://statsapi.mlb.com/api"
+POOL_SIZE       = 16
+CONNECT_TIMEOUT = 5.0
+READ_TIMEOUT    = 30.0
+MAX_BACKOFF     = 60.0               # seconds – cap for a single back-off sleep
+RETRY_STATUSES  = {429, 500, 502, 503, 504}
+
+RATE_START        = 5.0             # req/s before any feedback
+RATE_MIN          = 0.5
+RATE_MAX          = 50.0
+RATE_STEP         = 1.0             # req/s gained per second of healthy traffic
+CONCURRENCY_START = 4
+DECREASE          = 0.5             # cut on 429 / 5xx / network error
+LATENCY_DECREASE  = 0.8             # gentler cut when latency rises
+LATENCY_FACTOR    = 2.0             # EWMA above baseline × this → congested
+LATENCY_ALPHA     = 0.2             # EWMA weight of the newest sample
+LATENCY_WARMUP    = 10              # samples per endpoint before judging
+CUT_COOLDOWN      = 2.0             # seconds – one cut per congestion episode
+
+
+class StatsAPIError(Exception):
+    """Raised when a StatsAPI request failed on every attempt (or for good)."""
+
+
+# ─────────────────────────────────────
+#  S E S S I O N
+# ─────────────────────────────────────
+_session: Optional[requests.Session] = None
+_session_pid: Optional[int] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """The process-wide pooled session (re-created after a fork)."""
+    global _session, _session_pid
+    with _session_lock:
+        if _session is None or _session_pid != os.getpid():
+            pool_size = int(os.getenv("STATSAPI_POOL_SIZE", POOL_SIZE))
+            adapter = HTTPAdapter(pool_connections=4,
+                                  pool_maxsize=pool_size,
+                                  pool_block=True)   # per-host connection limit
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update({
+                "Accept": "application/json",
+                "Accept-Encoding": "gzip, deflate",
+                "User-Agent": "BeatTheHouse-ETL",
+            })
+            _session, _session_pid = session, os.getpid()
+        return _session
+
+
+def _url(path: str) -> str:
+    if path.startswith(("http://", "https://")):
+        return path
+    base = os.getenv("STATSAPI_BASE_URL", BASE_URL).rstrip("/")
+    return f"{base}/{path.lstrip('/')}"
+
+
+# ─────────────────────────────────────
+#  B A C K - O F F
+# ─────────────────────────────────────
+def backoff_delay(attempt: int, base_delay: float,
+                  cap: float = MAX_BACKOFF) -> float:
+    """Full-jitter exponential back-off: uniform(0, min(cap, base · 2^attempt))."""
+    return random.uniform(0, min(cap, base_delay * (2 ** attempt)))
+
+
+def _retry_after(response: Optional[requests.Response]) -> Optional[float]:
+    """Seconds requested by a `Retry-After` header (delta or HTTP-date form)."""
+    if response is None:
+        return None
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+# ─────────────────────────────────────
+#  A D A P T I V E   R A T E   (AIMD)
+# ─────────────────────────────────────
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def endpoint_of(path: str) -> str:
+    """'v1/game/745123/boxscore' → 'v1/game/{id}/boxscore' (query dropped)."""
+    path = path.split("?", 1)[0]
+    if path.startswith(("http://", "https://")):
+        path = path.split("/", 3)[-1]
+    return _ID_SEGMENT.sub("/{id}", "/" + path.strip("/")).lstrip("/")
+
+
+class RateController:
+    """
+    Process-wide pacing for StatsAPI requests.
+
+    `acquire()` blocks until a request may start – a token from a bucket
+    refilled at `rate` req/s and a free slot among `concurrency` requests
+    in flight – and `release()` reports how it went:
+
+    * "ok" with normal latency → additive increase: `rate` grows by about
+      RATE_STEP per second of traffic, `concurrency` by about one per
+      window of requests;
+    * "throttled" (429), "error" (5xx, network) → multiplicative decrease
+      by DECREASE;
+    * "ok" but the endpoint's latency EWMA above LATENCY_FACTOR × its
+      baseline → decrease by LATENCY_DECREASE.
+
+    Cuts are at most one per CUT_COOLDOWN, so a burst of failures from one
+    congested moment halves the rate once, not to the floor.  Thread-safe.
+    """
+
+    def __init__(self,
+                 rate: float = RATE_START,
+                 max_rate: float = RATE_MAX,
+                 concurrency: int = CONCURRENCY_START,
+                 max_concurrency: int = POOL_SIZE):
+        self._cond = threading.Condition()
+        self.max_rate = float(max_rate)
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.rate = min(float(rate), self.max_rate)
+        self.concurrency = float(min(concurrency, self.max_concurrency))
+        self.in_flight = 0
+        self._tokens = 1.0
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._last_cut = float("-inf")
+        self._latency: Dict[str, float] = {}       # endpoint → EWMA (s)
+        self._baseline: Dict[str, float] = {}      # endpoint → healthy EWMA
+        self._samples: Dict[str, int] = {}
+        # counters
+        self.requests = 0
+        self.throttled = 0
+        self.errors = 0
+        self.cuts = 0
+
+    # ─── limits ────────────────────────────────────────────────────────
+    def configure(self, max_rate: Optional[float] = None,
+                  max_concurrency: Optional[int] = None) -> None:
+        """Lower (or raise) the ceilings, e.g. a per-worker share of a budget."""
+        with self._cond:
+            if max_rate is not None:
+                self.max_rate = float(max_rate)
+                self.rate = min(self.rate, self.max_rate)
+            if max_concurrency is not None:
+                self.max_concurrency = max(1, int(max_concurrency))
+                self.concurrency = min(self.concurrency, self.max_concurrency)
+            self._cond.notify_all()
+
+    def pause(self, seconds: float) -> None:
+        """Hold every request for `seconds` (server sent `Retry-After`)."""
+        with self._cond:
+            self._paused_until = max(self._paused_until,
+                                     time.monotonic() + seconds)
+
+    # ─── per request ───────────────────────────────────────────────────
+    def _refill(self, now: float) -> None:
+        capacity = max(1.0, self.rate)
+        self._tokens = min(capacity,
+                           self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> None:
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._paused_until:
+                    wait: Optional[float] = self._paused_until - now
+                elif self.in_flight >= int(self.concurrency):
+                    wait = None                       # until a release
+                elif self._tokens < 1.0:
+                    wait = (1.0 - self._tokens) / self.rate
+                else:
+                    self._tokens -= 1.0
+                    self.in_flight += 1
+                    return
+                self._cond.wait(timeout=wait)
+
+    def release(self, endpoint: str, latency: float, outcome: str) -> None:
+        """`outcome` is "ok", "throttled" or "error"."""
+        with self._cond:
+            self.in_flight -= 1
+            self.requests += 1
+            if outcome == "ok":
+                if self._congested(endpoint, latency):
+                    self._cut(LATENCY_DECREASE)
+                else:
+                    self._grow()
+            else:
+                if outcome == "throttled":
+                    self.throttled += 1
+                else:
+                    self.errors += 1
+                self._cut(DECREASE)
+            self._cond.notify_all()
+
+    def _grow(self) -> None:
+        self.rate = min(self.max_rate, self.rate + RATE_STEP / max(self.rate, 1.0))
+        self.concurrency = min(float(self.max_concurrency),
+                               self.concurrency + 1.0 / max(self.concurrency, 1.0))
+
+    def _cut(self, factor: float) -> None:
+        now = time.monotonic()
+        if now - self._last_cut < CUT_COOLDOWN:
+            return
+        self._last_cut = now
+        self.cuts += 1
+        self.rate = max(RATE_MIN, self.rate * factor)
+        self.concurrency = max(1.0, self.concurrency * factor)
+
+    def _congested(self, endpoint: str, latency: float) -> bool:
+        ewma = self._latency.get(endpoint, latency)
+        ewma += LATENCY_ALPHA * (latency - ewma)
+        self._latency[endpoint] = ewma
+        n = self._samples[endpoint] = self._samples.get(endpoint, 0) + 1
+        base = self._baseline.setdefault(endpoint, ewma)
+        if ewma < base:
+            self._baseline[endpoint] = ewma
+        else:                                 # let a slower API become normal
+            self._baseline[endpoint] = base + 0.01 * (ewma - base)
+        return n > LATENCY_WARMUP and ewma > LATENCY_FACTOR * base
+
+    # ─── introspection ─────────────────────────────────────────────────
+    def snapshot(self) -> Dict[str, Union[int, float, Dict[str, float]]]:
+        """Current limits and counters, for progress lines and metrics."""
+        with self._cond:
+            return {
+                "rate": self.rate,
+                "concurrency": int(self.concurrency),
+                "in_flight": self.in_flight,
+                "requests": self.requests,
+                "throttled": self.throttled,
+                "errors": self.errors,
+                "cuts": self.cuts,
+                "latency": dict(self._latency),
+            }
+
+
+_controller: Optional[RateController] = None
+_controller_pid: Optional[int] = None
+
+
+def rate_controller() -> RateController:
+    """The process-wide `RateController` (re-created after a fork)."""
+    global _controller, _controller_pid
+    with _session_lock:
+        if _controller is None or _controller_pid != os.getpid():
+            _controller = RateController(
+                rate=float(os.getenv("STATSAPI_RPS", RATE_START)),
+                max_rate=float(os.getenv("STATSAPI_MAX_RPS", RATE_MAX)),
+                max_concurrency=int(os.getenv("STATSAPI_MAX_CONCURRENCY",
+                                              os.getenv("STATSAPI_POOL_SIZE", POOL_SIZE))))
+            _controller_pid = os.getpid()
+        return _controller
+
+
+API_RATE.set_function(lambda: rate_controller().rate)
+API_CONCURRENCY.set_function(lambda: int(rate_controller().concurrency))
+
+
+def _send(session: requests.Session, endpoint: str, url: str,
+          params: Optional[Dict[str, Any]], timeout) -> requests.Response:
+    """One paced GET; the outcome is fed back to the rate controller."""
+    controller = rate_controller()
+    controller.acquire()
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        response = session.get(url, params=params, timeout=timeout)
+        if response.status_code == 429:
+            outcome = "throttled"
+        elif response.status_code not in RETRY_STATUSES:
+            outcome = "ok"
+        return response
+    finally:
+        elapsed = time.perf_counter() - started
+        controller.release(endpoint, elapsed, outcome)
+        API_LATENCY.labels(endpoint).observe(elapsed)
+        API_REQUESTS.labels(endpoint, outcome).inc()
+
+
+# ─────────────────────────────────────
+#  R E Q U E S T S
+# ─────────────────────────────────────
+@profiled
+def get_json(path: str,
+             params: Optional[Dict[str, Any]] = None,
+             retries: int = 5,
+             base_delay: float = 2.0,
+             label: Optional[str] = None) -> Any:
+    """
+    GET `path` (relative to `STATSAPI_BASE_URL`, or an absolute URL) and
+    return the decoded JSON body.
+
+    Connection errors, timeouts, bad JSON, 429 and 5xx are retried up to
+    `retries` times; other 4xx responses fail immediately.
+
+    Raises
+    ------
+    StatsAPIError
+        once the request is given up on.
+    """
+    url = _url(path)
+    label = label or path
+    endpoint = endpoint_of(path)
+    session = get_session()
+    timeout = (CONNECT_TIMEOUT,
+               float(os.getenv("STATSAPI_TIMEOUT", READ_TIMEOUT)))
+
+    for attempt in range(retries):
+        response = None
+        try:
+            response = _send(session, endpoint, url, params, timeout)
+            if response.status_code not in RETRY_STATUSES:
+                response.raise_for_status()
+                return response.json()
+            error: Exception = requests.HTTPError(
+                f"{response.status_code} {response.reason}", response=response)
+        except requests.HTTPError as e:             # non-retryable 4xx
+            raise StatsAPIError(f"{label}: {e}") from e
+        except requests.exceptions.RequestException as e:
+            error = e
+
+        if attempt + 1 == retries:
+            raise StatsAPIError(
+                f"{label}: gave up after {retries} attempts ({error})") from error
+
+        sleep = backoff_delay(attempt, base_delay)
+        server_wait = _retry_after(response)
+        if server_wait is not None:                  # server knows best
+            sleep = max(sleep, min(server_wait, MAX_BACKOFF))
+            rate_controller().pause(min(server_wait, MAX_BACKOFF))
+        API_RETRIES.labels(endpoint).inc()
+        print(f"Retrying {label} in {sleep:.1f}s due to error: {error}")
+        time.sleep(sleep)
+
+    raise StatsAPIError(f"{label}: no attempts made (retries={retries})")
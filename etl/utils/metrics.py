@@ -0,0 +1,119 @@
+"""
+Prometheus instrumentation for the loaders.
+
+All metrics live in one `REGISTRY` (not the client's global default), so a
+textfile dump holds exactly the ETL series.  The modules that own the
+numbers update them: `http_client` (API latency, retries, rate and
+concurrency), `http_cache` (hit ratio), `fetcher` (games fetched),
+`bulk_writer` (flush time per table), `game_batch` (games committed and
+failed, commit time) and `pipeline` (queue depth).
+
+Two ways out:
+
+* `serve(port)` – HTTP exporter for long backfills (`ETL_METRICS_PORT`).
+  Every backfill worker process serves its own port (`port + n`), because
+  each process counts for itself.
+* `dump(path)` – textfile for cron runs such as etl_update, to be picked up
+  by node_exporter's textfile collector (`ETL_METRICS_TEXTFILE`).
+
+    ETL_METRICS_TEXTFILE=/var/lib/node_exporter/bth_update.prom python etl_update.py
+"""
+import os
+import time
+from typing import Optional
+
+from prometheus_client import (CollectorRegistry, Counter, Gauge, Histogram,
+                               start_http_server, write_to_textfile)
+
+REGISTRY = CollectorRegistry(auto_describe=True)
+
+# StatsAPI calls: 50 ms … 30 s; DB flushes: 1 ms … 60 s
+API_BUCKETS = (.05, .1, .25, .5, 1, 2.5, 5, 10, 30)
+DB_BUCKETS  = (.001, .005, .01, .05, .1, .25, .5, 1, 2.5, 5, 10, 30, 60)
+
+# ─────────────────────────────────────
+#  G A M E S
+# ─────────────────────────────────────
+GAMES_FETCHED = Counter(
+    "bth_games_fetched_total", "Boxscores fetched successfully.",
+    registry=REGISTRY)
+GAMES_COMMITTED = Counter(
+    "bth_games_committed_total", "Games whose rows were committed.",
+    registry=REGISTRY)
+GAMES_FAILED = Counter(
+    "bth_games_failed_total", "Games that failed to fetch, map or load.",
+    registry=REGISTRY)
+
+# ─────────────────────────────────────
+#  S T A T S A P I
+# ─────────────────────────────────────
+API_LATENCY = Histogram(
+    "bth_statsapi_request_seconds", "StatsAPI request latency per endpoint.",
+    ["endpoint"], buckets=API_BUCKETS, registry=REGISTRY)
+API_REQUESTS = Counter(
+    "bth_statsapi_requests_total", "StatsAPI requests by endpoint and outcome.",
+    ["endpoint", "outcome"], registry=REGISTRY)
+API_RETRIES = Counter(
+    "bth_statsapi_retries_total", "StatsAPI attempts retried after an error.",
+    ["endpoint"], registry=REGISTRY)
+API_RATE = Gauge(
+    "bth_statsapi_rate", "Request rate allowed by the rate controller (req/s).",
+    registry=REGISTRY)
+API_CONCURRENCY = Gauge(
+    "bth_statsapi_concurrency", "Requests in flight allowed by the rate controller.",
+    registry=REGISTRY)
+CACHE_HIT_RATIO = Gauge(
+    "bth_statsapi_cache_hit_ratio", "Share of StatsAPI lookups served by the response cache.",
+    registry=REGISTRY)
+
+# ─────────────────────────────────────
+#  D A T A B A S E
+# ─────────────────────────────────────
+DB_FLUSH = Histogram(
+    "bth_db_flush_seconds", "Time to write one table's buffered rows.",
+    ["table"], buckets=DB_BUCKETS, registry=REGISTRY)
+DB_COMMIT = Histogram(
+    "bth_db_commit_seconds", "Time to flush and commit one batch of games.",
+    buckets=DB_BUCKETS, registry=REGISTRY)
+QUEUE_DEPTH = Gauge(
+    "bth_pipeline_queue_depth", "Games waiting between two pipeline stages.",
+    ["queue"], registry=REGISTRY)
+
+# ─────────────────────────────────────
+#  R U N
+# ─────────────────────────────────────
+RUN_STARTED = Gauge(
+    "bth_run_start_timestamp_seconds", "When this loader run started.",
+    registry=REGISTRY)
+RUN_FINISHED = Gauge(
+    "bth_run_end_timestamp_seconds", "When this loader run wrote its metrics.",
+    registry=REGISTRY)
+RUN_STARTED.set_to_current_time()
+
+
+def serve(port: Optional[int] = None) -> Optional[int]:
+    """
+    Start the HTTP exporter on `port` (default `ETL_METRICS_PORT`) in a
+    daemon thread; does nothing when neither is set.  Returns the port.
+    """
+    if port is None:
+        env = os.getenv("ETL_METRICS_PORT")
+        port = int(env) if env else None
+    if port is None:
+        return None
+    start_http_server(port, registry=REGISTRY)
+    print(f"📈 metrics on http://0.0.0.0:{port}/metrics")
+    return port
+
+
+def dump(path: Optional[str] = None) -> Optional[str]:
+    """
+    Write every metric to `path` (default `ETL_METRICS_TEXTFILE`) in the
+    text exposition format, atomically; does nothing when neither is set.
+    """
+    path = path or os.getenv("ETL_METRICS_TEXTFILE")
+    if not path:
+        return None
+    RUN_FINISHED.set(time.time())
+    write_to_textfile(path, REGISTRY)
+    return path
@@ -0,0 +1,107 @@
+"""
+Implied-probability, overround and no-vig math for `game_odds`, computed
+column-wise over whole frames, plus the incremental stage that stores the
+results in `game_odds_derived`.
+
+For a two-way market quoted in American odds:
+
+    implied   p = 100 / (ml + 100)          ml > 0
+              p = -ml / (-ml + 100)         ml < 0
+    overround   p_a + p_b - 1               (the book's margin)
+    no-vig      p_a / (p_a + p_b)           (fair, margin removed)
+
+Usage
+-----
+>>> refresh_derived_odds(cur)       # after new game_odds rows are inserted
+"""
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .bulk_writer import BulkWriter, TableSpec
+
+CHUNK_ROWS = 100_000          # game_odds rows derived per round trip
+
+# market → (side-a price column, side-b price column, output prefixes)
+MARKETS: Dict[str, Tuple[str, str, str, str]] = {
+    "ml":    ("away_money_line",  "home_money_line",  "away_ml", "home_ml"),
+    "rl":    ("away_spread_line", "home_spread_line", "away_rl", "home_rl"),
+    "total": ("over_line",        "under_line",       "over",    "under"),
+}
+
+DERIVED_SPEC = TableSpec(
+    ("gamePk", "source_id",
+     "away_ml_implied", "home_ml_implied", "ml_overround", "away_ml_fair", "home_ml_fair",
+     "away_rl_implied", "home_rl_implied", "rl_overround", "away_rl_fair", "home_rl_fair",
+     "over_implied",    "under_implied",   "total_overround", "over_fair",  "under_fair"),
+    ("gamePk", "source_id"))
+
+
+# ─────────────────────────────────────
+#  V E C T O R   M A T H
+# ─────────────────────────────────────
+def implied_prob(american) -> np.ndarray:
+    """Break-even probability of American prices; NaN for 0 / missing."""
+    ml = np.asarray(american, dtype="float64")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = np.where(ml > 0, 100.0 / (ml + 100.0), -ml / (-ml + 100.0))
+    p[~(np.abs(ml) >= 100)] = np.nan          # |price| < 100 isn't a valid line
+    return p
+
+
+def derive_odds(odds: pd.DataFrame) -> pd.DataFrame:
+    """
+    One output row per `game_odds` row with implied, overround and no-vig
+    columns for every market in `MARKETS` (rounded to the stored scale).
+    """
+    out = pd.DataFrame({"gamePk": odds["gamePk"].to_numpy(),
+                        "source_id": odds["source_id"].to_numpy()})
+    for market, (col_a, col_b, side_a, side_b) in MARKETS.items():
+        p_a = implied_prob(odds[col_a])
+        p_b = implied_prob(odds[col_b])
+        book = p_a + p_b
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out[f"{side_a}_implied"] = p_a
+            out[f"{side_b}_implied"] = p_b
+            out[f"{market}_overround"] = book - 1.0
+            out[f"{side_a}_fair"] = p_a / book
+            out[f"{side_b}_fair"] = p_b / book
+    return out[list(DERIVED_SPEC.columns)].round(5)
+
+
+# ─────────────────────────────────────
+#  I N C R E M E N T A L   S T A G E
+# ─────────────────────────────────────
+def refresh_derived_odds(cur, chunk_rows: int = CHUNK_ROWS) -> int:
+    """
+    Derive every `game_odds` row that has no `game_odds_derived` row yet
+    and COPY the results in.  Returns the number of rows derived; the
+    caller commits.
+    """
+    price_cols = [c for market in MARKETS.values() for c in market[:2]]
+    conn = cur.connection
+    derived = 0
+    # named cursor → rows stream from the server in chunks
+    with conn.cursor(name="pending_game_odds") as pending:
+        pending.itersize = chunk_rows
+        pending.execute(f"""
+            SELECT o.gamePk, o.source_id, {", ".join(f"o.{c}" for c in price_cols)}
+              FROM game_odds AS o
+         LEFT JOIN game_odds_derived AS d
+                ON d.gamePk = o.gamePk AND d.source_id = o.source_id
+             WHERE d.gamePk IS NULL;
+        """)
+        writer = BulkWriter(cur, tables={"game_odds_derived": DERIVED_SPEC},
+                            merged={})
+        while True:
+            rows = pending.fetchmany(chunk_rows)
+            if not rows:
+                break
+            odds = pd.DataFrame(rows, columns=["gamePk", "source_id", *price_cols])
+            frame = derive_odds(odds).astype(object)
+            frame = frame.where(frame.notna(), None)      # NaN → NULL
+            writer.add("game_odds_derived", frame.itertuples(index=False, name=None))
+            writer.flush()
+            derived += len(frame)
+    return derived
@@ -0,0 +1,286 @@
+"""
+Staged game pipeline: schedule → fetch → map → write.
+
+The plain loaders run every step on one thread, so the network sits idle
+while Postgres writes and the database sits idle while we wait on the API.
+`GamePipeline` runs the stages concurrently, linked by bounded queues:
+
+    schedule ─▶ fetch (thread, `iter_boxscores`) ─▶ [queue] ─▶
+    map (thread, `map_game_stats`) ─▶ [queue] ─▶ write (caller's thread)
+
+* **fetch** keeps boxscore requests in flight, paced by the adaptive
+  `RateController` (utils.http_client); `concurrency` caps its threads.
+* **map** turns each boxscore into table rows – already encoded as COPY
+  text, ledger rows included – without touching the database.
+* **write** owns its own connection: it appends each game's text to a
+  `RowAccumulator` inside a `GameBatch` and commits on its thresholds.
+  It issues no SQL per game, only the batched flushes.
+
+Backpressure: when the writer falls behind, the queues fill up and the
+fetch thread blocks on `put()`, which stops `iter_boxscores` from
+scheduling further requests.  So a slow database never makes us fetch
+further ahead of it, and the API load is the same as the serial loaders'.
+Games leave every stage in input order, which `process_player_teams`
+relies on.
+
+Usage
+-----
+>>> pipe = GamePipeline(DSN, games, done=done)
+>>> batch = pipe.run()            # games: schedule dicts or bare gamePks
+>>> pipe.stats()
+"""
+import queue
+import threading
+import time
+from contextlib import ExitStack, closing
+from typing import (Any, Callable, Dict, Iterable, List, NamedTuple,
+                    Optional, Set, Tuple, Union)
+
+from psycopg2 import connect
+
+from .baseball_stats import (PlayerRegistry, box_player_ids, map_game_stats,
+                             safe_boxscore_data)
+from .bulk_writer import MERGED_TABLES, RowAccumulator, copy_text
+from .fetcher import iter_boxscores
+from .game_batch import GameBatch, MAX_GAMES, _print_failure
+from .http_client import rate_controller
+from .metrics import QUEUE_DEPTH
+
+QUEUE_SIZE = 64               # games buffered between two stages
+_POLL = 0.2                   # seconds between stop-flag checks while blocked
+
+
+class MappedGame(NamedTuple):
+    gamePk: int
+    encoded: Dict[str, Tuple[str, int]]   # COPY table → (text, rows)
+    merged: Dict[str, List[Tuple]]        # merged table → raw rows
+    player_ids: Optional[List[int]]       # None: "players" stage not run
+    error: Optional[BaseException]        # fetch / map failure → dead letter
+
+
+class _RowSink:
+    """Collects `add(table, rows)` calls like a writer, for one game."""
+
+    def __init__(self):
+        self.rows: Dict[str, List[Tuple]] = {}
+
+    def add(self, table: str, rows: Iterable[Tuple]) -> None:
+        self.rows.setdefault(table, []).extend(rows)
+
+
+_DONE = object()               # end-of-stream marker
+
+
+class _Stopped(Exception):
+    """Raised inside a producer stage once the writer has stopped."""
+
+
+class _Stage(threading.Thread):
+    """A daemon thread whose exception is kept for the writer to re-raise."""
+
+    def __init__(self, name: str, target: Callable[[], None]):
+        super().__init__(name=name, daemon=True)
+        self._target_fn = target
+        self.error: Optional[BaseException] = None
+
+    def run(self) -> None:
+        try:
+            self._target_fn()
+        except BaseException as e:
+            self.error = e
+
+
+class GamePipeline:
+    """
+    Fetch, map and write a list of games with the three stages overlapped.
+
+    `games` are schedule dicts (the `game` row is written too) or bare
+    gamePks (stats only); `done` maps gamePk → ledger stages already
+    loaded.  With `player_autocommit` the `player` dimension is written on
+    a second, autocommit connection (see etl_backfill).  Failed games are
+    handed to `on_failure` and the dead-letter queue by `GameBatch`.
+    `fetch` is the per-game boxscore getter, as for `iter_boxscores`.
+    """
+
+    def __init__(self, dsn: str,
+                 games: Iterable[Union[int, Dict[str, Any]]],
+                 done: Optional[Dict[int, Set[str]]] = None,
+                 skip_stages: Iterable[str] = (),
+                 concurrency: Optional[int] = None,
+                 queue_size: int = QUEUE_SIZE,
+                 max_games: int = MAX_GAMES,
+                 player_autocommit: bool = False,
+                 on_failure: Optional[Callable[[int, BaseException], Any]] = _print_failure,
+                 on_commit: Optional[Callable[[int], Any]] = None,
+                 fetch: Callable[[int], Any] = safe_boxscore_data):
+        self.dsn = dsn
+        self.schedule: Dict[int, Optional[Dict[str, Any]]] = {
+            (g["game_id"] if isinstance(g, dict) else g):
+                (g if isinstance(g, dict) else None)
+            for g in games
+        }
+        self.done = done or {}
+        self.skip_stages = set(skip_stages)
+        self.concurrency = concurrency
+        self.max_games = max_games
+        self.player_autocommit = player_autocommit
+        self.on_failure = on_failure
+        self.on_commit = on_commit
+        self.fetch = fetch
+        self._fetched: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        self._mapped: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        # stage timings (seconds)
+        self.blocked = {"fetch": 0.0, "map": 0.0}   # waiting on a full queue
+        self.starved = {"map": 0.0, "write": 0.0}   # waiting on an empty queue
+        self.peak_depth = {"fetched": 0, "mapped": 0}
+        self.elapsed = 0.0
+        self.players: Optional[PlayerRegistry] = None
+        self.batch: Optional[GameBatch] = None
+
+    # ─── queue helpers ─────────────────────────────────────────────────
+    def _put(self, q: "queue.Queue[Any]", item: Any, stage: str, name: str) -> None:
+        t0 = time.perf_counter()
+        while True:
+            if self._stop.is_set():
+                raise _Stopped()
+            try:
+                q.put(item, timeout=_POLL)
+                break
+            except queue.Full:
+                continue
+        self.blocked[stage] += time.perf_counter() - t0
+        depth = q.qsize()
+        self.peak_depth[name] = max(self.peak_depth[name], depth)
+        QUEUE_DEPTH.labels(name).set(depth)
+
+    def _get(self, q: "queue.Queue[Any]", stage: str, name: str,
+             upstream: _Stage) -> Any:
+        t0 = time.perf_counter()
+        while True:
+            try:
+                item = q.get(timeout=_POLL)
+                break
+            except queue.Empty:
+                if upstream.error is not None:
+                    raise upstream.error
+                if self._stop.is_set():
+                    raise _Stopped()
+        self.starved[stage] += time.perf_counter() - t0
+        QUEUE_DEPTH.labels(name).set(q.qsize())
+        return item
+
+    # ─── stages ────────────────────────────────────────────────────────
+    def _fetch_stage(self) -> None:
+        try:
+            for gamePk, box in iter_boxscores(self.schedule, fetch=self.fetch,
+                                              concurrency=self.concurrency):
+                self._put(self._fetched, (gamePk, box), "fetch", "fetched")
+            self._put(self._fetched, _DONE, "fetch", "fetched")
+        except _Stopped:
+            pass
+
+    def _map_stage(self, fetcher: _Stage) -> None:
+        try:
+            while True:
+                item = self._get(self._fetched, "map", "fetched", fetcher)
+                if item is _DONE:
+                    break
+                self._put(self._mapped, self._map_one(*item), "map", "mapped")
+            self._put(self._mapped, _DONE, "map", "mapped")
+        except _Stopped:
+            pass
+
+    def _map_one(self, gamePk: int, box: Any) -> MappedGame:
+        if box is None:
+            return MappedGame(gamePk, {}, {}, None,
+                              RuntimeError("could not fetch boxscore"))
+        sink = _RowSink()
+        try:
+            stages = map_game_stats(box, gamePk, sink,
+                                    done=self.done.get(gamePk, set()) | self.skip_stages,
+                                    game=self.schedule[gamePk])
+            # "players" is recorded at commit, once `resolve()` wrote them
+            sink.add("load_ledger", [(gamePk, stage) for stage in stages
+                                     if stage != "players"])
+            encoded = {table: (copy_text(rows), len(rows))
+                       for table, rows in sink.rows.items()
+                       if table not in MERGED_TABLES and rows}
+        except Exception as e:                      # bad JSON → dead letter
+            return MappedGame(gamePk, {}, {}, None, e)
+        merged = {table: rows for table, rows in sink.rows.items()
+                  if table in MERGED_TABLES}
+        player_ids = box_player_ids(box) if "players" in stages else None
+        return MappedGame(gamePk, encoded, merged, player_ids, None)
+
+    def _write_one(self, batch: GameBatch, game: MappedGame) -> None:
+        if game.error is not None:
+            batch.fail(game.gamePk, game.error)
+            return
+        with batch.game(game.gamePk):
+            for table, (text, n_rows) in game.encoded.items():
+                batch.writer.add_encoded(table, text, n_rows)
+            for table, rows in game.merged.items():
+                batch.writer.add(table, rows)
+            if game.player_ids is not None:
+                self.players.note_ids(game.player_ids, game.gamePk)
+        if batch.maybe_commit() and self.on_commit is not None:
+            self.on_commit(len(batch.loaded))
+
+    # ─── driver ────────────────────────────────────────────────────────
+    def run(self) -> GameBatch:
+        """Load every game; returns the finished `GameBatch` (loaded/failed)."""
+        t0 = time.perf_counter()
+        with ExitStack() as stack:
+            conn = stack.enter_context(closing(connect(self.dsn)))
+            cur = player_cur = stack.enter_context(conn.cursor())
+            if self.player_autocommit:          # shared `player` rows: short locks
+                dim_conn = stack.enter_context(closing(connect(self.dsn)))
+                dim_conn.autocommit = True
+                player_cur = stack.enter_context(dim_conn.cursor())
+            self.players = PlayerRegistry.from_db(player_cur)
+            batch = self.batch = GameBatch(conn, cur,
+                                           writer=RowAccumulator(cur),
+                                           players=self.players,
+                                           player_cur=player_cur,
+                                           max_games=self.max_games,
+                                           on_failure=self.on_failure,
+                                           savepoints=False)
+
+            fetcher = _Stage("fetch", self._fetch_stage)
+            mapper = _Stage("map", lambda: self._map_stage(fetcher))
+            fetcher.start()
+            mapper.start()
+            try:
+                while True:
+                    game = self._get(self._mapped, "write", "mapped", mapper)
+                    if game is _DONE:
+                        break
+                    self._write_one(batch, game)
+                batch.commit()
+            finally:
+                self._stop.set()                 # unblock the producers
+                mapper.join()
+                fetcher.join()
+        self.elapsed = time.perf_counter() - t0
+        return batch
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Throughput and where the stages waited.  A writer that is mostly
+        `starved` means we are API-bound; a fetch stage that is mostly
+        `blocked` means we are database-bound.
+        """
+        games = len(self.batch.loaded) if self.batch else 0
+        return {
+            "games": games,
+            "failed": len(self.batch.failed) if self.batch else 0,
+            "seconds": self.elapsed,
+            "games_per_sec": games / self.elapsed if self.elapsed else 0.0,
+            "blocked": dict(self.blocked),
+            "starved": dict(self.starved),
+            "peak_depth": dict(self.peak_depth),
+            "flushes": self.batch.writer.stats() if self.batch else {},
+            "people_lookups": self.players.lookups if self.players else 0,
+            "api": rate_controller().snapshot(),
+        }
@@ -0,0 +1,335 @@
+"""
+Per-stage profiling for the loaders.
+
+Metrics (utils.metrics) say *that* a run is slow; this module says *where*.
+Three pieces, all off by default:
+
+* `@profiled` on the `process_*` loaders, the `safe_*` fetch helpers,
+  flushes and commits – wall and CPU time per call, per stage.  CPU time
+  is the calling thread's (`time.thread_time`), so the pipeline's fetch,
+  map and write threads are each accounted correctly.  Timings are
+  inclusive: `safe_boxscore_data` contains its `get_json`.
+* `sample(gamePk, label)` around the per-game work – for a deterministic
+  subset of games it records a cProfile of that thread and the tracemalloc
+  peak.  tracemalloc is process-wide, so one sampled game is traced at a
+  time and its peak includes whatever the other threads allocated
+  meanwhile; fetches are not traced, as tracing slows every thread for the
+  length of a network wait.
+* `report()` – a summary table at the end of the run; sampled cProfile
+  data is also written to `ETL_PROFILE_DIR` for `snakeviz` / `pstats`.
+
+Switches (environment or the scripts' `--profile` / `--profile-sample`):
+
+    ETL_PROFILE=1              stage timings
+    ETL_PROFILE_SAMPLE=0.02    also deep-profile ~2 % of games
+    ETL_PROFILE_DIR=profiles   where the .pstats files go
+
+    ETL_PROFILE_SAMPLE=0.05 python etl_update.py
+"""
+import cProfile
+import functools
+import io
+import itertools
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+PROFILE_DIR = "profiles"
+TOP_FUNCTIONS = 15            # cProfile rows in the summary
+TOP_ALLOCATIONS = 5           # tracemalloc lines in the summary
+
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+class Profiler:
+    """Thread-safe stage timings and sampled cProfile / tracemalloc data."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._trace_lock = threading.Lock()      # one tracemalloc sample at a time
+        self._local = threading.local()
+        self._dumps = itertools.count(1)
+        self._configured = False
+        self.enabled = False
+        self.sample_rate = 0.0
+        self.out_dir = PROFILE_DIR
+        self.stages: Dict[str, List[float]] = {}          # name → [calls, wall, cpu]
+        self.samples: List[Tuple[int, str, float, int]] = []  # pk, label, wall, peak
+        self.profiles: List[cProfile.Profile] = []
+        self.files: List[str] = []
+        self.top_alloc: Tuple[int, int, str, List[str]] = (0, 0, "", [])
+
+    # ─── configuration ─────────────────────────────────────────────────
+    def configure(self, enabled: Optional[bool] = None,
+                  sample: Optional[float] = None,
+                  out_dir: Optional[str] = None) -> None:
+        """Override the environment; `None` leaves a setting as the env has it."""
+        if not self._configured:
+            self._from_env()
+        if sample is not None:
+            self.sample_rate = max(0.0, min(1.0, sample))
+        if enabled is not None:
+            self.enabled = enabled
+        self.enabled = self.enabled or self.sample_rate > 0
+        if out_dir is not None:
+            self.out_dir = out_dir
+
+    def _from_env(self) -> None:
+        self._configured = True
+        self.sample_rate = max(0.0, min(1.0, float(os.getenv("ETL_PROFILE_SAMPLE") or 0)))
+        self.enabled = _env_flag("ETL_PROFILE") or self.sample_rate > 0
+        self.out_dir = os.getenv("ETL_PROFILE_DIR", PROFILE_DIR)
+
+    def active(self) -> bool:
+        if not self._configured:          # lazily: scripts load .env after importing us
+            self._from_env()
+        return self.enabled
+
+    def settings(self) -> Dict[str, Any]:
+        """Keyword arguments for `configure` in another process."""
+        self.active()
+        return {"enabled": self.enabled, "sample": self.sample_rate,
+                "out_dir": self.out_dir}
+
+    # ─── stage timings ─────────────────────────────────────────────────
+    def record(self, name: str, wall: float, cpu: float) -> None:
+        with self._lock:
+            acc = self.stages.get(name)
+            if acc is None:
+                acc = self.stages[name] = [0, 0.0, 0.0]
+            acc[0] += 1
+            acc[1] += wall
+            acc[2] += cpu
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        if not self.active():
+            yield
+            return
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - wall, time.thread_time() - cpu)
+
+    # ─── sampled games ─────────────────────────────────────────────────
+    def sampled(self, gamePk: int) -> bool:
+        """Deterministic per gamePk, so a game's fetch and map are both sampled."""
+        if not self.active() or self.sample_rate <= 0:
+            return False
+        return (gamePk * 2654435761) % 2**32 < self.sample_rate * 2**32
+
+    @contextmanager
+    def sample(self, gamePk: int, label: str,
+               memory: bool = True) -> Iterator[None]:
+        """
+        cProfile this thread – and, with `memory`, trace allocations –
+        while a sampled game's `label` work runs.
+        """
+        if not self.sampled(gamePk) or getattr(self._local, "sampling", False):
+            yield
+            return
+        self._local.sampling = True
+        prof: Optional[cProfile.Profile] = cProfile.Profile()
+        try:
+            prof.enable()
+        except ValueError:                    # another profiler owns the hook
+            prof = None
+        tracing = (memory and not tracemalloc.is_tracing()
+                   and self._trace_lock.acquire(blocking=False))
+        if tracing:
+            tracemalloc.start()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - started
+            if prof is not None:
+                prof.disable()                # before tracemalloc's own work
+            peak, lines = 0, []
+            if tracing:
+                _, peak = tracemalloc.get_traced_memory()
+                if peak > self.top_alloc[0]:
+                    lines = _top_lines(tracemalloc.take_snapshot())
+                tracemalloc.stop()
+                self._trace_lock.release()
+            self._local.sampling = False
+            with self._lock:
+                self.samples.append((gamePk, label, wall, peak))
+                if prof is not None:
+                    self.profiles.append(prof)
+                if lines and peak > self.top_alloc[0]:
+                    self.top_alloc = (peak, gamePk, label, lines)
+
+    # ─── results ───────────────────────────────────────────────────────
+    def save_profile(self, path: Optional[str] = None) -> Optional[str]:
+        """Write the sampled cProfile data collected so far to one .pstats file."""
+        with self._lock:
+            profiles, self.profiles = self.profiles, []
+        if not profiles:
+            return None
+        if path is None:
+            os.makedirs(self.out_dir, exist_ok=True)
+            path = os.path.join(self.out_dir,
+                                f"bth-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+                                f"-{next(self._dumps)}.pstats")
+        stats = pstats.Stats(profiles[0])
+        for prof in profiles[1:]:
+            stats.add(prof)
+        stats.dump_stats(path)
+        with self._lock:
+            self.files.append(path)
+        return path
+
+    def snapshot(self, reset: bool = False) -> Dict[str, Any]:
+        """
+        Picklable state, for a backfill worker to hand to the coordinator.
+        With `reset` the worker starts counting afresh for its next shard.
+        """
+        self.save_profile()
+        with self._lock:
+            snap = {"stages": {k: list(v) for k, v in self.stages.items()},
+                    "samples": list(self.samples),
+                    "files": list(self.files),
+                    "top_alloc": self.top_alloc}
+            if reset:
+                self.stages, self.samples, self.files = {}, [], []
+                self.top_alloc = (0, 0, "", [])
+        return snap
+
+    def merge(self, snap: Dict[str, Any]) -> None:
+        with self._lock:
+            for name, (calls, wall, cpu) in snap["stages"].items():
+                acc = self.stages.setdefault(name, [0, 0.0, 0.0])
+                acc[0] += calls
+                acc[1] += wall
+                acc[2] += cpu
+            self.samples.extend(snap["samples"])
+            self.files.extend(f for f in snap["files"] if f not in self.files)
+            if snap["top_alloc"][0] > self.top_alloc[0]:
+                self.top_alloc = snap["top_alloc"]
+
+    def report(self) -> None:
+        """Print the stage table (and sampled-game summary) if anything was recorded."""
+        self.save_profile()
+        if not self.stages and not self.samples:
+            return
+        print("⏱️  Stage profile (inclusive; CPU = calling thread)")
+        print(f"   {'stage':<34}{'calls':>8}{'wall s':>10}{'cpu s':>9}"
+              f"{'ms/call':>10}{'cpu %':>7}")
+        for name, (calls, wall, cpu) in sorted(self.stages.items(),
+                                               key=lambda kv: -kv[1][1]):
+            print(f"   {name:<34}{calls:>8}{wall:>10.2f}{cpu:>9.2f}"
+                  f"{1000 * wall / calls:>10.2f}"
+                  f"{100 * cpu / wall if wall else 0:>6.0f}%")
+        if self.samples:
+            self._report_samples()
+
+    def _report_samples(self) -> None:
+        games = {pk for pk, *_ in self.samples}
+        print(f"🔬 {len(games)} sampled games")
+        by_label: Dict[str, List[Tuple[float, int]]] = {}
+        for _, label, wall, peak in self.samples:
+            by_label.setdefault(label, []).append((wall, peak))
+        for label, rows in sorted(by_label.items()):
+            peaks = [p for _, p in rows if p]
+            print(f"   {label:<8} {len(rows):>5} × {1000 * sum(w for w, _ in rows) / len(rows):8.1f} ms"
+                  + (f", peak {_mib(sum(peaks) / len(peaks))} avg / {_mib(max(peaks))} max"
+                     if peaks else ""))
+        peak, gamePk, label, lines = self.top_alloc
+        if lines:
+            print(f"   largest peak: gamePk {gamePk} ({label}, {_mib(peak)}), "
+                  "still allocated at its end:")
+            for line in lines:
+                print(f"      {line}")
+        if self.files:
+            stats = pstats.Stats(self.files[0], stream=io.StringIO())
+            for path in self.files[1:]:
+                stats.add(path)
+            out = io.StringIO()
+            stats.stream = out
+            stats.sort_stats("tottime").print_stats(TOP_FUNCTIONS)
+            print(f"   cProfile ({', '.join(self.files)}), top {TOP_FUNCTIONS} by own time:")
+            body = out.getvalue().split("ncalls", 1)
+            if len(body) == 2:
+                print("   ncalls" + body[1].rstrip())
+
+
+def _mib(n: float) -> str:
+    return f"{n / 2**20:.1f} MiB" if n >= 2**20 else f"{n / 2**10:.0f} KiB"
+
+
+def _top_lines(snapshot: "tracemalloc.Snapshot") -> List[str]:
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ))
+    return [f"{os.path.relpath(s.traceback[0].filename)}:{s.traceback[0].lineno} "
+            f"{s.size / 1024:.0f} KiB in {s.count} blocks"
+            for s in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]]
+
+
+PROFILER = Profiler()
+
+
+# ─────────────────────────────────────
+#  H O O K S
+# ─────────────────────────────────────
+def profiled(fn: Optional[Callable] = None, *, name: Optional[str] = None):
+    """
+    Decorator: account every call of `fn` as stage `name` (default: its
+    qualified name).  Costs one flag check per call while profiling is off.
+
+    >>> @profiled
+    ... def process_batters(box, gamePk, cur, writer=None): ...
+    """
+    def wrap(func: Callable) -> Callable:
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def inner(*args, **kwargs):
+            if not PROFILER.active():
+                return func(*args, **kwargs)
+            wall, cpu = time.perf_counter(), time.thread_time()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                PROFILER.record(label, time.perf_counter() - wall,
+                                time.thread_time() - cpu)
+        return inner
+
+    return wrap(fn) if fn is not None else wrap
+
+
+stage = PROFILER.stage
+sample = PROFILER.sample
+configure = PROFILER.configure
+settings = PROFILER.settings
+snapshot = PROFILER.snapshot
+merge = PROFILER.merge
+report = PROFILER.report
+
+
+# ─────────────────────────────────────
+#  C L I
+# ─────────────────────────────────────
+def add_arguments(parser) -> None:
+    """`--profile` / `--profile-sample` for a script's argparse parser."""
+    parser.add_argument("--profile", action="store_true",
+                        help="time every stage and print a summary table "
+                             "(default: $ETL_PROFILE)")
+    parser.add_argument("--profile-sample", type=float, default=None,
+                        metavar="FRACTION",
+                        help="also cProfile / tracemalloc this share of games "
+                             "(default: $ETL_PROFILE_SAMPLE)")
+
+
+def configure_from_args(args) -> None:
+    """Apply the `add_arguments` flags; unset flags keep the environment's value."""
+    configure(enabled=args.profile or None, sample=args.profile_sample)
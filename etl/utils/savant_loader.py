@@ -0,0 +1,330 @@
+"""
+Schema-driven loader for Baseball Savant leaderboard CSVs.
+
+Column names, types and the conflict key come from the target table's
+DDL (information_schema / pg_index), so a new Savant table is one more
+`SavantTable` entry in `SAVANT_TABLES`.  Each CSV is read by Arrow's
+streaming reader in blocks, typed per block (a stray non-number becomes
+NULL rather than failing the file) and every block is COPY'd straight into
+a staging table – memory stays flat however wide or long the export is.
+Years load concurrently, one connection per thread.
+
+Two modes:
+  insert   – new (player, year) rows only; existing rows are left alone
+  refresh  – in-season update: files whose md5 matches the manifest (the
+             last refresh) are skipped, every other row is hashed (md5 of
+             the row text) on both sides and only new or changed rows are
+             written; only refreshes record a file in the manifest
+
+Usage
+-----
+>>> load_savant(DSN, SAVANT_TABLES["batter"])
+>>> load_savant(DSN, SAVANT_TABLES["pitcher"], years=[2025], workers=1)
+>>> load_savant(DSN, SAVANT_TABLES["batter"], years=[2025], mode="refresh")
+"""
+import csv
+import hashlib
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+from psycopg2 import connect
+from psycopg2.extensions import quote_ident
+
+
+class SavantTable(NamedTuple):
+    table: str                      # target table
+    data_dir: str                   # where the yearly CSVs live
+    file_pattern: str               # e.g. "batting{year}.csv"
+    years: Tuple[int, ...]
+    year_column: str = "year"       # filled from the file name, not the CSV
+
+
+SAVANT_TABLES: Dict[str, SavantTable] = {
+    "batter":  SavantTable("savant_batter_stats", "batting_data",
+                           "batting{year}.csv", tuple(range(2015, 2026))),
+    "pitcher": SavantTable("savant_pitcher_stats", "pitching_data",
+                           "pitching{year}.csv", tuple(range(2019, 2026))),
+}
+
+BLOCK_BYTES = 4 << 20               # Arrow read block ≈ rows per COPY
+DEFAULT_WORKERS = 4
+NULL_VALUES = ["", "NA", "NaN", "null", "--"]
+MODES = ("insert", "refresh")
+
+_INT_TYPES = {"smallint", "integer", "bigint"}
+_FLOAT_TYPES = {"numeric", "real", "double precision"}
+_NUMBER = r"^[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?$"
+
+
+# ─────────────────────────────────────
+#  S C H E M A
+# ─────────────────────────────────────
+def table_columns(cur, table: str) -> List[Tuple[str, str]]:
+    """(column, data_type) of `table` in DDL order."""
+    cur.execute("""
+        SELECT column_name, data_type
+          FROM information_schema.columns
+         WHERE table_schema = current_schema() AND table_name = %s
+         ORDER BY ordinal_position;
+    """, (table,))
+    return cur.fetchall()
+
+
+def primary_key(cur, table: str) -> List[str]:
+    cur.execute("""
+        SELECT a.attname
+          FROM pg_index i
+          JOIN pg_attribute a ON a.attrelid = i.indrelid
+                             AND a.attnum = ANY (i.indkey)
+         WHERE i.indrelid = %s::regclass AND i.indisprimary
+         ORDER BY array_position(i.indkey, a.attnum);
+    """, (table,))
+    return [row[0] for row in cur.fetchall()]
+
+
+def arrow_type(pg_type: str) -> pa.DataType:
+    """
+    Type of the column once a block is prepared.  Every CSV column is read
+    as text and numbers are parsed per block (`_to_number`): integers go
+    through float64 and are rounded, since exports write "12.0".
+    """
+    if pg_type in _INT_TYPES or pg_type in _FLOAT_TYPES:
+        return pa.float64()
+    return pa.string()
+
+
+def _to_number(col: pa.ChunkedArray) -> Tuple[pa.ChunkedArray, int]:
+    """
+    Text → float64, anything that is not a number → null (like
+    `pd.to_numeric(errors="coerce")`); returns the column and how many
+    non-null values were coerced.
+    """
+    text = pc.utf8_trim_whitespace(col)
+    ok = pc.match_substring_regex(text, _NUMBER)
+    bad = pc.sum(pc.and_(pc.is_valid(text), pc.invert(ok))).as_py() or 0
+    return pc.cast(pc.if_else(ok, text, None), pa.float64()), bad
+
+
+def _csv_header(path: str) -> List[str]:
+    with open(path, newline="", encoding="utf-8-sig") as fh:
+        return next(csv.reader(fh), [])
+
+
+# ─────────────────────────────────────
+#  B L O C K S  →  C O P Y
+# ─────────────────────────────────────
+def _prepare_block(batch: pa.RecordBatch,
+                   columns: List[Tuple[str, str]],
+                   year_column: str, year: int,
+                   key: List[str]) -> Tuple[pa.Table, int]:
+    """
+    Fix the year, parse numeric columns, round integer columns, drop rows
+    without a key.  Returns the block and the count of unparseable numbers.
+    """
+    tbl = pa.Table.from_batches([batch])
+    arrays = []
+    coerced = 0
+    for name, pg_type in columns:
+        if name == year_column:
+            col = pa.array([year] * tbl.num_rows, pa.int64())
+        else:
+            col = tbl.column(name)
+            if arrow_type(pg_type) == pa.float64():
+                col, bad = _to_number(col)
+                coerced += bad
+            if pg_type in _INT_TYPES:
+                col = pc.cast(pc.round(col), pa.int64())
+        arrays.append(col)
+    tbl = pa.Table.from_arrays(arrays, names=[n for n, _ in columns])
+    for name in key:
+        tbl = tbl.filter(pc.is_valid(tbl.column(name)))
+    return tbl, coerced
+
+
+def _copy_block(cur, stage: str, cols_sql: str, tbl: pa.Table) -> None:
+    sink = io.BytesIO()
+    pacsv.write_csv(tbl, sink, pacsv.WriteOptions(include_header=False))
+    sink.seek(0)
+    cur.copy_expert(f"COPY {stage} ({cols_sql}) FROM STDIN WITH (FORMAT csv)",
+                    sink)
+
+
+# ─────────────────────────────────────
+#  M A N I F E S T
+# ─────────────────────────────────────
+def file_md5(path: str) -> str:
+    digest = hashlib.md5()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def manifest_md5(cur, table: str, path: str) -> Optional[str]:
+    cur.execute("""
+        SELECT content_md5 FROM savant_file_manifest
+         WHERE table_name = %s AND file_path = %s;
+    """, (table, path))
+    row = cur.fetchone()
+    return row[0] if row else None
+
+
+def manifest_record(cur, table: str, path: str, md5: str, rows: int) -> None:
+    cur.execute("""
+        INSERT INTO savant_file_manifest (table_name, file_path, content_md5, row_count)
+        VALUES (%s, %s, %s, %s)
+        ON CONFLICT (table_name, file_path) DO UPDATE
+           SET content_md5 = EXCLUDED.content_md5,
+               row_count   = EXCLUDED.row_count,
+               loaded_at   = now();
+    """, (table, path, md5, rows))
+
+
+# ─────────────────────────────────────
+#  M E R G E
+# ─────────────────────────────────────
+def _row_hash(alias: str, columns: List[str]) -> str:
+    return f"md5(ROW({', '.join(f'{alias}.{c}' for c in columns)})::text)"
+
+
+def _merge_insert(cur, table: str, stage: str,
+                  cols: List[str], key: List[str]) -> Dict[str, int]:
+    cols_sql, key_sql = ", ".join(cols), ", ".join(key)
+    cur.execute(f"""
+        INSERT INTO {table} ({cols_sql})
+        SELECT {cols_sql} FROM {stage}
+        ON CONFLICT ({key_sql}) DO NOTHING;
+    """)
+    new = cur.rowcount
+    cur.execute(f"SELECT COUNT(*) FROM {stage};")
+    return {"new": new, "changed": 0, "unchanged": cur.fetchone()[0] - new}
+
+
+def _merge_refresh(cur, table: str, stage: str,
+                   cols: List[str], key: List[str]) -> Dict[str, int]:
+    """Upsert rows whose hash differs from the stored one; count each kind."""
+    cols_sql, key_sql = ", ".join(cols), ", ".join(key)
+    join = " AND ".join(f"t.{k} = s.{k}" for k in key)
+    # last row wins when an export repeats a key
+    cur.execute(f"""
+        CREATE TEMP TABLE {stage}_dedup ON COMMIT DROP AS
+        SELECT DISTINCT ON ({key_sql}) * FROM {stage}
+         ORDER BY {key_sql}, ctid DESC;
+    """)
+    cur.execute(f"""
+        SELECT COUNT(*) FILTER (WHERE t.{key[0]} IS NULL),
+               COUNT(*) FILTER (WHERE t.{key[0]} IS NOT NULL
+                                  AND {_row_hash("s", cols)} <> {_row_hash("t", cols)}),
+               COUNT(*) FILTER (WHERE t.{key[0]} IS NOT NULL
+                                  AND {_row_hash("s", cols)} = {_row_hash("t", cols)})
+          FROM {stage}_dedup AS s
+          LEFT JOIN {table} AS t ON {join};
+    """)
+    new, changed, unchanged = cur.fetchone()
+    updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in cols if c not in key)
+    cur.execute(f"""
+        INSERT INTO {table} AS t ({cols_sql})
+        SELECT {cols_sql} FROM {stage}_dedup
+        ON CONFLICT ({key_sql}) DO UPDATE SET {updates}
+         WHERE {_row_hash("t", cols)} IS DISTINCT FROM {_row_hash("EXCLUDED", cols)};
+    """)
+    return {"new": new, "changed": changed, "unchanged": unchanged}
+
+
+def load_year(dsn: str, spec: SavantTable, year: int,
+              mode: str = "insert") -> Optional[Dict[str, int]]:
+    """
+    Stream one year's CSV into `spec.table` on its own connection.
+    Returns counts of new / changed / unchanged rows, or None when the
+    file is missing, unusable or (refresh mode) unchanged since last load.
+    """
+    path = os.path.join(spec.data_dir, spec.file_pattern.format(year=year))
+    if not os.path.exists(path):
+        print(f"Missing: {path}")
+        return None
+
+    with closing(connect(dsn)) as conn, conn.cursor() as cur:
+        md5 = file_md5(path)
+        if mode == "refresh" and manifest_md5(cur, spec.table, path) == md5:
+            print(f"⏭️  {year}: {path} unchanged since last load")
+            return None
+
+        schema = table_columns(cur, spec.table)
+        key = primary_key(cur, spec.table)
+        header = set(_csv_header(path))
+        columns = [(n, t) for n, t in schema
+                   if n in header or n == spec.year_column]
+        present = {n for n, _ in columns}
+        missing = [n for n, _ in schema if n not in present]
+        if any(k not in present for k in key):
+            print(f"Skipping {year}: key columns missing from {path}")
+            return None
+        if missing:
+            print(f"⚠️  {year}: loading without {', '.join(missing)}")
+
+        csv_cols = [n for n, _ in columns if n != spec.year_column]
+        reader = pacsv.open_csv(
+            path,
+            read_options=pacsv.ReadOptions(block_size=BLOCK_BYTES,
+                                           encoding="utf-8-sig"),
+            convert_options=pacsv.ConvertOptions(
+                column_types={n: pa.string() for n in csv_cols},
+                include_columns=csv_cols,
+                null_values=NULL_VALUES,
+                strings_can_be_null=True))
+
+        stage = f"_stage_{spec.table}"
+        cols = [quote_ident(n, cur) for n, _ in columns]
+        key_cols = [quote_ident(n, cur) for n in key]
+        cur.execute(f"""
+            CREATE TEMP TABLE {stage} (LIKE {spec.table} INCLUDING DEFAULTS)
+                ON COMMIT DROP;
+        """)
+        rows = coerced = 0
+        for batch in reader:
+            tbl, bad = _prepare_block(batch, columns, spec.year_column, year, key)
+            coerced += bad
+            if tbl.num_rows:
+                _copy_block(cur, stage, ", ".join(cols), tbl)
+                rows += tbl.num_rows
+        if coerced:
+            print(f"⚠️  {year}: {coerced} non-numeric values in numeric columns "
+                  f"loaded as NULL")
+
+        merge = _merge_refresh if mode == "refresh" else _merge_insert
+        counts = merge(cur, spec.table, stage, cols, key_cols)
+        if mode == "refresh":
+            # insert mode skips changed rows, so only a refresh proves the
+            # table matches this file
+            manifest_record(cur, spec.table, path, md5, rows)
+        conn.commit()
+    print(f"✔ {year} → {spec.table}: {counts['new']} new, "
+          f"{counts['changed']} changed, {counts['unchanged']} unchanged")
+    return counts
+
+
+def load_savant(dsn: str,
+                spec: SavantTable,
+                years: Optional[Iterable[int]] = None,
+                workers: int = DEFAULT_WORKERS,
+                mode: str = "insert") -> Dict[str, int]:
+    """Load every year of `spec` concurrently; returns summed row counts."""
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}, not {mode!r}")
+    years = list(spec.years if years is None else years)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        results = list(pool.map(lambda y: load_year(dsn, spec, y, mode), years))
+    totals = {"new": 0, "changed": 0, "unchanged": 0}
+    for counts in filter(None, results):
+        for kind, n in counts.items():
+            totals[kind] += n
+    print(f"🏁 {spec.table}: {totals['new']} new, {totals['changed']} changed, "
+          f"{totals['unchanged']} unchanged from "
+          f"{sum(r is not None for r in results)}/{len(years)} files")
+    return totals